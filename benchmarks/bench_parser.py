@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark EDID decoding: EDIDParser fields, parse_descriptor and
+BaseMonitor properties over a corpus of distinct EDIDs.
+
+python benchmarks/bench_parser.py --size 10000 --output parser.json
+"""
+import argparse
+
+from edider import cache
+from edider.parser import (EDIDMonitor, EDIDParser, decode_edid,
+                           parse_descriptor)
+
+import common
+
+PARSER_FIELDS = (
+    'manufacturer_id',
+    'manufacture_year',
+    'manufacture_week',
+    'edid_version',
+    'edid_revision',
+    'horizontal_size',
+    'vertical_size',
+    'descriptor1',
+    'descriptor2',
+    'descriptor3',
+    'descriptor4',
+)
+
+def read_fields(edids):
+    for edid in edids:
+        edp = EDIDParser(edid)
+        for name in PARSER_FIELDS:
+            getattr(edp, name)
+
+def run(size, repeat):
+    edids = common.corpus(size)
+    descriptors = [edid[off:off+18] for edid in edids for off in (54, 72, 90, 108)]
+    monitors = [EDIDMonitor(x) for x in edids]
+    for mon in monitors:
+        mon.as_dict()
+    results = []
+
+    results.append(common.measure(
+        'decode_edid', lambda: [decode_edid(x) for x in edids], size, repeat))
+
+    def parser_cold():
+        cache.default_cache.clear()
+        read_fields(edids)
+    results.append(common.measure('EDIDParser fields, cold cache', parser_cold, size, repeat))
+
+    cache.default_cache.maxsize = max(cache.default_cache.maxsize, size)
+    read_fields(edids)
+    results.append(common.measure(
+        'EDIDParser fields, warm cache', lambda: read_fields(edids), size, repeat))
+
+    results.append(common.measure(
+        'parse_descriptor', lambda: [parse_descriptor(x) for x in descriptors],
+        len(descriptors), repeat))
+
+    results.append(common.measure(
+        'BaseMonitor.as_dict, new monitors',
+        lambda: [EDIDMonitor(x).as_dict() for x in edids], size, repeat))
+
+    results.append(common.measure(
+        'BaseMonitor.as_dict, memoized',
+        lambda: [x.as_dict() for x in monitors], size, repeat))
+
+    results.append(common.measure(
+        'BaseMonitor hash/eq in a set', lambda: len(set(monitors)), size, repeat))
+
+    try:
+        from edider import batch
+        batch._require_numpy()
+    except ImportError:
+        pass
+    else:
+        buf = b''.join(edids)
+        results.append(common.measure(
+            'batch.parse_batch', lambda: batch.parse_batch(buf), size, repeat))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=2000, help='number of EDIDs')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON results here')
+    args = parser.parse_args()
+    common.report(run(args.size, args.repeat), args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark X11 monitor enumeration: get_monitors() followed by as_dict()
+on every monitor, counting X connections and round-trips per operation.
+
+By default an Xvfb server is started with --screens screens. Xvfb has a
+single RandR output per screen and no EDIDs, so the benchmark writes a
+synthetic EDID to each output; the fields that need an EDID are only read
+where that worked. Pass --display to measure an existing server as it is.
+
+Several outputs on one screen are measured with the in-process RandR
+session of tests/fake_x11.py, which gives --outputs outputs synthetic
+EDIDs and counts the requests and round-trips a server would see.
+
+python benchmarks/bench_x11.py --screens 4 --outputs 8 --output x11.json
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import common
+
+# The fields of an X11 monitor that are valid without an EDID
+NO_EDID_FIELDS = ('output_name', 'status', 'is_primary', 'geometry', 'current_mode',
+                  'width_in_pixels', 'height_in_pixels', 'x11_output_id',
+                  'x11_display', 'x11_screen')
+
+class XCounter(object):
+    "Count connections opened, requests sent and replies waited for"
+    def __init__(self):
+        self.connections = self.requests = self.round_trips = 0
+
+    def install(self):
+        from Xlib.protocol import display as pdisplay
+        counter = self
+        init = pdisplay.Display.__init__
+        send_request = pdisplay.Display.send_request
+        send_and_recv = pdisplay.Display.send_and_recv
+
+        def counting_init(self, *args, **kwargs):
+            counter.connections += 1
+            return init(self, *args, **kwargs)
+
+        def counting_send_request(self, request, wait_for_response):
+            counter.requests += 1
+            return send_request(self, request, wait_for_response)
+
+        def counting_send_and_recv(self, *args, **kwargs):
+            if kwargs.get('request') is not None:
+                counter.round_trips += 1
+            return send_and_recv(self, *args, **kwargs)
+
+        pdisplay.Display.__init__ = counting_init
+        pdisplay.Display.send_request = counting_send_request
+        pdisplay.Display.send_and_recv = counting_send_and_recv
+
+    def reset(self):
+        self.connections = self.requests = self.round_trips = 0
+
+    def counts(self, operations):
+        return dict(
+            connections_per_op=float(self.connections) / operations,
+            requests_per_op=float(self.requests) / operations,
+            round_trips_per_op=float(self.round_trips) / operations,
+        )
+
+def start_xvfb(screens, display_no=99):
+    cmd = ['Xvfb', ':{}'.format(display_no), '-nolisten', 'tcp', '+extension', 'RANDR']
+    for i in range(screens):
+        cmd += ['-screen', str(i), '1920x1080x24']
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    sock = '/tmp/.X11-unix/X{}'.format(display_no)
+    for _ in range(100):
+        if os.path.exists(sock):
+            return proc, ':{}'.format(display_no)
+        time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError('Xvfb did not start: {}'.format(' '.join(cmd)))
+
+def set_edids(display_name, screens):
+    """Write a synthetic EDID to every connected output that has none.
+
+    Servers that refuse the property report an X error and keep the
+    output without an EDID.
+    """
+    from Xlib import X, Xatom
+    from Xlib.ext import randr
+    from edider.x11read import X11Session, get_monitors
+    edids = iter(common.corpus(64 * screens, seed=1))
+    for i_screen in range(screens):
+        with X11Session(display_name, i_screen) as session:
+            atom = session.display.intern_atom(randr.PROPERTY_RANDR_EDID)
+            for mon in get_monitors(session=session, snapshot=True):
+                if not mon.edid:
+                    session.display.xrandr_change_output_property(
+                        mon.x11_output_id, atom, Xatom.INTEGER, X.PropModeReplace,
+                        (8, next(edids)))
+            session.display.sync()
+
+def as_dict(mon):
+    "The full as_dict() of mon, or that of the fields it has without an EDID"
+    return mon.as_dict(None if mon.edid else NO_EDID_FIELDS)
+
+def enumerate_all(display_name, screens, snapshot):
+    from edider.x11read import X11Session, get_monitors
+    rows = []
+    for i_screen in range(screens):
+        with X11Session(display_name, i_screen) as session:
+            for mon in get_monitors(session=session, snapshot=snapshot):
+                rows.append(as_dict(mon))
+    return rows
+
+def run(display_name, screens, repeat, add_edids=True):
+    counter = XCounter()
+    counter.install()
+    if add_edids:
+        set_edids(display_name, screens)
+    rows = enumerate_all(display_name, screens, True)
+    n_outputs = len(rows)
+    n_edids = sum(1 for x in rows if 'name' in x)
+    results = []
+    for snapshot in (False, True):
+        name = 'get_monitors{} + as_dict'.format('(snapshot=True)' if snapshot else '()')
+        counter.reset()
+        res = common.measure(
+            name, lambda: enumerate_all(display_name, screens, snapshot),
+            n_outputs, repeat, outputs=n_outputs, screens=screens, edids=n_edids)
+        res.update(counter.counts(repeat))
+        results.append(res)
+    return results
+
+def run_fake(outputs, repeat):
+    "Enumerate outputs monitors on one screen of an in-process RandR session"
+    sys.path.insert(0, os.path.join(os.path.dirname(common.benchdir), 'tests'))
+    from fake_x11 import FakeRandRSession
+    from edider.x11read import get_monitors
+    session = FakeRandRSession(common.corpus(outputs, seed=2))
+    results = []
+    for snapshot in (False, True):
+        def enumerate_fake():
+            session.expire()
+            return [x.as_dict() for x in get_monitors(session, snapshot=snapshot)]
+        name = 'fake get_monitors{} + as_dict'.format(
+            '(snapshot=True)' if snapshot else '()')
+        session.reset()
+        res = common.measure(name, enumerate_fake, outputs, repeat,
+                             outputs=outputs, screens=1, edids=outputs)
+        res.update(requests_per_op=float(len(session.requests)) / repeat,
+                   round_trips_per_op=float(session.round_trips) / repeat)
+        results.append(res)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--display', help='use this X server instead of starting Xvfb')
+    parser.add_argument('--screens', type=int, default=1)
+    parser.add_argument('--outputs', type=int, default=8,
+                        help='outputs of the in-process RandR session (default: 8)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help='write the JSON results here')
+    args = parser.parse_args()
+    proc = None
+    display_name = args.display
+    if display_name is None:
+        proc, display_name = start_xvfb(args.screens)
+    try:
+        results = run(display_name, args.screens, args.repeat, add_edids=proc is not None)
+        results += run_fake(args.outputs, args.repeat)
+        common.report(results, args.output)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == '__main__':
+    main()
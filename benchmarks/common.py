@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Helpers shared by the edider benchmarks."""
+from __future__ import print_function
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+import edider
+
+benchdir = os.path.dirname(os.path.abspath(__file__))
+datadir = os.path.join(os.path.dirname(benchdir), 'tests', 'data')
+
+def example_edid(name='edid2.bin'):
+    with open(os.path.join(datadir, name), 'rb') as fobj:
+        return fobj.read()
+
+def corpus(size, seed=0):
+    "size distinct synthetic EDIDs of one block each, see edider.corpus"
+    from edider.corpus import CorpusGenerator
+    return [edid for edid, _ in CorpusGenerator(seed, extensions=0).generate(size)]
+
+def measure(name, func, n_items, repeat=5, number=1, **extra):
+    """Time func (best of repeat runs) and return a result dict.
+
+    n_items is how many items one call of func processes.
+    """
+    times = timeit.repeat(func, repeat=repeat, number=number)
+    best = min(times) / number
+    result = {
+        'benchmark': name,
+        'items': n_items,
+        'best_s': best,
+        'mean_s': sum(times) / len(times) / number,
+        'per_item_us': 1e6 * best / max(n_items, 1),
+    }
+    result.update(extra)
+    return result
+
+def environment():
+    return {
+        'edider': edider.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def report(results, output=None):
+    "Write the results as one JSON document (stdout by default)"
+    doc = {'environment': environment(), 'results': results}
+    text = json.dumps(doc, indent=2, sort_keys=True)
+    if output:
+        with open(output, 'w') as fobj:
+            fobj.write(text + '\n')
+    else:
+        print(text)
+    for res in results:
+        print('{benchmark:<40} {per_item_us:>12.3f} us/item'.format(**res), file=sys.stderr)
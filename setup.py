@@ -69,13 +69,14 @@ setup(
         # eg: 'aspectlib==1.1.1', 'six>=1.7',
     ],
     extras_require={
+        'numpy': ['numpy'],
         # eg:
         #   'rst': ['docutils>=0.11'],
         #   ':python_version=="2.6"': ['argparse'],
     },
-    # entry_points={
-    #     'console_scripts': [
-    #         'run-edider = edider.cli:main',
-    #     ]
-    # },
+    entry_points={
+        'console_scripts': [
+            'edider = edider.cli:main',
+        ]
+    },
 )
@@ -9,6 +9,47 @@ import edider
 mons = edider.get_monitors()
 print(dir(mons[0]))
 """
+import os
+
 __version__ = "0.1.0"
-from edider.x11read import get_monitors
 
+BACKENDS = ('x11', 'drm')
+
+def select_backend(backend=None):
+    """Return the backend get_monitors reads from: backend if given, else
+    'x11' when the X display in $DISPLAY answers and 'drm' otherwise."""
+    if backend is None:
+        backend = 'drm'
+        if os.environ.get('DISPLAY'):
+            try:
+                from edider import x11read
+                x11read.get_session()
+            except Exception:   # no python-xlib, or no X server to talk to
+                pass
+            else:
+                backend = 'x11'
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend {!r}'.format(backend))
+    return backend
+
+def get_monitors(backend=None, snapshot=False, session=None):
+    """Return a monitor object for each connected computer monitor.
+
+    backend may be 'x11' (edider.x11read) or 'drm' (edider.drmread).
+    By default X11 is used when a display is reachable and DRM otherwise,
+    e.g. on headless machines (see select_backend). Only X11 monitors have
+    a geometry, is_primary, current_mode and the x11_* properties.
+    session is an X11Session and needs the X11 backend. With snapshot=True
+    the monitors are read up-front and later property reads make no
+    further requests (see edider.x11read.get_monitors).
+    """
+    if session is not None:
+        if backend not in (None, 'x11'):
+            raise ValueError('The {} backend takes no session'.format(backend))
+        backend = 'x11'
+    backend = select_backend(backend)
+    if backend == 'drm':
+        from edider import drmread
+        return drmread.get_monitors(snapshot=snapshot)
+    from edider import x11read
+    return x11read.get_monitors(session, snapshot=snapshot)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio counterparts of the blocking edider calls (Python 3.5+).
+
+The backends are synchronous, so their requests are made in an executor
+(the loop's default thread pool unless one is given); the event loop only
+waits for the results. The X11 monitors are read with
+X11Session.snapshot(), which sends all RandR requests in one pipelined
+batch, so reading their properties afterwards does not block.
+
+monitors = await edider.aio.get_monitors()
+async for change in await edider.aio.watch():
+    print(change.added, change.removed, change.changed)
+"""
+import asyncio
+import functools
+
+# The loop of the running coroutine; get_event_loop() before Python 3.7
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+def run_in_executor(executor, func, *args, **kwargs):
+    "Return a future of func(*args, **kwargs) run in executor"
+    loop = _running_loop()
+    return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+async def get_monitors(backend=None, session=None, executor=None):
+    """Return a monitor object for each connected computer monitor.
+
+    The same objects as edider.get_monitors(backend, snapshot=True,
+    session=session), read in executor.
+    """
+    import edider
+    return await run_in_executor(
+        executor, edider.get_monitors, backend, snapshot=True, session=session)
+
+
+class AsyncMonitorWatcher(object):
+    """Iterate over MonitorChange tuples without blocking the event loop.
+
+    Wraps an edider.x11read.MonitorWatcher: the loop waits for the X
+    connection to become readable, then reads the events and re-reads
+    the added and changed monitors in the executor. With
+    owns_session=True close() also closes the watcher's session.
+    """
+    def __init__(self, watcher, executor=None, owns_session=False):
+        self.watcher = watcher
+        self.executor = executor
+        self.owns_session = owns_session
+
+    @property
+    def monitors(self):
+        return self.watcher.monitors
+
+    async def _readable(self):
+        loop = _running_loop()
+        fut = loop.create_future()
+        fileno = self.watcher.fileno()
+
+        def ready():
+            if not fut.done():
+                fut.set_result(None)
+        loop.add_reader(fileno, ready)
+        try:
+            await fut
+        finally:
+            loop.remove_reader(fileno)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            change = await run_in_executor(self.executor, self.watcher.pending)
+            if change is not None:
+                break
+            await self._readable()
+        stale = list(change.added) + list(change.changed)
+        await run_in_executor(self.executor, self.watcher.refresh, stale)
+        return change
+
+    def close(self):
+        self.watcher.close()
+        if self.owns_session:
+            self.watcher.session.close()
+
+
+async def watch(session=None, executor=None):
+    """Return an AsyncMonitorWatcher for session, by default a new one.
+
+    The watcher gets its own X connection unless a session is given, so
+    that requests made from other threads do not read its events; closing
+    the watcher closes that connection.
+    """
+    from edider import x11read
+
+    def make_watcher():
+        return x11read.MonitorWatcher(session or x11read.X11Session())
+    watcher = await run_in_executor(executor, make_watcher)
+    return AsyncMonitorWatcher(watcher, executor, owns_session=session is None)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Decode the base blocks of many EDIDs at once with NumPy.
+
+NumPy is an optional dependency (pip install edider[numpy]).
+Every column holds, for each EDID, the field of the same name of its
+EDIDRecord (see edider.parser.decode_edid): product_code and
+serial_number are ints. descriptor1 to descriptor4 hold only the dtype
+of record.descriptor(0) to record.descriptor(3).
+
+Usage example:
+from edider.batch import parse_batch
+cols = parse_batch(list_of_edid_bytes)
+print(cols['manufacturer_id'], cols['manufacture_year'])
+"""
+from edider.parser import BLOCK_SIZE, DESCRIPTOR_TYPES, _PNP_LETTERS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_DESCRIPTOR_OFFSETS = (54, 72, 90, 108)
+
+# (column, byte offset) of the fields stored in a single byte
+_BYTE_FIELDS = (
+    ('manufacture_week', 16),
+    ('edid_version', 18),
+    ('edid_revision', 19),
+    ('horizontal_size', 21),
+    ('vertical_size', 22),
+    ('extension_count', 126),
+)
+
+COLUMNS = (
+    ('manufacturer_id', 'U3'),
+    ('vendor_name', 'O'),
+    ('product_code', 'u2'),
+    ('serial_number', 'u4'),
+    ('manufacture_week', 'u1'),
+    ('manufacture_year', 'u2'),
+    ('edid_version', 'u1'),
+    ('edid_revision', 'u1'),
+    ('horizontal_size', 'u1'),
+    ('vertical_size', 'u1'),
+    ('extension_count', 'u1'),
+    ('descriptor1', 'U15'),
+    ('descriptor2', 'U15'),
+    ('descriptor3', 'U15'),
+    ('descriptor4', 'U15'),
+)
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('edider.batch needs numpy: pip install edider[numpy]')
+
+def as_blocks(edids):
+    """Return the base blocks of edids as an (N, 128) uint8 array.
+
+    edids is either a contiguous buffer (bytes, bytearray, memoryview or
+    numpy array) of N*128 bytes or a sequence of EDID byte strings, whose
+    extension blocks are ignored.
+    """
+    _require_numpy()
+    if isinstance(edids, np.ndarray):
+        blocks = edids.astype(np.uint8, copy=False)
+    elif isinstance(edids, (bytes, bytearray, memoryview)):
+        blocks = np.frombuffer(edids, dtype=np.uint8)
+    else:
+        edids = [bytes(x[:BLOCK_SIZE]) for x in edids]
+        if any(len(x) != BLOCK_SIZE for x in edids):
+            raise ValueError('Every EDID needs a {} byte base block'.format(BLOCK_SIZE))
+        blocks = np.frombuffer(b''.join(edids), dtype=np.uint8)
+    if blocks.size % BLOCK_SIZE:
+        raise ValueError('Buffer size is not a multiple of {}'.format(BLOCK_SIZE))
+    return blocks.reshape(-1, BLOCK_SIZE)
+
+def _manufacturer_ids(blocks):
+    mid = (blocks[:, 8].astype(np.uint16) << 8) | blocks[:, 9]
+    letters = np.array(list(_PNP_LETTERS), dtype='U1')
+    chars = np.stack([letters[(mid >> 10) & 31],
+                      letters[(mid >> 5) & 31],
+                      letters[mid & 31]], axis=1)
+    return np.ascontiguousarray(chars).view('U3').ravel()
+
+def _vendor_names(blocks):
+    "Look up each distinct PNP code once"
+    from edider import pnp
+    mid = ((blocks[:, 8].astype(np.uint16) << 8) | blocks[:, 9]) & 0x7fff
+    codes, inverse = np.unique(mid, return_inverse=True)
+    lookup = pnp.registry().lookup_code
+    names = np.array([lookup(int(x)) for x in codes], dtype=object)
+    return names[inverse.ravel()]
+
+def _descriptor_types(blocks, offset, names):
+    "Classify descriptors exactly as parse_descriptor labels them"
+    dtypes = names[blocks[:, offset + 3]]
+    dtypes[(blocks[:, offset] != 0) | (blocks[:, offset + 1] != 0)] = 'detailed_timing'
+    return dtypes
+
+def parse_batch(edids):
+    """Decode the base block fields of many EDIDs at once.
+
+    Return a dict mapping each name in COLUMNS to a numpy array with one
+    entry per EDID, as described in the module docstring. vendor_name
+    holds the name from edider.pnp, or None if it is unknown.
+    """
+    blocks = as_blocks(edids)
+    cols = {}
+    cols['manufacturer_id'] = _manufacturer_ids(blocks)
+    cols['vendor_name'] = _vendor_names(blocks)
+    cols['product_code'] = blocks[:, 10].astype(np.uint16) | (blocks[:, 11].astype(np.uint16) << 8)
+    cols['serial_number'] = np.ascontiguousarray(blocks[:, 12:16]).view('<u4').ravel()
+    cols['manufacture_year'] = blocks[:, 17].astype(np.uint16) + 1990
+    for name, offset in _BYTE_FIELDS:
+        cols[name] = blocks[:, offset].copy()
+    names = np.array([DESCRIPTOR_TYPES.get(i, str(i)) for i in range(256)], dtype='U15')
+    for i, offset in enumerate(_DESCRIPTOR_OFFSETS, 1):
+        cols['descriptor{}'.format(i)] = _descriptor_types(blocks, offset, names)
+    return cols
+
+def to_structured(cols):
+    "Pack the columns returned by parse_batch into a numpy structured array"
+    _require_numpy()
+    n = len(cols['manufacturer_id'])
+    arr = np.empty(n, dtype=list(COLUMNS))
+    for name, _ in COLUMNS:
+        arr[name] = cols[name]
+    return arr
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A content-addressed cache of decoded EDIDs.
+
+Entries are keyed by the md5 digest of the EDID bytes (the same digest
+BaseMonitor.uuid is made from) and hold the UUID and the EDIDRecord.
+The in-memory store is a bounded LRU. Optionally the entries are also
+kept in a JSON file under the user's cache directory, so that short-lived
+processes reuse the records decoded by earlier ones:
+
+from edider import cache
+cache.enable_persistence()
+
+Setting $EDIDER_CACHE_DIR does the same for every process that imports
+edider.cache, with the file in that directory. The file carries
+FORMAT_VERSION; a file of another version, or an entry that cannot be
+read back, counts as a miss and is overwritten.
+"""
+import atexit
+import binascii
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from edider import instrument
+
+# Bump when the JSON form of the records changes
+FORMAT_VERSION = 1
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'disk_hits', 'maxsize', 'currsize'))
+
+def default_cache_path():
+    "$XDG_CACHE_HOME/edider/decoded.json, ~/.cache by default"
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'edider', 'decoded.json')
+
+def _record_to_json(record):
+    args = record.__reduce__()[1]
+    return list(args[:-1]) + [[binascii.hexlify(x).decode('ascii') for x in args[-1]]]
+
+def _record_from_json(data):
+    "The EDIDRecord of an entry, or None if it cannot be read"
+    from edider.parser import EDIDRecord
+    try:
+        descriptors = [binascii.unhexlify(x) for x in data[-1]]
+        return EDIDRecord(*(data[:-1] + [descriptors]))
+    except (TypeError, ValueError, IndexError, binascii.Error):
+        return None
+
+
+class _Entry(object):
+    __slots__ = ('uuid', 'record')
+
+    def __init__(self, uuid, record=None):
+        self.uuid = uuid
+        self.record = record
+
+
+class DecodeCache(object):
+    """LRU cache of the UUID and decoded record of EDIDs.
+
+    maxsize bounds the number of entries kept in memory. If path is given
+    the entries are also loaded from and saved to that JSON file, which
+    holds at most disk_maxsize of them.
+    """
+    def __init__(self, maxsize=256, path=None, disk_maxsize=4096):
+        self.maxsize = maxsize
+        self.path = path
+        self.disk_maxsize = disk_maxsize
+        self.hits = self.misses = self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._disk = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load_disk(self):
+        if self._disk is None:
+            import json
+            self._disk = {}
+            try:
+                with open(self.path) as fobj:
+                    data = json.load(fobj)
+            except (IOError, OSError, ValueError):
+                return self._disk
+            if isinstance(data, dict) and data.get('version') == FORMAT_VERSION:
+                entries = data.get('entries')
+                if isinstance(entries, dict):
+                    self._disk = entries
+        return self._disk
+
+    def _entry(self, edid_bytes):
+        "Return (digest, entry), with the lock held by the caller"
+        from uuid import UUID
+        digest = hashlib.md5(edid_bytes).hexdigest()
+        entry = self._entries.pop(digest, None)
+        record = None
+        if entry is None and self.path is not None and digest in self._load_disk():
+            record = _record_from_json(self._disk[digest])
+        if entry is not None:
+            self.hits += 1
+        elif record is not None:
+            self.disk_hits += 1
+            entry = _Entry(UUID(hex=digest), record)
+        else:
+            self.misses += 1
+            entry = _Entry(UUID(hex=digest))
+        self._entries[digest] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return digest, entry
+
+    def uuid(self, edid_bytes):
+        "The UUID made from the md5 digest of edid_bytes"
+        with self._lock:
+            return self._entry(edid_bytes)[1].uuid
+
+    def record(self, edid_bytes):
+        "The EDIDRecord of edid_bytes, decoded only once"
+        with self._lock:
+            digest, entry = self._entry(edid_bytes)
+            if entry.record is not None:
+                return entry.record
+        from edider.parser import decode_edid
+        start = instrument.clock()
+        record = decode_edid(edid_bytes)
+        if instrument.active:
+            instrument.emit('parse', 'decode_edid', duration=instrument.clock() - start,
+                            nbytes=len(edid_bytes))
+        with self._lock:
+            entry.record = record
+            if self.path is not None:
+                disk = self._load_disk()
+                while len(disk) >= self.disk_maxsize:
+                    del disk[next(iter(disk))]
+                disk[digest] = _record_to_json(record)
+                self._dirty = True
+        return record
+
+    def save(self):
+        "Write the persistent store, if there is one and it has changed"
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            import json
+            data = json.dumps({'version': FORMAT_VERSION, 'entries': self._disk},
+                              separators=(',', ':'))
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp, 'w') as fobj:
+            fobj.write(data)
+        os.rename(tmp, self.path)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.disk_hits,
+                         self.maxsize, len(self._entries))
+
+    def clear(self):
+        "Empty the in-memory store and reset the counters"
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+
+default_cache = DecodeCache()
+
+def enable_persistence(path=None):
+    """Keep the default cache in path (see default_cache_path) across
+    processes; it is written back when the interpreter exits."""
+    if default_cache.path is None:
+        atexit.register(default_cache.save)
+    default_cache.path = path or default_cache_path()
+    default_cache._disk = None
+
+def cache_info():
+    "Hit and miss counters of the default cache"
+    return default_cache.cache_info()
+
+if os.environ.get('EDIDER_CACHE_DIR'):
+    enable_persistence(os.path.join(os.environ['EDIDER_CACHE_DIR'], 'decoded.json'))
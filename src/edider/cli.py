@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+The edider command line tool.
+
+edider list [--json] [--fields name,geometry] [--watch]
+edider edid [--hex] [OUTPUT_NAME]
+edider decode [--json] [--fields ...] FILE...
+edider serve [--socket PATH]
+"""
+from __future__ import print_function
+import argparse
+import binascii
+import sys
+
+TEXT_FIELDS = (
+    'output_name',
+    'geometry',
+    'status',
+    'is_primary',
+    'manufacturer_id',
+    'manufacture_year',
+    'name',
+    'serial_no',
+    'text',
+    'width_in_pixels',
+    'height_in_pixels',
+    'width_in_cm',
+    'height_in_cm',
+)
+
+def _fields(monitor, args):
+    "The fields to show for monitor: --fields, or a default set"
+    if args.fields:
+        return args.fields
+    if args.json:
+        return monitor.field_names()
+    names = monitor.field_names()
+    return [x for x in TEXT_FIELDS if x in names]
+
+def _monitor_class(args):
+    "The class of the monitors the command shows"
+    if args.command == 'decode':
+        from edider.parser import EDIDMonitor
+        return EDIDMonitor
+    import edider
+    if not args.watch and edider.select_backend(args.backend) == 'drm':
+        from edider.drmread import DRMMonitor
+        return DRMMonitor
+    from edider.x11read import Monitor
+    return Monitor
+
+def _check_fields(parser, args):
+    "Exit with a usage error if --fields names a property the monitors lack"
+    if not getattr(args, 'fields', None):
+        return
+    try:
+        names = _monitor_class(args).field_names()
+    except ImportError:     # the x11 backend without python-xlib
+        return
+    unknown = [x for x in args.fields if x not in names]
+    if unknown:
+        parser.error('unknown --fields {}; choose from {}'.format(
+            ','.join(unknown), ','.join(names)))
+
+def _print_monitor(monitor, args, out, event=None):
+    fields = _fields(monitor, args)
+    if args.json:
+        import json
+        from edider.parser import _jsonable
+        row = dict((k, _jsonable(v)) for k, v in monitor.as_dict(fields).items())
+        if event is not None:
+            row['event'] = event
+        print(json.dumps(row, sort_keys=True), file=out)
+        return
+    header = str(monitor)
+    if event is not None:
+        header = '{}\t{}'.format(event, header)
+    print(header, file=out)
+    for key in fields:
+        print('\t', key, '\t-> ', getattr(monitor, key), sep='', file=out)
+
+def _get_monitors(args):
+    import edider
+    try:
+        return edider.get_monitors(args.backend, snapshot=True)
+    except Exception as err:    # e.g. Xlib.error.DisplayNameError without $DISPLAY
+        raise SystemExit('edider: cannot read the monitors: {}'.format(err))
+
+def cmd_list(args, out):
+    if args.watch:
+        return _watch(args, out)
+    for monitor in _get_monitors(args):
+        _print_monitor(monitor, args, out)
+    return 0
+
+def _watch(args, out):
+    if args.backend not in (None, 'x11'):
+        print('edider: --watch needs the x11 backend', file=sys.stderr)
+        return 2
+    from edider.x11read import MonitorWatcher
+    watcher = MonitorWatcher()
+    for monitor in watcher.monitors.values():
+        _print_monitor(monitor, args, out, 'present')
+    out.flush()
+    for change in watcher:
+        for event, monitors in zip(change._fields, change):
+            for monitor in monitors:
+                _print_monitor(monitor, args, out, event)
+        out.flush()
+
+def cmd_edid(args, out):
+    monitors = _get_monitors(args)
+    if args.output_name:
+        monitors = [x for x in monitors if x.output_name == args.output_name]
+        if not monitors:
+            print('edider: no monitor on output {}'.format(args.output_name), file=sys.stderr)
+            return 1
+    if args.hex or len(monitors) != 1:
+        for monitor in monitors:
+            edid = binascii.hexlify(monitor.edid).decode('ascii')
+            print('{}\t{}'.format(monitor.output_name, edid), file=out)
+    else:
+        out.flush()
+        getattr(out, 'buffer', out).write(monitors[0].edid)
+    return 0
+
+def cmd_decode(args, out):
+    from edider.parser import EDIDMonitor
+    status = 0
+    for path in args.files:
+        try:
+            with open(path, 'rb') as fobj:
+                monitor = EDIDMonitor(fobj.read(), path)
+            _print_monitor(monitor, args, out)
+        except (IOError, OSError, ValueError) as err:
+            print('edider: {}: {}'.format(path, err), file=sys.stderr)
+            status = 1
+    return status
+
+def cmd_serve(args, out):
+    from edider import daemon
+    try:
+        server = daemon.MonitorServer(args.socket, args.backend)
+    except Exception as err:
+        raise SystemExit('edider: cannot serve the monitors: {}'.format(err))
+    print('edider: serving {} monitors on {}'.format(server.backend, server.path),
+          file=sys.stderr)
+    with server:
+        server.serve_forever()
+    return 0
+
+def _field_list(value):
+    return [x.strip() for x in value.split(',') if x.strip()]
+
+def make_parser():
+    def add_backend_option(cmd, default):
+        cmd.add_argument('--backend', choices=('drm', 'x11'), default=default,
+                         help='where to read monitors from (default: x11 if a display '
+                              'answers, else drm)')
+
+    parser = argparse.ArgumentParser(
+        prog='edider',
+        description='Show information about the connected computer monitors. '
+                    'Without a command the monitors are listed.',
+    )
+    add_backend_option(parser, None)
+    sub = parser.add_subparsers(dest='command')
+
+    def add_output_options(cmd):
+        cmd.add_argument('--json', action='store_true',
+                         help='print one JSON object per monitor (NDJSON)')
+        cmd.add_argument('--fields', type=_field_list, default=None,
+                         help='comma separated properties to show, e.g. name,geometry')
+
+    cmd = sub.add_parser('list', help='list the connected monitors')
+    add_backend_option(cmd, argparse.SUPPRESS)
+    add_output_options(cmd)
+    cmd.add_argument('--watch', action='store_true',
+                     help='keep running and report monitors as they change (X11)')
+    cmd.set_defaults(func=cmd_list)
+
+    cmd = sub.add_parser('edid', help='dump raw EDIDs')
+    add_backend_option(cmd, argparse.SUPPRESS)
+    cmd.add_argument('--hex', action='store_true',
+                     help='print "output<TAB>hex" lines instead of binary')
+    cmd.add_argument('output_name', nargs='?', help='only this output, e.g. HDMI-1')
+    cmd.set_defaults(func=cmd_edid)
+
+    cmd = sub.add_parser('decode', help='decode EDID .bin files')
+    add_output_options(cmd)
+    cmd.add_argument('files', nargs='+', metavar='FILE')
+    cmd.set_defaults(func=cmd_decode)
+
+    cmd = sub.add_parser('serve', help='keep the monitors cached for edider.daemon clients')
+    add_backend_option(cmd, argparse.SUPPRESS)
+    cmd.add_argument('--socket', default=None,
+                     help='Unix socket to listen on (default: edider.daemon.default_socket_path())')
+    cmd.set_defaults(func=cmd_serve)
+    return parser
+
+def main(argv=None, out=None):
+    parser = make_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+    argv = list(argv)
+    commands = ('list', 'edid', 'decode', 'serve', '-h', '--help')
+    if not any(x in commands for x in argv):
+        argv.insert(0, 'list')
+    args = parser.parse_args(argv)
+    _check_fields(parser, args)
+    try:
+        return args.func(args, out or sys.stdout)
+    except KeyboardInterrupt:
+        return 130
+
+if __name__ == '__main__':
+    sys.exit(main())
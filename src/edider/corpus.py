@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Reproducible synthetic EDID corpora for load tests and fuzzing.
+
+The EDIDs are built with edider.encode from a seeded random stream: the
+same seed gives the same bytes. A fraction of them can be malformed on
+purpose (see MALFORMATIONS). Corpora are written as concatenated EDIDs,
+the format edider.scan reads, without holding them in memory:
+
+python -m edider.corpus corpus.bin.gz --count 1000000 --seed 1 --malformed 0.01
+
+gen = CorpusGenerator(seed=1, malformed=0.01)
+for edid, defect in gen.generate(1000):
+    ...
+"""
+from __future__ import division, print_function
+import collections
+import math
+import random
+import struct
+import sys
+
+from edider import encode
+from edider.parser import BLOCK_SIZE, ESTABLISHED_TIMINGS, Mode, RangeLimits
+
+COMMON_MODES = (
+    Mode(1024, 768, 60), Mode(1280, 800, 60), Mode(1280, 1024, 60), Mode(1366, 768, 60),
+    Mode(1440, 900, 60), Mode(1600, 900, 60), Mode(1680, 1050, 60), Mode(1920, 1080, 60),
+    Mode(1920, 1080, 144), Mode(1920, 1200, 60), Mode(2560, 1080, 75), Mode(2560, 1440, 60),
+    Mode(2560, 1440, 144), Mode(3440, 1440, 100), Mode(3840, 2160, 60),
+)
+DIAGONALS = (13.3, 15.6, 17, 19, 21.5, 24, 27, 32, 34, 43, 55)    # in inches
+_EXTRA_STANDARD = (
+    Mode(1152, 864, 75), Mode(1280, 720, 60), Mode(1280, 960, 60), Mode(1440, 900, 60),
+    Mode(1600, 1200, 60), Mode(1680, 1050, 60), Mode(1920, 1080, 60), Mode(1920, 1200, 60),
+)
+_VICS = (1, 2, 3, 4, 5, 16, 17, 18, 19, 20, 31, 32, 33, 34, 93, 94, 95, 97)
+_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# The defects of deliberately malformed EDIDs
+MALFORMATIONS = (
+    'bad_checksum',         # a byte changed after the checksum was computed
+    'truncated',            # cut short
+    'missing_extension',    # announces more extension blocks than follow
+    'bad_header',           # a byte of the fixed header changed
+    'junk',                 # random bytes, no EDID at all
+    'garbage_descriptor',   # random descriptor bytes with a valid checksum
+)
+
+def _panel(mode, diagonal):
+    "Width and height in mm of a panel of mode with a diagonal in inches"
+    ratio = math.hypot(mode.width, mode.height)
+    return (int(25.4 * diagonal * mode.width / ratio),
+            int(25.4 * diagonal * mode.height / ratio))
+
+
+class CorpusGenerator(object):
+    """Generate varied EDIDs from a seed.
+
+    malformed is the fraction of deliberately malformed EDIDs, extensions
+    the fraction of EDIDs with a CTA-861 extension block.
+    """
+    def __init__(self, seed=0, malformed=0.0, extensions=0.3):
+        self.seed = seed
+        self.malformed = malformed
+        self.extensions = extensions
+        self._panels = self._make_panels()
+
+    @staticmethod
+    def _make_panels():
+        "Precompute the descriptors that only depend on the mode and the size"
+        panels = []
+        for mode in COMMON_MODES:
+            timing = encode.make_timing(*mode)
+            limits = encode.range_limits_descriptor(RangeLimits(
+                min_v_rate=24, max_v_rate=mode.refresh_rate + 1, min_h_rate=15,
+                max_h_rate=timing.pixel_clock // (timing.h_active + timing.h_blanking) + 1,
+                max_pixel_clock=timing.pixel_clock))
+            for diagonal in DIAGONALS:
+                h_mm, v_mm = _panel(mode, diagonal)
+                dtd = encode.encode_detailed_timing(
+                    timing._replace(h_image_size=h_mm, v_image_size=v_mm))
+                panels.append((mode, dtd, limits, h_mm // 10, v_mm // 10))
+        return panels
+
+    def _cta_block(self, rng):
+        vics = rng.sample(_VICS, rng.randrange(1, 8))
+        lpcm = struct.pack('3B', 0x09, 0x07, 0x07)    # 2 channels, 32-48 kHz, 16-20 bit
+        blocks = [encode.video_data_block(vics, native=vics[:1]),
+                  encode.audio_data_block([lpcm])]
+        timings = [encode.make_timing(1280, 720, 60)][:rng.randrange(2)]
+        return encode.cta_extension(blocks, timings)
+
+    def _valid(self, rng, i):
+        mode, dtd, limits, h_cm, v_cm = rng.choice(self._panels)
+        letters = ''.join(rng.choice(_LETTERS) for _ in range(3))
+        name = '{}{:04X}'.format(letters, rng.getrandbits(16))
+        descriptors = [dtd, encode.text_descriptor('name', name), limits]
+        if rng.random() < 0.5:
+            serial = '{:010d}'.format(i)
+            descriptors.append(encode.text_descriptor('serial_no', serial))
+        established = [x for x in ESTABLISHED_TIMINGS[:11] if x and rng.random() < 0.5]
+        standard = rng.sample(_EXTRA_STANDARD, rng.randrange(0, 9))
+        extensions = []
+        if rng.random() < self.extensions:
+            extensions.append(self._cta_block(rng))
+        return encode.encode_edid(
+            manufacturer_id=letters,
+            product_code=rng.getrandbits(16),
+            serial_number=rng.getrandbits(32) if rng.random() < 0.8 else 0,
+            manufacture_week=rng.randrange(0, 54),
+            manufacture_year=rng.randrange(1995, 2027),
+            edid_revision=rng.choice((3, 3, 4)),
+            horizontal_size=h_cm,
+            vertical_size=v_cm,
+            descriptors=descriptors,
+            established_timings=established,
+            standard_timings=standard,
+            extensions=extensions,
+        )
+
+    def _malform(self, rng, edid, defect):
+        blob = bytearray(edid)
+        if defect == 'bad_checksum':
+            pos = rng.randrange(8, len(blob) - 1)
+            blob[pos] ^= rng.randrange(1, 256)
+        elif defect == 'truncated':
+            del blob[rng.randrange(8, len(blob)):]
+        elif defect == 'missing_extension':
+            blob[126] += rng.randrange(1, 4)
+            blob[:BLOCK_SIZE] = encode.with_checksum(blob[:BLOCK_SIZE])
+        elif defect == 'bad_header':
+            blob[rng.randrange(8)] ^= rng.randrange(1, 256)
+        elif defect == 'junk':
+            blob = bytearray(rng.getrandbits(8) for _ in range(rng.randrange(1, 2 * BLOCK_SIZE)))
+        elif defect == 'garbage_descriptor':
+            pos = 54 + 18 * rng.randrange(4)
+            blob[pos : pos+18] = bytearray(rng.getrandbits(8) for _ in range(18))
+            blob[:BLOCK_SIZE] = encode.with_checksum(blob[:BLOCK_SIZE])
+        return bytes(blob)
+
+    def generate(self, count):
+        "Yield count (edid, defect) pairs; defect is None or one of MALFORMATIONS"
+        rng = random.Random(self.seed)
+        for i in range(count):
+            edid = self._valid(rng, i)
+            defect = None
+            if self.malformed and rng.random() < self.malformed:
+                defect = rng.choice(MALFORMATIONS)
+                edid = self._malform(rng, edid, defect)
+            yield edid, defect
+
+    def write(self, target, count, buffer_size=1 << 20):
+        """Write count EDIDs to target, a path or a binary file object.
+
+        Paths ending in .gz are gzip-compressed. Returns a Counter of the
+        defects, with None counting the valid EDIDs.
+        """
+        if hasattr(target, 'write'):
+            return self._write(target, count, buffer_size)
+        if target.endswith('.gz'):
+            import gzip
+            opener = gzip.open
+        else:
+            opener = open
+        with opener(target, 'wb') as fobj:
+            return self._write(fobj, count, buffer_size)
+
+    def _write(self, fobj, count, buffer_size):
+        defects = collections.Counter()
+        chunk, size = [], 0
+        for edid, defect in self.generate(count):
+            defects[defect] += 1
+            chunk.append(edid)
+            size += len(edid)
+            if size >= buffer_size:
+                fobj.write(b''.join(chunk))
+                chunk, size = [], 0
+        fobj.write(b''.join(chunk))
+        return defects
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m edider.corpus', description='Write a synthetic EDID corpus')
+    parser.add_argument('output', help="file to write, compressed if it ends in .gz; - for stdout")
+    parser.add_argument('-n', '--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--malformed', type=float, default=0.0,
+                        help='fraction of malformed EDIDs (default: 0)')
+    parser.add_argument('--extensions', type=float, default=0.3,
+                        help='fraction of EDIDs with a CTA-861 extension (default: 0.3)')
+    args = parser.parse_args(argv)
+    gen = CorpusGenerator(args.seed, args.malformed, args.extensions)
+    target = args.output
+    if target == '-':
+        target = getattr(sys.stdout, 'buffer', sys.stdout)
+    defects = gen.write(target, args.count)
+    for defect, n in sorted(defects.items(), key=lambda x: '{}'.format(x[0])):
+        print('{:<20} {}'.format(defect or 'valid', n), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
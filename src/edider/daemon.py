@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A long-running monitor server and its client.
+
+The server (``edider serve``) keeps one backend session open and an
+up-to-date list of the monitors: with X11 it follows the RandR
+notifications, with DRM it re-reads sysfs at most once per interval.
+It answers on a Unix socket; the client sends ``monitors\\n`` and reads a
+JSON document until the server closes the connection.
+
+import edider.daemon
+monitors = edider.daemon.get_monitors()   # enumerates directly without a server
+"""
+import binascii
+import errno
+import os
+import select
+import socket
+import time
+
+from edider.parser import EDIDMonitor, Geometry, Mode
+
+PROTOCOL_VERSION = 1
+SERVED_FIELDS = ('output_name', 'status', 'is_primary', 'geometry', 'current_mode',
+                 'width_in_pixels', 'height_in_pixels')
+
+def default_socket_path():
+    """$EDIDER_SOCKET, else one socket per X display in $XDG_RUNTIME_DIR
+    (or /tmp), e.g. /run/user/1000/edider-1000-0.sock for DISPLAY=:0"""
+    path = os.environ.get('EDIDER_SOCKET')
+    if path:
+        return path
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    display = os.environ.get('DISPLAY', '').lstrip(':').replace('/', '_') or 'none'
+    return os.path.join(directory, 'edider-{}-{}.sock'.format(os.getuid(), display))
+
+
+class ServedMonitor(EDIDMonitor):
+    "A monitor as the server described it; it never touches a backend"
+    def __init__(self, row):
+        edid = binascii.unhexlify(row.get('edid', '').encode('ascii'))
+        super(ServedMonitor, self).__init__(edid, row.get('output_name', ''))
+        self._row = row
+        if row.get('width_in_pixels') is not None:
+            self._width_in_pixels = row['width_in_pixels']
+            self._height_in_pixels = row['height_in_pixels']
+
+    @property
+    def backend(self):
+        return self._row.get('backend')
+
+    @property
+    def status(self):
+        return self._row.get('status')
+
+    @property
+    def is_primary(self):
+        return self._row.get('is_primary')
+
+    @property
+    def geometry(self):
+        geometry = self._row.get('geometry')
+        if geometry is None:
+            return None
+        return Geometry(**geometry)
+
+    @property
+    def current_mode(self):
+        mode = self._row.get('current_mode')
+        if mode is None:
+            return None
+        return Mode(**mode)
+
+
+def _row(monitor, backend):
+    row = {'backend': backend, 'edid': binascii.hexlify(monitor.edid).decode('ascii')}
+    for name in SERVED_FIELDS:
+        try:
+            value = getattr(monitor, name)
+        except (AttributeError, NotImplementedError):
+            continue
+        if hasattr(value, '_asdict'):
+            value = dict(value._asdict())
+        row[name] = value
+    return row
+
+
+class MonitorServer(object):
+    """Serve the monitors of one backend on the Unix socket at path.
+
+    backend is 'x11', 'drm' or None to choose like edider.get_monitors
+    (see edider.select_backend). The DRM monitors are re-read when a query
+    comes more than drm_interval seconds after the last read.
+    """
+    def __init__(self, path=None, backend=None, drm_interval=1.0):
+        from edider import select_backend
+        self.path = path or default_socket_path()
+        self.drm_interval = drm_interval
+        self.watcher = None
+        self._payload = None
+        self._built = 0.0
+        self._running = False
+        self.backend = select_backend(backend)
+        self.sock = self._listen()
+        if self.backend == 'x11':
+            try:
+                self.watcher = self._watch()
+            except Exception:
+                self.close()
+                raise
+
+    @staticmethod
+    def _watch():
+        "A MonitorWatcher on a new X11 session of its own"
+        from edider.x11read import MonitorWatcher, X11Session
+        session = X11Session()
+        try:
+            return MonitorWatcher(session)
+        except Exception:
+            session.close()
+            raise
+
+    def _listen(self):
+        if os.path.exists(self.path):
+            try:
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                probe.connect(self.path)
+            except socket.error:    # a stale socket left by a dead server
+                os.unlink(self.path)
+            else:
+                probe.close()
+                raise RuntimeError('An edider server already listens on ' + self.path)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        sock.listen(16)
+        return sock
+
+    def _monitors(self):
+        if self.watcher is not None:
+            return [self.watcher.monitors[x] for x in sorted(self.watcher.monitors)]
+        from edider import drmread
+        return drmread.get_monitors()
+
+    def payload(self):
+        "The encoded answer to a monitors query, rebuilt only when stale"
+        stale = self._payload is None or (
+            self.watcher is None and time.time() - self._built > self.drm_interval)
+        if stale:
+            import json
+            doc = {
+                'version': PROTOCOL_VERSION,
+                'monitors': [_row(x, self.backend) for x in self._monitors()],
+            }
+            self._payload = json.dumps(doc, separators=(',', ':')).encode('utf-8')
+            self._built = time.time()
+        return self._payload
+
+    def update(self):
+        "Apply the RandR notifications that have arrived"
+        if self.watcher is None:
+            return
+        change = self.watcher.pending()
+        if change is not None:
+            self.watcher.refresh(list(change.added) + list(change.changed))
+            self._payload = None
+
+    def handle(self, conn):
+        conn.settimeout(1.0)
+        try:
+            request = conn.recv(64).strip()
+            if request == b'monitors':
+                conn.sendall(self.payload())
+            elif request == b'ping':
+                conn.sendall(b'pong')
+        except socket.error:
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self, poll_interval=1.0):
+        "Answer queries until stop() is called"
+        self._running = True
+        readers = [self.sock]
+        if self.watcher is not None:
+            readers.append(self.watcher)
+        while self._running:
+            self.update()
+            try:
+                ready = select.select(readers, [], [], poll_interval)[0]
+            except (select.error, OSError) as err:
+                if err.args and err.args[0] == errno.EINTR:
+                    continue
+                raise
+            if self.sock in ready:
+                conn = self.sock.accept()[0]
+                self.update()
+                self.handle(conn)
+
+    def stop(self):
+        self._running = False
+
+    def close(self):
+        self.stop()
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def serve(path=None, backend=None):
+    "Run a MonitorServer until interrupted"
+    with MonitorServer(path, backend) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+def query(path=None, timeout=1.0):
+    """Ask the server at path for its monitors; return a list of ServedMonitor.
+
+    Raises socket.error if no server answers and ValueError if the answer
+    cannot be read.
+    """
+    import json
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or default_socket_path())
+        sock.sendall(b'monitors\n')
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        sock.close()
+    doc = json.loads(b''.join(chunks).decode('utf-8'))
+    if doc.get('version') != PROTOCOL_VERSION:
+        raise ValueError('Unsupported edider server protocol {!r}'.format(doc.get('version')))
+    return [ServedMonitor(row) for row in doc['monitors']]
+
+def get_monitors(path=None, timeout=1.0, backend=None):
+    """Return the monitors from the edider server, or if none is running
+    from edider.get_monitors(backend, snapshot=True)."""
+    try:
+        return query(path, timeout)
+    except (socket.error, ValueError):
+        import edider
+        return edider.get_monitors(backend, snapshot=True)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Read monitor information straight from the kernel's DRM sysfs tree.
+
+Nothing but plain file reads is needed, so this works without an X server:
+on headless machines, under Wayland or early during boot.
+"""
+import os
+
+from edider import instrument
+from edider.parser import BaseMonitor
+
+SYSFS_DRM = '/sys/class/drm'
+
+def _read_file(path, mode='r'):
+    start = instrument.clock()
+    with open(path, mode) as fobj:
+        data = fobj.read()
+    if instrument.active:
+        directory, name = os.path.split(path)
+        instrument.emit('request', name, os.path.basename(directory),
+                        instrument.clock() - start, len(data))
+    return data
+
+def get_connected_connectors(sysfs_root=SYSFS_DRM):
+    "Yield the sysfs name (e.g. card0-HDMI-A-1) of each connected connector"
+    try:
+        names = sorted(os.listdir(sysfs_root))
+    except OSError:
+        return
+    for name in names:
+        try:
+            status = _read_file(os.path.join(sysfs_root, name, 'status'))
+        except (IOError, OSError):  # card0, renderD128, version, ...
+            continue
+        if status.strip() == 'connected':
+            yield name
+
+
+class DRMMonitor(BaseMonitor):
+    def __init__(self, connector, sysfs_root=SYSFS_DRM, snapshot=False):
+        """connector is the name of the connector's directory in sysfs_root
+
+        With snapshot=True everything is read at once and property reads
+        make no further file reads until refresh().
+        """
+        self._id = connector
+        self._path = os.path.join(sysfs_root, connector)
+        self._snapshot = snapshot
+        if snapshot:
+            self._pin()
+
+    def _pin(self):
+        self._status = self._read_status()
+        self.edid
+        self.width_in_pixels
+
+    def _read(self, name, mode='r'):
+        return _read_file(os.path.join(self._path, name), mode)
+
+    def _get_output_edid(self):
+        return bytes(self._read('edid', 'rb'))
+
+    def _dflt_resolution(self):
+        "Without an EDID timing use the kernel's first mode, e.g. 1920x1080"
+        if self.preferred_timing is not None:
+            return super(DRMMonitor, self)._dflt_resolution()
+        try:
+            mode = self._read('modes').split()[0]
+            width, height = mode.split('x')
+            width, height = int(width), int(''.join(x for x in height if x.isdigit()))
+        except (IOError, OSError, IndexError, ValueError):
+            width, height = 0, 0
+        self._width_in_pixels, self._height_in_pixels = width, height
+
+    @property
+    def drm_connector(self):
+        return self._id
+
+    @property
+    def output_name(self):
+        "The connector name without its card prefix, e.g. HDMI-A-1"
+        return self._id.split('-', 1)[-1]
+
+    def refresh(self):
+        super(DRMMonitor, self).refresh()
+        if self._snapshot:
+            self._pin()
+        return self
+
+    @property
+    def status(self):
+        try:
+            return self._status
+        except AttributeError:
+            return self._read_status()
+
+    def _read_status(self):
+        try:
+            enabled = self._read('enabled').strip()
+        except (IOError, OSError):
+            return 'off'
+        if enabled == 'enabled':
+            return 'on'
+        return 'off'
+
+
+def get_monitors(sysfs_root=SYSFS_DRM, snapshot=False):
+    """Return a DRMMonitor instance for each connected computer monitor.
+
+    With snapshot=True the monitors are read up-front (see DRMMonitor).
+    """
+    return [DRMMonitor(x, sysfs_root, snapshot)
+            for x in get_connected_connectors(sysfs_root)]
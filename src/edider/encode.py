@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Build EDIDs from field values: the inverse of edider.parser.
+
+Every block gets a valid checksum, so the result decodes like an EDID
+read from a monitor:
+
+edid = encode_edid(
+    manufacturer_id='DEL', product_code=0xa0b1, serial_number=12345,
+    descriptors=[make_timing(1920, 1080, 60, 527, 296),
+                 text_descriptor('name', 'U2415')],
+    extensions=[cta_extension([video_data_block([16, 4, 3])])],
+)
+assert EDIDMonitor(edid).name == 'U2415'
+"""
+import struct
+
+from edider.parser import (_BASE_BLOCK, _STD_HEIGHTS, _STD_HEIGHTS_PRE_1_3, BLOCK_SIZE,
+                           DESCRIPTOR_TYPES, ESTABLISHED_TIMINGS, DetailedTiming,
+                           EDIDDescriptor)
+
+HEADER = b'\x00\xff\xff\xff\xff\xff\xff\x00'
+DESCRIPTOR_SIZE = 18
+# Chromaticity coordinates of sRGB primaries and a D65 white point
+SRGB_CHROMATICITY = b'\xee\x91\xa3\x54\x4c\x99\x26\x0f\x50\x54'
+
+_DESCRIPTOR_TAGS = dict((v, k) for k, v in DESCRIPTOR_TYPES.items())
+_ESTABLISHED_BITS = dict((mode, i) for i, mode in enumerate(ESTABLISHED_TIMINGS) if mode)
+_DUMMY_TAG = 0x10
+
+def with_checksum(block):
+    "Pad block to 127 bytes and append the byte that makes it sum to 0 mod 256"
+    block = bytearray(block[:BLOCK_SIZE - 1])
+    block.extend(bytearray(BLOCK_SIZE - 1 - len(block)))
+    block.append(-sum(block) % 256)
+    return bytes(block)
+
+def encode_manufacturer(pnp_id):
+    "The 2 big-endian bytes of a three-letter PNP ID such as 'DEL'"
+    from edider.pnp import pnp_code
+    return struct.pack('>H', pnp_code(pnp_id))
+
+def make_timing(width, height, refresh_rate, h_image_size=0, v_image_size=0):
+    """A progressive DetailedTiming for a mode, with reduced blanking
+
+    The blanking follows CVT reduced blanking closely enough for the
+    refresh rate to round to refresh_rate; it is not a CVT calculator.
+    """
+    line_fraction = 460e-6 * refresh_rate   # at least 460 us of vertical blanking
+    v_blanking = max(int(height * line_fraction / (1 - line_fraction)) + 1, 7)
+    h_total, v_total = width + 160, height + v_blanking
+    pixel_clock = 10 * int(round(h_total * v_total * refresh_rate / 10000.0))
+    return DetailedTiming(
+        pixel_clock=pixel_clock, h_active=width, h_blanking=160,
+        v_active=height, v_blanking=v_blanking, h_sync_offset=48, h_sync_width=32,
+        v_sync_offset=3, v_sync_width=min(v_blanking - 3, 10),
+        h_image_size=h_image_size, v_image_size=v_image_size,
+        h_border=0, v_border=0, features=0x1e,
+    )
+
+def encode_detailed_timing(timing):
+    "The 18 bytes of a DetailedTiming; the inverse of parse_detailed_timing"
+    t = timing
+    return struct.pack(
+        '<H16B',
+        t.pixel_clock // 10,
+        t.h_active & 0xff, t.h_blanking & 0xff,
+        (t.h_active >> 8) << 4 | t.h_blanking >> 8,
+        t.v_active & 0xff, t.v_blanking & 0xff,
+        (t.v_active >> 8) << 4 | t.v_blanking >> 8,
+        t.h_sync_offset & 0xff, t.h_sync_width & 0xff,
+        (t.v_sync_offset & 0x0f) << 4 | t.v_sync_width & 0x0f,
+        (t.h_sync_offset >> 8) << 6 | (t.h_sync_width >> 8) << 4
+        | (t.v_sync_offset >> 4) << 2 | t.v_sync_width >> 4,
+        t.h_image_size & 0xff, t.v_image_size & 0xff,
+        (t.h_image_size >> 8) << 4 | t.v_image_size >> 8,
+        t.h_border, t.v_border, t.features,
+    )
+
+def _display_descriptor(tag, payload, flags=0):
+    return b'\x00\x00\x00' + struct.pack('BB', tag, flags) + payload
+
+def text_descriptor(dtype, text):
+    "A 'name', 'serial_no' or 'text' descriptor of up to 13 ASCII characters"
+    data = text.encode('ascii')
+    if len(data) > 13:
+        raise ValueError('{!r} is longer than 13 characters'.format(text))
+    if len(data) < 13:
+        data += b'\n' + b' ' * (12 - len(data))
+    return _display_descriptor(_DESCRIPTOR_TAGS[dtype], data)
+
+def range_limits_descriptor(limits):
+    "A display range limits descriptor for a RangeLimits; rates over 255 use EDID 1.4 offsets"
+    flags = 0
+    values = list(limits[:4])
+    for i, (low, high) in enumerate(((0, 1), (2, 3))):
+        if values[high] > 255:
+            flags |= 0x02 << 2*i
+            values[high] -= 255
+            if values[low] > 255:
+                flags |= 0x01 << 2*i
+                values[low] -= 255
+    if not all(0 <= x <= 255 for x in values):
+        raise ValueError('Range limits out of range: {!r}'.format(limits))
+    clock = -(-limits.max_pixel_clock // 10000)     # in 10 MHz, rounded up
+    payload = struct.pack('5B', *(values + [clock])) + b'\x00\x0a' + b' ' * 6
+    return _display_descriptor(_DESCRIPTOR_TAGS['mon_range_lim'], payload, flags)
+
+def encode_standard_timing(mode, heights=_STD_HEIGHTS):
+    "The 2 bytes of a standard timing; raises ValueError if mode has none"
+    first = mode.width // 8 - 31
+    refresh = int(mode.refresh_rate) - 60
+    if mode.width % 8 or not 2 <= first <= 255 or not 0 <= refresh <= 63:
+        raise ValueError('{!r} has no standard timing'.format(mode))
+    for aspect, column in enumerate(heights):
+        if column[first] == mode.height:
+            return struct.pack('BB', first, aspect << 6 | refresh)
+    raise ValueError('{!r} has no standard timing'.format(mode))
+
+def encode_standard_timings(modes, count=8, heights=_STD_HEIGHTS):
+    "count standard timings, the slots after modes marked unused"
+    if len(modes) > count:
+        raise ValueError('At most {} standard timings fit'.format(count))
+    return (b''.join(encode_standard_timing(x, heights) for x in modes)
+            + b'\x01\x01' * (count - len(modes)))
+
+def std_timing_descriptor(modes):
+    "A descriptor of up to 6 more standard timings"
+    payload = encode_standard_timings(modes, 6) + b'\x0a'
+    return _display_descriptor(_DESCRIPTOR_TAGS['std_timing'], payload)
+
+def encode_established_timings(modes):
+    "The 3-byte bitmap of ESTABLISHED_TIMINGS modes"
+    bitmap = bytearray(3)
+    for mode in modes:
+        try:
+            bit = _ESTABLISHED_BITS[mode]
+        except KeyError:
+            raise ValueError('{!r} is not an established timing'.format(mode))
+        bitmap[bit // 8] |= 0x80 >> (bit % 8)
+    return bytes(bitmap)
+
+def dummy_descriptor():
+    return _display_descriptor(_DUMMY_TAG, bytes(bytearray(13)))
+
+def encode_descriptor(desc):
+    "The 18 bytes of a descriptor: bytes as they are, or an EDIDDescriptor"
+    if isinstance(desc, DetailedTiming):
+        return encode_detailed_timing(desc)
+    if not isinstance(desc, EDIDDescriptor):
+        desc = bytes(desc)
+        if len(desc) != DESCRIPTOR_SIZE:
+            raise ValueError('A descriptor is {} bytes, got {}'.format(DESCRIPTOR_SIZE, len(desc)))
+        return desc
+    if desc.dtype == 'detailed_timing':
+        return encode_detailed_timing(desc.value)
+    if desc.dtype in ('name', 'serial_no', 'text'):
+        return text_descriptor(desc.dtype, desc.value)
+    if desc.dtype == 'mon_range_lim':
+        return range_limits_descriptor(desc.value)
+    if desc.dtype == 'std_timing':
+        return std_timing_descriptor(desc.value)
+    raise ValueError('Cannot encode a {!r} descriptor from its value'.format(desc.dtype))
+
+
+def cta_data_block(tag, payload):
+    "One CTA-861 data block: a tag (1-7) and up to 31 bytes of payload"
+    if len(payload) > 31:
+        raise ValueError('A CTA data block holds at most 31 bytes')
+    return struct.pack('B', tag << 5 | len(payload)) + bytes(payload)
+
+def video_data_block(vics, native=()):
+    "A CTA video data block of the VICs; those in native are flagged native"
+    return cta_data_block(2, bytearray(
+        x | 0x80 if x in native and x < 65 else x for x in vics))
+
+def audio_data_block(descriptors):
+    "A CTA audio data block of 3-byte short audio descriptors"
+    return cta_data_block(1, b''.join(descriptors))
+
+def cta_extension(data_blocks=(), detailed_timings=(), flags=0x70, revision=3):
+    """A CTA-861 extension block.
+
+    data_blocks are encoded data blocks (see cta_data_block) or
+    CTADataBlocks; detailed_timings are DetailedTimings. flags is byte 3:
+    underscan, basic audio, YCbCr 4:4:4 and 4:2:2 support and the number
+    of native detailed timings.
+    """
+    blocks = b''.join(
+        cta_data_block(x.tag, x.payload) if hasattr(x, 'payload') else bytes(x)
+        for x in data_blocks)
+    dtds = b''.join(encode_detailed_timing(x) for x in detailed_timings)
+    if 4 + len(blocks) + len(dtds) > BLOCK_SIZE - 1:
+        raise ValueError('The data blocks and timings do not fit in one block')
+    header = struct.pack('4B', 0x02, revision, 4 + len(blocks), flags)
+    return with_checksum(header + blocks + dtds)
+
+def encode_edid(manufacturer_id='EDI', product_code=0, serial_number=0,
+                manufacture_week=1, manufacture_year=2017, edid_version=1,
+                edid_revision=3, horizontal_size=0, vertical_size=0,
+                descriptors=(), established_timings=(), standard_timings=(),
+                extensions=(), video_input=0x80, gamma=2.2, features=0x0a,
+                chromaticity=SRGB_CHROMATICITY):
+    """Return the bytes of an EDID with these field values.
+
+    The first arguments are the fields of EDIDRecord. descriptors are up
+    to four descriptors (see encode_descriptor), the rest is filled with
+    dummy descriptors. established_timings and standard_timings are Modes.
+    extensions are the extension blocks; each is padded to 128 bytes and
+    gets its checksum, and their number is written to byte 126.
+    """
+    if len(descriptors) > 4:
+        raise ValueError('The base block holds 4 descriptors')
+    descs = [encode_descriptor(x) for x in descriptors]
+    descs.extend(dummy_descriptor() for _ in range(4 - len(descs)))
+    extensions = [with_checksum(x) for x in extensions]
+    heights = _STD_HEIGHTS
+    if (edid_version, edid_revision) < (1, 3):
+        heights = _STD_HEIGHTS_PRE_1_3
+    block = _BASE_BLOCK.pack(
+        HEADER, encode_manufacturer(manufacturer_id), product_code, serial_number,
+        manufacture_week, manufacture_year - 1990, edid_version, edid_revision,
+        video_input, horizontal_size, vertical_size,
+        int(round(gamma * 100)) - 100 if gamma else 0xff, features, chromaticity,
+        encode_established_timings(established_timings),
+        encode_standard_timings(standard_timings, heights=heights),
+        descs[0], descs[1], descs[2], descs[3], len(extensions), 0,
+    )
+    return with_checksum(block) + b''.join(extensions)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Decoding of the 128-byte extension blocks that follow the EDID base block.
+
+CTA-861 blocks (HDMI/DisplayPort audio, video and HDR capabilities) are
+decoded into their data blocks, DisplayID blocks into their sections;
+any other block is exposed raw.
+"""
+from collections import namedtuple
+
+from edider.parser import BLOCK_SIZE, parse_detailed_timing
+
+CTA_TAG = 0x02
+DISPLAYID_TAG = 0x70
+
+CTA_DATA_BLOCK_TYPES = {
+    1: 'audio',
+    2: 'video',
+    3: 'vendor_specific',
+    4: 'speaker_allocation',
+    5: 'vesa_dtc',
+    7: 'extended',
+}
+CTA_EXTENDED_TYPES = {
+    0: 'video_capability',
+    1: 'vendor_specific_video',
+    5: 'colorimetry',
+    6: 'hdr_static_metadata',
+    7: 'hdr_dynamic_metadata',
+    13: 'video_format_preference',
+    14: 'ycbcr420_video',
+    15: 'ycbcr420_capability_map',
+    17: 'vendor_specific_audio',
+    18: 'room_configuration',
+    19: 'speaker_location',
+    32: 'infoframe',
+}
+AUDIO_FORMATS = {
+    1: 'LPCM',
+    2: 'AC-3',
+    3: 'MPEG-1',
+    4: 'MP3',
+    5: 'MPEG-2',
+    6: 'AAC LC',
+    7: 'DTS',
+    8: 'ATRAC',
+    9: 'DSD',
+    10: 'E-AC-3',
+    11: 'DTS-HD',
+    12: 'MAT',
+    13: 'DST',
+    14: 'WMA Pro',
+    15: 'extended',
+}
+_SAMPLE_RATES = (32000, 44100, 48000, 88200, 96000, 176400, 192000)
+_LPCM_BIT_DEPTHS = (16, 20, 24)
+
+def _checksum_ok(block):
+    return sum(bytearray(block)) % 256 == 0
+
+
+CTADataBlock = namedtuple('CTADataBlock', ('dtype', 'tag', 'extended_tag', 'payload'))
+ShortAudioDescriptor = namedtuple(
+    'ShortAudioDescriptor',
+    ('format', 'channels', 'sample_rates', 'bit_depths', 'max_bitrate'),
+)
+ShortVideoDescriptor = namedtuple('ShortVideoDescriptor', ('vic', 'native'))
+VendorBlock = namedtuple('VendorBlock', ('oui', 'payload'))
+
+def parse_audio_descriptor(sad):
+    "Decode a 3-byte CTA short audio descriptor"
+    b0, b1, b2 = bytearray(sad)
+    code = (b0 >> 3) & 0x0f
+    rates = tuple(r for i, r in enumerate(_SAMPLE_RATES) if b1 & (1 << i))
+    bit_depths, max_bitrate = (), None
+    if code == 1:
+        bit_depths = tuple(d for i, d in enumerate(_LPCM_BIT_DEPTHS) if b2 & (1 << i))
+    elif 2 <= code <= 8:
+        max_bitrate = 8 * b2    # in kbit/s
+    return ShortAudioDescriptor(
+        AUDIO_FORMATS.get(code, '{}'.format(code)),
+        (b0 & 0x07) + 1,
+        rates,
+        bit_depths,
+        max_bitrate,
+    )
+
+def parse_video_descriptor(svd):
+    "Decode a 1-byte CTA short video descriptor (an int)"
+    if 129 <= svd <= 192:
+        return ShortVideoDescriptor(svd & 0x7f, True)
+    return ShortVideoDescriptor(svd, False)
+
+
+class ExtensionBlock(object):
+    "An extension block of a type edider does not decode."
+    def __init__(self, block):
+        self.raw = block
+        data = bytearray(block)
+        self.tag = data[0]
+        self.revision = data[1]
+
+    @property
+    def checksum_ok(self):
+        return _checksum_ok(self.raw)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        return '{}(tag=0x{:02x}, revision={})'.format(cname, self.tag, self.revision)
+
+
+class CTAExtension(ExtensionBlock):
+    "A CTA-861 extension block; data blocks are only split up when read."
+    def __init__(self, block):
+        super(CTAExtension, self).__init__(block)
+        data = bytearray(block)
+        self._dtd_offset = data[2]
+        flags = data[3]
+        self.underscan = bool(flags & 0x80)
+        self.basic_audio = bool(flags & 0x40)
+        self.ycbcr444 = bool(flags & 0x20)
+        self.ycbcr422 = bool(flags & 0x10)
+        self.native_dtds = flags & 0x0f
+
+    @property
+    def data_blocks(self):
+        try:
+            return self._data_blocks
+        except AttributeError:
+            pass
+        data = bytearray(self.raw)
+        end = self._dtd_offset if self._dtd_offset else 4
+        blocks, pos = [], 4
+        while pos < end:
+            tag, length = data[pos] >> 5, data[pos] & 0x1f
+            payload = bytes(data[pos+1 : pos+1+length])
+            ext_tag = None
+            if tag == 7 and payload:
+                ext_tag = bytearray(payload)[0]
+                dtype = CTA_EXTENDED_TYPES.get(ext_tag, 'extended')
+            else:
+                dtype = CTA_DATA_BLOCK_TYPES.get(tag, '{}'.format(tag))
+            blocks.append(CTADataBlock(dtype, tag, ext_tag, payload))
+            pos += 1 + length
+        self._data_blocks = blocks
+        return blocks
+
+    def _blocks_of(self, dtype):
+        return [x for x in self.data_blocks if x.dtype == dtype]
+
+    @property
+    def audio_descriptors(self):
+        out = []
+        for block in self._blocks_of('audio'):
+            payload = block.payload
+            for i in range(0, len(payload) - 2, 3):
+                out.append(parse_audio_descriptor(payload[i:i+3]))
+        return out
+
+    @property
+    def video_descriptors(self):
+        out = []
+        for block in self._blocks_of('video'):
+            out.extend(parse_video_descriptor(x) for x in bytearray(block.payload))
+        return out
+
+    @property
+    def vendor_blocks(self):
+        out = []
+        for block in self._blocks_of('vendor_specific'):
+            oui = bytearray(block.payload[:3])
+            oui = oui[0] | oui[1] << 8 | oui[2] << 16 if len(oui) == 3 else None
+            out.append(VendorBlock(oui, block.payload[3:]))
+        return out
+
+    @property
+    def detailed_timings(self):
+        "DetailedTiming of each descriptor after the data block collection"
+        out = []
+        if self._dtd_offset < 4:
+            return out
+        for pos in range(self._dtd_offset, BLOCK_SIZE - 18, 18):
+            desc = self.raw[pos : pos+18]
+            if bytearray(desc[:2]) == bytearray(2):   # padding
+                break
+            out.append(parse_detailed_timing(desc))
+        return out
+
+
+DisplayIDDataBlock = namedtuple('DisplayIDDataBlock', ('tag', 'revision', 'payload'))
+
+class DisplayIDExtension(ExtensionBlock):
+    "A DisplayID extension block split into its data blocks."
+    def __init__(self, block):
+        super(DisplayIDExtension, self).__init__(block)
+        data = bytearray(block)
+        self.version = data[1]
+        self.section_length = data[2]
+        self.product_type = data[3]
+
+    @property
+    def data_blocks(self):
+        try:
+            return self._data_blocks
+        except AttributeError:
+            pass
+        data = bytearray(self.raw)
+        end = min(5 + self.section_length, BLOCK_SIZE - 1)
+        blocks, pos = [], 5
+        while pos + 3 <= end:
+            tag, rev, length = data[pos], data[pos+1], data[pos+2]
+            if tag == 0 and length == 0:
+                break
+            blocks.append(DisplayIDDataBlock(tag, rev, bytes(data[pos+3 : pos+3+length])))
+            pos += 3 + length
+        self._data_blocks = blocks
+        return blocks
+
+
+def parse_extension(block):
+    "Decode one 128-byte extension block according to its tag"
+    tag = bytearray(block[:1])[0]
+    if tag == CTA_TAG:
+        return CTAExtension(block)
+    if tag == DISPLAYID_TAG:
+        return DisplayIDExtension(block)
+    return ExtensionBlock(block)
+
+
+class ExtensionBlocks(object):
+    """The extension blocks of an EDID as a read-only sequence.
+
+    A block is only decoded the first time it is indexed.
+    """
+    def __init__(self, edid_bytes, count):
+        self._edid = edid_bytes
+        available = len(edid_bytes) // BLOCK_SIZE - 1
+        self._blocks = [None] * max(0, min(count, available))
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __getitem__(self, i):
+        block = self._blocks[i]
+        if block is None:
+            i = range(len(self._blocks))[i]
+            start = BLOCK_SIZE * (i + 1)
+            block = parse_extension(self._edid[start : start+BLOCK_SIZE])
+            self._blocks[i] = block
+        return block
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        return '{}({} blocks)'.format(cname, len(self))
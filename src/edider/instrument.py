@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Opt-in instrumentation of the backends.
+
+While a hook is installed every backend request, every X connection opened
+and every EDID decode is reported to it as an Event. Without hooks the
+backends only test one module flag per request.
+
+from edider import instrument
+with instrument.counting() as counter:
+    edider.get_monitors(backend='x11')
+for key, stat in sorted(counter.summary().items()):
+    print(key, stat)
+"""
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+clock = getattr(time, 'perf_counter', time.time)
+
+# kind is 'request', 'connect' or 'parse'; name is e.g. 'GetOutputInfo'.
+# output is the X11 output (or DRM connector) the request was about and
+# nbytes the size of the reply, both None when they do not apply.
+Event = namedtuple('Event', ('kind', 'name', 'output', 'duration', 'nbytes'))
+Stat = namedtuple('Stat', ('count', 'total_time', 'max_time', 'nbytes'))
+
+active = False
+_hooks = []
+
+def add_hook(func):
+    "Call func(event) for every Event from now on"
+    global active
+    _hooks.append(func)
+    active = True
+
+def remove_hook(func):
+    global active
+    _hooks.remove(func)
+    active = bool(_hooks)
+
+def emit(kind, name, output=None, duration=0.0, nbytes=None):
+    "Report an Event to the installed hooks"
+    event = Event(kind, name, output, duration, nbytes)
+    for hook in list(_hooks):
+        hook(event)
+
+
+class Counter(object):
+    """A hook that sums up the events per (kind, name).
+
+    Pass it to add_hook, or use counting().
+    """
+    def __init__(self):
+        self._stats = {}
+
+    def __call__(self, event):
+        key = (event.kind, event.name)
+        count, total, longest, nbytes = self._stats.get(key, (0, 0.0, 0.0, 0))
+        self._stats[key] = Stat(
+            count + 1,
+            total + event.duration,
+            max(longest, event.duration),
+            nbytes + (event.nbytes or 0),
+        )
+
+    def summary(self):
+        "A dict of (kind, name) -> Stat"
+        return dict(self._stats)
+
+    def count(self, kind, name=None):
+        "The number of events of kind, or only those called name"
+        return sum(stat.count for (k, n), stat in self._stats.items()
+                   if k == kind and name in (None, n))
+
+    def total_time(self, kind=None):
+        return sum(stat.total_time for (k, _), stat in self._stats.items()
+                   if kind in (None, k))
+
+    def reset(self):
+        self._stats.clear()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        return '{}(requests={}, connections={}, parses={})'.format(
+            cname, self.count('request'), self.count('connect'), self.count('parse'))
+
+
+@contextmanager
+def counting():
+    "Install a Counter for the duration of the with block"
+    counter = Counter()
+    add_hook(counter)
+    try:
+        yield counter
+    finally:
+        remove_hook(counter)
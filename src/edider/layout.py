@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Immutable snapshots of the monitor layout and the differences between them.
+
+old = LayoutSnapshot.from_monitors(edider.get_monitors(snapshot=True))
+...
+new = LayoutSnapshot.from_monitors(edider.get_monitors(snapshot=True))
+if new != old:
+    changes = diff(old, new)
+    print(changes.moved, changes.mode_changed)
+"""
+from collections import namedtuple
+
+# The fingerprint of one monitor. key identifies the monitor across
+# snapshots: the output it is connected to and the digest of its EDID.
+MonitorState = namedtuple(
+    'MonitorState',
+    ('key', 'output_name', 'uuid', 'geometry', 'mode', 'status', 'is_primary'),
+)
+LayoutDiff = namedtuple(
+    'LayoutDiff',
+    ('added', 'removed', 'moved', 'mode_changed', 'status_changed', 'primary_changed',
+     'edid_changed'),
+)
+
+def _get(monitor, name):
+    "A property of monitor, or None if its backend does not have it"
+    try:
+        return getattr(monitor, name)
+    except (AttributeError, NotImplementedError):
+        return None
+
+def monitor_state(monitor):
+    "The MonitorState of a BaseMonitor; read before the backend changes"
+    output_name = _get(monitor, 'output_name')
+    uuid = monitor.uuid
+    return MonitorState(
+        (output_name, uuid),
+        output_name,
+        uuid,
+        _get(monitor, 'geometry'),
+        _get(monitor, 'current_mode'),
+        _get(monitor, 'status'),
+        _get(monitor, 'is_primary'),
+    )
+
+
+class LayoutSnapshot(object):
+    """The MonitorStates of a set of monitors, by their key.
+
+    Snapshots are immutable and hashable; two snapshots are equal when
+    their monitors have the same states.
+    """
+    __slots__ = ('_states', '_hash')
+
+    def __init__(self, states=()):
+        states = dict((state.key, state) for state in states)
+        object.__setattr__(self, '_states', states)
+        object.__setattr__(self, '_hash', hash(frozenset(states.values())))
+
+    @classmethod
+    def from_monitors(cls, monitors):
+        return cls(monitor_state(x) for x in monitors)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable'.format(self.__class__.__name__))
+
+    def __getitem__(self, key):
+        return self._states[key]
+
+    def __contains__(self, key):
+        return key in self._states
+
+    def __iter__(self):
+        return iter(self._states.values())
+
+    def __len__(self):
+        return len(self._states)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, LayoutSnapshot):
+            return NotImplemented
+        return self._hash == other._hash and self._states == other._states
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self._states.values()),))
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        names = sorted('{}'.format(x.output_name) for x in self)
+        return '{}({})'.format(cname, ', '.join(names))
+
+
+def diff(old, new):
+    """Compare two LayoutSnapshots.
+
+    Returns a LayoutDiff. added and removed are lists of MonitorStates;
+    the other fields are lists of (old_state, new_state) pairs of the
+    monitors present in both whose geometry, mode, status or primary flag
+    differ. A monitor whose output shows another EDID than before is in
+    edid_changed instead of added and removed. The time taken is linear
+    in the number of monitors.
+    """
+    changes = LayoutDiff([], [], [], [], [], [], [])
+    if old == new:
+        return changes
+    gone = [x for x in old if x.key not in new]
+    gone_by_output = dict((x.output_name, x) for x in gone if x.output_name is not None)
+    for state in new:
+        before = old._states.get(state.key)
+        if before is None:
+            before = gone_by_output.pop(state.output_name, None)
+            if before is None:
+                changes.added.append(state)
+            else:
+                changes.edid_changed.append((before, state))
+            continue
+        if before == state:
+            continue
+        pair = (before, state)
+        if before.geometry != state.geometry:
+            changes.moved.append(pair)
+        if before.mode != state.mode:
+            changes.mode_changed.append(pair)
+        if before.status != state.status:
+            changes.status_changed.append(pair)
+        if before.is_primary != state.is_primary:
+            changes.primary_changed.append(pair)
+    changes.removed.extend(
+        x for x in gone if x.output_name is None or x.output_name in gone_by_output)
+    return changes
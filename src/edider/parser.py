@@ -1,50 +1,161 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import string
+import binascii
 import struct
-import sys
-try:
-    from itertools import zip_longest
-except ImportError:             # for python2 compatibility
-    from itertools import izip_longest as zip_longest
 from collections import namedtuple
-from builtins import bytes
 
-def _grouper(iterable, n, fillvalue=None):
-    "Collect data into fixed-length chunks or blocks"
-    args = [iter(iterable)] * n
-    return zip_longest(*args, fillvalue=fillvalue)
+from edider import cache as _cache
 
-def _bytes_to_bits(bstr):
-    return ['{:08b}'.format(x) for x in bstr]
+_PRINTABLE = frozenset([chr(x) for x in range(32, 127)] + list('\t\n\r\x0b\x0c'))
 
 def _bytes_to_printable(bstr):
     bstr = bstr.decode('ascii', errors='ignore')
-    out = ''.join([x for x in bstr if x in string.printable])
+    out = ''.join([x for x in bstr if x in _PRINTABLE])
     return out.strip()
 
 
+_DETAILED_TIMING = struct.Struct('<H16B')
+
+class DetailedTiming(namedtuple('DetailedTiming', (
+        'pixel_clock', 'h_active', 'h_blanking', 'v_active', 'v_blanking',
+        'h_sync_offset', 'h_sync_width', 'v_sync_offset', 'v_sync_width',
+        'h_image_size', 'v_image_size', 'h_border', 'v_border', 'features'))):
+    """A decoded 18-byte detailed timing descriptor.
+
+    pixel_clock is in kHz, the image sizes in mm and everything else in
+    pixels or lines. For interlaced modes v_active counts the lines of
+    one field.
+    """
+    __slots__ = ()
+
+    @property
+    def interlaced(self):
+        return bool(self.features & 0x80)
+
+    @property
+    def width(self):
+        return self.h_active
+
+    @property
+    def height(self):
+        if self.interlaced:
+            return 2 * self.v_active
+        return self.v_active
+
+    @property
+    def refresh_rate(self):
+        "Vertical refresh rate in Hz (the field rate for interlaced modes)"
+        total = (self.h_active + self.h_blanking) * (self.v_active + self.v_blanking)
+        if not total:
+            return 0.0
+        return 1000.0 * self.pixel_clock / total
+
+def parse_detailed_timing(desc):
+    "Decode the detailed timing descriptor desc to a DetailedTiming"
+    (clock, h_act, h_blank, h_hi, v_act, v_blank, v_hi, hs_off, hs_w, vs,
+     s_hi, h_mm, v_mm, mm_hi, h_border, v_border, features) = _DETAILED_TIMING.unpack(desc)
+    return DetailedTiming(
+        pixel_clock=10 * clock,
+        h_active=h_act | (h_hi & 0xf0) << 4,
+        h_blanking=h_blank | (h_hi & 0x0f) << 8,
+        v_active=v_act | (v_hi & 0xf0) << 4,
+        v_blanking=v_blank | (v_hi & 0x0f) << 8,
+        h_sync_offset=hs_off | (s_hi & 0xc0) << 2,
+        h_sync_width=hs_w | (s_hi & 0x30) << 4,
+        v_sync_offset=vs >> 4 | (s_hi & 0x0c) << 2,
+        v_sync_width=vs & 0x0f | (s_hi & 0x03) << 4,
+        h_image_size=h_mm | (mm_hi & 0xf0) << 4,
+        v_image_size=v_mm | (mm_hi & 0x0f) << 8,
+        h_border=h_border,
+        v_border=v_border,
+        features=features,
+    )
+
+
+Mode = namedtuple('Mode', 'width height refresh_rate')
+# The rates are in Hz (vertical) and kHz (horizontal); max_pixel_clock is
+# in kHz like DetailedTiming.pixel_clock.
+RangeLimits = namedtuple('RangeLimits', (
+    'min_v_rate', 'max_v_rate', 'min_h_rate', 'max_h_rate', 'max_pixel_clock'))
+
+# The modes of the established timings bitmap (bytes 35-37), from the most
+# significant bit of byte 35 on. 1024x768@87 is interlaced; the low 7 bits
+# of byte 37 are manufacturer specific.
+ESTABLISHED_TIMINGS = (
+    Mode(720, 400, 70), Mode(720, 400, 88), Mode(640, 480, 60), Mode(640, 480, 67),
+    Mode(640, 480, 72), Mode(640, 480, 75), Mode(800, 600, 56), Mode(800, 600, 60),
+    Mode(800, 600, 72), Mode(800, 600, 75), Mode(832, 624, 75), Mode(1024, 768, 87),
+    Mode(1024, 768, 60), Mode(1024, 768, 70), Mode(1024, 768, 75), Mode(1280, 1024, 75),
+    Mode(1152, 870, 75), None, None, None, None, None, None, None,
+)
+
+def _bitmap_table(modes):
+    "For every value of a byte, the modes of its set bits"
+    return tuple(
+        tuple(mode for bit, mode in enumerate(modes) if mode and value & (0x80 >> bit))
+        for value in range(256)
+    )
+_ESTABLISHED_TABLES = tuple(_bitmap_table(ESTABLISHED_TIMINGS[i : i+8]) for i in (0, 8, 16))
+
+# A standard timing is two bytes: the width as (width / 8) - 31, then the
+# aspect ratio in the top two bits and (refresh rate - 60) in the rest.
+_STD_WIDTHS = tuple(8 * (x + 31) for x in range(256))
+_STD_HEIGHTS = tuple(
+    tuple(width * den // num for width in _STD_WIDTHS)
+    for num, den in ((16, 10), (4, 3), (5, 4), (16, 9))
+)
+# Before EDID 1.3 the aspect ratio 0 was 1:1 instead of 16:10
+_STD_HEIGHTS_PRE_1_3 = (_STD_WIDTHS,) + _STD_HEIGHTS[1:]
+
+def parse_standard_timings(data, heights=_STD_HEIGHTS):
+    "Decode the 2-byte standard timings in data to a tuple of Modes, skipping unused ones"
+    data = bytearray(data)
+    modes = []
+    for i in range(0, len(data) - 1, 2):
+        first, second = data[i], data[i+1]
+        if first <= 1:      # 0x01 0x01 marks an unused slot, 0x00 is reserved
+            continue
+        modes.append(Mode(_STD_WIDTHS[first], heights[second >> 6][first], 60 + (second & 0x3f)))
+    return tuple(modes)
+
+def parse_established_timings(data):
+    "Decode the 3-byte established timings bitmap to a tuple of Modes"
+    data = bytearray(data)
+    return sum((table[x] for table, x in zip(_ESTABLISHED_TABLES, data)), ())
+
+def parse_range_limits(desc):
+    "Decode a display range limits descriptor to a RangeLimits"
+    desc = bytearray(desc)
+    flags = desc[4]     # EDID 1.4 adds 255 to the limits flagged here
+    return RangeLimits(
+        min_v_rate=desc[5] + (255 if flags & 0x03 == 0x03 else 0),
+        max_v_rate=desc[6] + (255 if flags & 0x02 else 0),
+        min_h_rate=desc[7] + (255 if flags & 0x0c == 0x0c else 0),
+        max_h_rate=desc[8] + (255 if flags & 0x08 else 0),
+        max_pixel_clock=10000 * desc[9],
+    )
+
+
 EDIDDescriptor = namedtuple('EDIDDescriptor', ('dtype', 'value'))
+# Take a look at the following page
+# for the descriptor spec
+# https://en.wikipedia.org/wiki/Extended_Display_Identification_Data
+DESCRIPTOR_TYPES = {
+    255: 'serial_no',
+    254: 'text',
+    253: 'mon_range_lim',
+    252: 'name',
+    251: 'white_pt_data',
+    250: 'std_timing',
+}
 def parse_descriptor(desc):
-    # Take a look at the following page
-    # for the descriptor spec
-    # https://en.wikipedia.org/wiki/Extended_Display_Identification_Data
-    dtypes = {
-        255: 'serial_no',
-        254: 'text',
-        253: 'mon_range_lim',
-        252: 'name',
-        251: 'white_pt_data',
-        250: 'std_timing',
-    }
+    dtypes = DESCRIPTOR_TYPES
     text_dtypes = ('serial_no', 'text', 'name')
 
-    if desc[0] != 0:
-        return EDIDDescriptor('detailed_timing', None)
-    header = struct.unpack('5c', desc[0:5])
-    descr_type = header[3][0]
-    if sys.version_info <= (3,0): # for python2 compatibility
-        descr_type = ord(descr_type)
+    header = bytearray(desc[0:5])   # indexes to ints on python2 too
+    if header[0] != 0 or header[1] != 0:  # a non-zero pixel clock
+        return EDIDDescriptor('detailed_timing', parse_detailed_timing(desc))
+    descr_type = header[3]
 
     rest = desc[5:]
     try:
@@ -53,10 +164,132 @@ def parse_descriptor(desc):
         dtype = '{}'.format(descr_type)
     if dtype in text_dtypes:
         return EDIDDescriptor(dtype, _bytes_to_printable(rest))
+    elif dtype == 'std_timing':
+        return EDIDDescriptor(dtype, parse_standard_timings(desc[5:17]))
+    elif dtype == 'mon_range_lim':
+        return EDIDDescriptor(dtype, parse_range_limits(desc))
     else:
         return EDIDDescriptor(dtype, None)
 
 
+BLOCK_SIZE = 128
+_BASE_BLOCK = struct.Struct('<8s2sHI9B10s3s16s18s18s18s18s2B')
+_PNP_LETTERS = ' ABCDEFGHIJKLMNOPQRSTUVWXYZ?????'
+
+def _decode_manufacturer(mid):
+    "Decode the 2 byte, big-endian PNP id into its three letters"
+    mid = bytearray(mid)
+    mid = (mid[0] << 8) | mid[1]
+    return (_PNP_LETTERS[(mid >> 10) & 31]
+            + _PNP_LETTERS[(mid >> 5) & 31]
+            + _PNP_LETTERS[mid & 31])
+
+
+class EDIDRecord(object):
+    """The fields of an EDID base block, decoded in a single struct pass.
+
+    Records are immutable. The four 18-byte descriptors are kept raw
+    and each one is only parsed when it is first accessed.
+    """
+    _fields = (
+        'manufacturer_id',
+        'product_code',
+        'serial_number',
+        'manufacture_week',
+        'manufacture_year',
+        'edid_version',
+        'edid_revision',
+        'horizontal_size',
+        'vertical_size',
+        'extension_count',
+    )
+    __slots__ = _fields + ('_descriptor_bytes', '_descriptors')
+
+    def __init__(self, manufacturer_id, product_code, serial_number,
+                 manufacture_week, manufacture_year, edid_version,
+                 edid_revision, horizontal_size, vertical_size,
+                 extension_count, descriptor_bytes):
+        values = (manufacturer_id, product_code, serial_number,
+                  manufacture_week, manufacture_year, edid_version,
+                  edid_revision, horizontal_size, vertical_size,
+                  extension_count)
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_descriptor_bytes', tuple(descriptor_bytes))
+        object.__setattr__(self, '_descriptors', [None] * len(descriptor_bytes))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable'.format(self.__class__.__name__))
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        values = tuple(getattr(self, x) for x in self._fields)
+        return (self.__class__, values + (self._descriptor_bytes,))
+
+    def descriptor(self, i):
+        "Return the i-th (0-3) descriptor, parsing it on first access"
+        desc = self._descriptors[i]
+        if desc is None:
+            desc = parse_descriptor(self._descriptor_bytes[i])
+            self._descriptors[i] = desc
+        return desc
+
+    @property
+    def descriptors(self):
+        return tuple(self.descriptor(i) for i in range(len(self._descriptors)))
+
+    @property
+    def vendor_name(self):
+        "The vendor name of manufacturer_id from edider.pnp, or None"
+        from edider import pnp
+        return pnp.vendor_name(self.manufacturer_id)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        fields = ', '.join('{}={!r}'.format(x, getattr(self, x)) for x in self._fields)
+        return '{}({})'.format(cname, fields)
+
+
+def edid_size(base_block):
+    "Size in bytes of the EDID which starts with base_block: 128 * (1 + extensions)"
+    return BLOCK_SIZE * (1 + bytearray(base_block[126:127])[0])
+
+def decode_modes(edid_bytes, descriptors=None):
+    """The Modes that the base block of edid_bytes lists, de-duplicated and sorted.
+
+    They come from the established and standard timings, the standard
+    timing descriptors and the detailed timings (with the refresh rate
+    rounded to 0.01 Hz). descriptors are the decoded descriptors of the
+    EDID, if they are at hand.
+    """
+    if descriptors is None:
+        descriptors = decode_edid(edid_bytes).descriptors
+    version = bytearray(edid_bytes[18:20])
+    heights = _STD_HEIGHTS if tuple(version) >= (1, 3) else _STD_HEIGHTS_PRE_1_3
+    modes = set(parse_established_timings(edid_bytes[35:38]))
+    modes.update(parse_standard_timings(edid_bytes[38:54], heights))
+    for desc in descriptors:
+        if desc.dtype == 'std_timing':
+            modes.update(desc.value)
+        elif desc.dtype == 'detailed_timing':
+            timing = desc.value
+            modes.add(Mode(timing.width, timing.height, round(timing.refresh_rate, 2)))
+    return tuple(sorted(modes))
+
+def decode_edid(edid_bytes):
+    "Decode the 128-byte base block at the start of edid_bytes to an EDIDRecord"
+    if len(edid_bytes) < _BASE_BLOCK.size:
+        raise ValueError('An EDID base block is {} bytes long, got {}'.format(
+            _BASE_BLOCK.size, len(edid_bytes)))
+    (_, mid, product, serial, week, year, version, revision, _, hsize, vsize,
+     _, _, _, _, _, d1, d2, d3, d4, n_ext, _) = _BASE_BLOCK.unpack_from(edid_bytes)
+    return EDIDRecord(
+        _decode_manufacturer(mid), product, serial, week, 1990 + year,
+        version, revision, hsize, vsize, n_ext, (d1, d2, d3, d4),
+    )
+
+
 class EDIDSegmenter(object):
     "Expose the sections of an EDID object as properties of this class."
     def __init__(self, edid_bytes):
@@ -106,6 +339,14 @@ class EDIDSegmenter(object):
     def vertical_size(self):
         return self._get_bytes(22, 1)
 
+    @property
+    def established_timings(self):
+        return self._get_bytes(35, 3)
+
+    @property
+    def standard_timings(self):
+        return self._get_bytes(38, 16)
+
     @property
     def descriptor1(self):
         return self._get_bytes(54, 18)
@@ -122,74 +363,152 @@ class EDIDSegmenter(object):
     def descriptor4(self):
         return self._get_bytes(108, 18)
 
+    @property
+    def extension_count(self):
+        return self._get_bytes(126, 1)
+
+    def extension(self, i):
+        "The raw i-th (0-based) extension block"
+        return self._get_bytes(BLOCK_SIZE * (i + 1), BLOCK_SIZE)
+
     def __repr__(self):
         cname = self.__class__.__name__
         return '{}({!r})'.format(cname, self._edid)
     
 
 class EDIDParser(EDIDSegmenter):
+    """Decoded values of the EDID fields, backed by an EDIDRecord
+
+    Records come from edider.cache, so an EDID seen before is not decoded again.
+    """
+    @property
+    def record(self):
+        try:
+            return self._record
+        except AttributeError:
+            self._record = _cache.default_cache.record(self._edid)
+            return self._record
+
     @property
     def manufacturer_id(self):
-        alphabet = ' abcdefghijklmnopqrstuvwxyz'
-        mid = super(EDIDParser, self).manufacturer_id
-        bits = _bytes_to_bits(mid)
-        bits = ''.join(bits)
-        bits = bits[1:]         # remove header zero
-        letters = [int(''.join(x), 2) for x in _grouper(bits, 5)]
-        letters = [alphabet[i] for i in letters]
-        return ''.join(letters).upper()
+        return self.record.manufacturer_id
+
+    @property
+    def vendor_name(self):
+        return self.record.vendor_name
 
     @property
     def manufacture_year(self):
-        year = super(EDIDParser, self).manufacture_year[0]
-        return 1990 + year
+        return self.record.manufacture_year
 
     @property
     def manufacture_week(self):
-        return super(EDIDParser, self).manufacture_week[0]
+        return self.record.manufacture_week
 
     @property
     def edid_version(self):
-        return super(EDIDParser, self).edid_version[0]
+        return self.record.edid_version
 
     @property
     def edid_revision(self):
-        return super(EDIDParser, self).edid_revision[0]
+        return self.record.edid_revision
 
     @property
     def horizontal_size(self):
         "Horizontal size in cm"
-        return super(EDIDParser, self).horizontal_size[0]
+        return self.record.horizontal_size
 
     @property
     def vertical_size(self):
         "Vertical size in cm"
-        return super(EDIDParser, self).vertical_size[0]
+        return self.record.vertical_size
+
+    @property
+    def established_timings(self):
+        "Tuple of the Modes set in the established timings bitmap"
+        return parse_established_timings(super(EDIDParser, self).established_timings)
+
+    @property
+    def standard_timings(self):
+        "Tuple of the Modes of the 8 standard timings in the base block"
+        rec = self.record
+        heights = _STD_HEIGHTS
+        if (rec.edid_version, rec.edid_revision) < (1, 3):
+            heights = _STD_HEIGHTS_PRE_1_3
+        return parse_standard_timings(super(EDIDParser, self).standard_timings, heights)
+
+    @property
+    def supported_modes(self):
+        "Sorted tuple of every Mode the EDID lists; see decode_modes"
+        try:
+            return self._supported_modes
+        except AttributeError:
+            self._supported_modes = decode_modes(self._edid, self.record.descriptors)
+            return self._supported_modes
+
+    @property
+    def range_limits(self):
+        "The RangeLimits of the display range limits descriptor, or None"
+        for desc in self.record.descriptors:
+            if desc.dtype == 'mon_range_lim':
+                return desc.value
+        return None
 
     @property
     def descriptor1(self):
-        return parse_descriptor(super(EDIDParser, self).descriptor1)
+        return self.record.descriptor(0)
 
     @property
     def descriptor2(self):
-        return parse_descriptor(super(EDIDParser, self).descriptor2)
+        return self.record.descriptor(1)
 
     @property
     def descriptor3(self):
-        return parse_descriptor(super(EDIDParser, self).descriptor3)
+        return self.record.descriptor(2)
 
     @property
     def descriptor4(self):
-        return parse_descriptor(super(EDIDParser, self).descriptor4)
+        return self.record.descriptor(3)
+
+    @property
+    def extension_count(self):
+        return self.record.extension_count
 
+    @property
+    def extensions(self):
+        "Sequence of the extension blocks, each decoded when first indexed"
+        try:
+            return self._extensions
+        except AttributeError:
+            pass
+        from edider.extensions import ExtensionBlocks
+        self._extensions = ExtensionBlocks(self._edid, self.extension_count)
+        return self._extensions
+
+
+_FIELD_NAMES = {}
 
 class BaseMonitor(object):
     "An abstract class for showing information about connected screens"
+    _edid_cache_attrs = ('_edid', '_uuid', '_hash', '_record', '_descriptors',
+                         '_text_fields', '_width_in_pixels', '_height_in_pixels',
+                         '_supported_modes')
+
     def __init__(self, identifier):
         self._id = identifier
 
+    def _clear_edid_cache(self):
+        "Forget the edid and every value derived from it"
+        for attr in self._edid_cache_attrs:
+            self.__dict__.pop(attr, None)
+
+    def _sync(self):
+        """Called before the values derived from the EDID are read; backends
+        whose EDID can change clear them here when it did."""
+
     @property
     def edid(self):
+        self._sync()
         try:
             return self._edid
         except AttributeError:
@@ -199,30 +518,107 @@ class BaseMonitor(object):
 
     @property
     def uuid(self):
+        self._sync()
         try:
             return self._uuid
         except AttributeError:
             pass
-        import hashlib
-        import uuid
-        md5 = hashlib.md5(self.edid).hexdigest()
-        self._uuid = uuid.UUID(hex=md5)
+        self._uuid = _cache.default_cache.uuid(self.edid)
         return self._uuid
 
     def __eq__(self, other):
+        "Monitors are equal if their EDIDs are; the uuids stand in for them"
+        if self is other:
+            return True
+        if isinstance(other, BaseMonitor):
+            return self.uuid == other.uuid
         if hasattr(other, 'edid'):
             return self.edid == other.edid
         return False
-        
+
+    def __ne__(self, other):
+        return not self == other
+
+    def _get_record(self):
+        "The EDIDRecord of self.edid, looked up once; None without an EDID"
+        self._sync()
+        try:
+            return self._record
+        except AttributeError:
+            pass
+        edid = self.edid
+        self._record = _cache.default_cache.record(edid) if edid else None
+        return self._record
+
+    def _record_field(self, name, default=None):
+        "A field of the EDIDRecord, or default for a monitor without an EDID"
+        record = self._get_record()
+        if record is None:
+            return default
+        return getattr(record, name)
+
     def _get_output_edid(self):
         raise NotImplementedError
 
     def _dflt_resolution(self):
-        "Set self._width_in_pixels & self._height_in_pixels"
-        raise NotImplementedError
+        """Set self._width_in_pixels & self._height_in_pixels
+
+        They are read from the preferred timing of the EDID. Subclasses
+        override this to fall back on their backend when there is none.
+        """
+        timing = self.preferred_timing
+        if timing is None:
+            raise NotImplementedError
+        self._width_in_pixels, self._height_in_pixels = timing.width, timing.height
+
+    @property
+    def preferred_timing(self):
+        "The DetailedTiming of the preferred mode, or None"
+        if not self.edid:
+            return None
+        for desc in self._get_descriptors():
+            if desc.dtype == 'detailed_timing':
+                return desc.value
+        return None
+
+    @property
+    def supported_modes(self):
+        """Sorted tuple of the Modes the EDID lists (see decode_modes)
+
+        They are decoded from the EDID alone, without backend requests.
+        """
+        self._sync()
+        try:
+            return self._supported_modes
+        except AttributeError:
+            pass
+        modes = ()
+        if self.edid:
+            modes = decode_modes(self.edid, self._get_descriptors())
+        self._supported_modes = modes
+        return modes
+
+    @property
+    def range_limits(self):
+        "The RangeLimits of the EDID's display range limits descriptor, or None"
+        if not self.edid:
+            return None
+        for desc in self._get_descriptors():
+            if desc.dtype == 'mon_range_lim':
+                return desc.value
+        return None
+
+    @property
+    def refresh_rate(self):
+        "Refresh rate of the preferred mode in Hz, or None"
+        timing = self.preferred_timing
+        if timing is None:
+            return None
+        return timing.refresh_rate
 
     @property
     def height_in_pixels(self):
+        self._sync()
         try:
             return self._height_in_pixels
         except AttributeError:
@@ -231,6 +627,7 @@ class BaseMonitor(object):
 
     @property
     def width_in_pixels(self):
+        self._sync()
         try:
             return self._width_in_pixels
         except AttributeError:
@@ -239,78 +636,121 @@ class BaseMonitor(object):
 
     @property
     def manufacturer_id(self):
-        return EDIDParser(self.edid).manufacturer_id
+        return self._record_field('manufacturer_id', '')
+
+    @property
+    def vendor_name(self):
+        "The name of the manufacturer, e.g. 'Dell Inc.', or None if unknown"
+        return self._record_field('vendor_name')
 
     @property
     def manufacture_year(self):
-        return EDIDParser(self.edid).manufacture_year
+        return self._record_field('manufacture_year')
 
     @property
     def width_in_cm(self):
-        return EDIDParser(self.edid).horizontal_size
+        return self._record_field('horizontal_size')
 
     @property
     def height_in_cm(self):
-        return EDIDParser(self.edid).vertical_size
+        return self._record_field('vertical_size')
 
     @property
     def output_name(self):
         raise NotImplementedError
 
     def _get_descriptors(self):
+        self._sync()
         try:
             return self._descriptors
         except AttributeError:
-            edp = EDIDParser(self.edid)
-            self._descriptors = [
-                edp.descriptor1,
-                edp.descriptor2,
-                edp.descriptor3,
-                edp.descriptor4,
-            ]
+            self._descriptors = list(self._record_field('descriptors', ()))
             return self._descriptors
 
+    def _get_text_fields(self):
+        "The name, serial_no and text descriptors, collected in one pass"
+        self._sync()
+        try:
+            return self._text_fields
+        except AttributeError:
+            pass
+        fields, text = {}, []
+        for desc in self._get_descriptors():
+            if desc.dtype == 'text':
+                text.append(desc.value)
+            elif desc.dtype in ('name', 'serial_no'):
+                fields.setdefault(desc.dtype, desc.value)
+        fields.setdefault('name', '')
+        fields.setdefault('serial_no', '')
+        fields['text'] = '; '.join(text)
+        self._text_fields = fields
+        return fields
+
     @property
     def name(self):
-        desc = self._get_descriptors()
-        try:
-            return [x.value for x in desc if x.dtype == 'name'][0]
-        except IndexError:
-            return ''
+        return self._get_text_fields()['name']
 
     @property
     def serial_no(self):
-        desc = self._get_descriptors()
-        try:
-            return [x.value for x in desc if x.dtype == 'serial_no'][0]
-        except IndexError:
-            return ''
+        return self._get_text_fields()['serial_no']
 
     @property
     def text(self):
-        desc = self._get_descriptors()
-        try:
-            return '; '.join([x.value for x in desc if x.dtype == 'text'])
-        except IndexError:
-            return ''
+        return self._get_text_fields()['text']
 
-    def as_dict(self):
+    @classmethod
+    def field_names(cls):
+        "Names of the public properties of cls, collected once per class"
+        try:
+            return _FIELD_NAMES[cls]
+        except KeyError:
+            pass
         import inspect
-        fields = []
-        for name, obj in inspect.getmembers(self.__class__):
-            if (not name.startswith('_')) and inspect.isdatadescriptor(obj):
-                fields.append(name)
-        d = {}
-        for key in fields:
-            d[key] = getattr(self, key)
-        return d
+        names = tuple(
+            name for name, obj in inspect.getmembers(cls)
+            if (not name.startswith('_')) and inspect.isdatadescriptor(obj)
+        )
+        _FIELD_NAMES[cls] = names
+        return names
+
+    def as_dict(self, fields=None):
+        """Return a dict of the monitor's properties.
+
+        Only the properties named in fields are read, all of them by default.
+        """
+        if fields is None:
+            fields = self.field_names()
+        return dict((key, getattr(self, key)) for key in fields)
+
+    def refresh(self):
+        """Re-read the monitor from its backend on the next property access.
+
+        Returns the monitor. Backends with more state than the EDID
+        (e.g. edider.x11read.Monitor) re-read that too.
+        """
+        self._clear_edid_cache()
+        return self
+
+    def refresh_async(self, executor=None):
+        "An asyncio future of refresh(), which runs in executor"
+        from edider.aio import run_in_executor
+        return run_in_executor(executor, self.refresh)
+
+    def snapshot_async(self, fields=None, executor=None):
+        "An asyncio future of as_dict(fields), read in executor"
+        from edider.aio import run_in_executor
+        return run_in_executor(executor, self.as_dict, fields)
 
     def __repr__(self):
         cname = self.__class__.__name__
         return cname + '({})'.format(self._id)
 
     def __hash__(self):
-        return hash(self.edid)
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(self.uuid)
+            return self._hash
 
     def __str__(self):
         rstr = repr(self)
@@ -318,3 +758,61 @@ class BaseMonitor(object):
             rstr += '\t->\t{}'.format(self.name)
         return rstr
 
+
+
+Geometry = namedtuple('Geometry', 'x y width height')
+
+class EDIDMonitor(BaseMonitor):
+    "A monitor known only by its EDID, e.g. one read from a file"
+    def __init__(self, edid, output_name=''):
+        self._id = output_name
+        self._edid = edid
+
+    def _dflt_resolution(self):
+        if self.preferred_timing is not None:
+            return super(EDIDMonitor, self)._dflt_resolution()
+        self._width_in_pixels, self._height_in_pixels = 0, 0
+
+    def refresh(self):
+        "There is no backend to re-read the EDID from: returns the monitor as it is"
+        return self
+
+    @property
+    def output_name(self):
+        return self._id
+
+
+def _jsonable(value):
+    "Convert a monitor property to something the json module can encode"
+    if hasattr(value, '_asdict'):
+        return dict((k, _jsonable(v)) for k, v in value._asdict().items())
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(x) for x in value]
+    if isinstance(value, (bytes, bytearray)):
+        return binascii.hexlify(value).decode('ascii')
+    if isinstance(value, (int, float, str, type(None))):
+        return value
+    return str(value)
+
+def to_columns(monitors, fields=None):
+    """Serialize monitors to a dict mapping each field to a list of values.
+
+    For X11 monitors pass the result of get_monitors(snapshot=True), so
+    that reading the properties costs no further round-trips.
+    """
+    monitors = list(monitors)
+    if fields is None:
+        fields = monitors[0].field_names() if monitors else ()
+    columns = dict((key, []) for key in fields)
+    for mon in monitors:
+        row = mon.as_dict(fields)
+        for key in fields:
+            columns[key].append(row[key])
+    return columns
+
+def to_json_lines(monitors, fields=None):
+    "Yield one JSON object per monitor (see to_columns)"
+    import json
+    for mon in monitors:
+        row = mon.as_dict(fields)
+        yield json.dumps(dict((k, _jsonable(v)) for k, v in row.items()), sort_keys=True)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Vendor names of the PNP IDs in EDIDs (manufacturer_id, e.g. 'TSB').
+
+The registry is kept precompiled: a sorted array of the 15-bit codes
+that EDIDs store, the offsets of the names and the names as UTF-8.
+It is only read on the first lookup, and lookups are a binary search.
+The registry shipped with edider is the UEFI PNP ID list plus a few IDs
+common in EDIDs but missing from it (see data/pnp_ids.txt). Point
+$EDIDER_PNP_REGISTRY at another one, e.g. compiled from hwdata's pnp.ids:
+
+python -m edider.pnp compile /usr/share/hwdata/pnp.ids ~/.cache/edider/pnp.bin
+"""
+from __future__ import print_function
+import array
+import bisect
+import os
+import struct
+import sys
+
+MAGIC = b'EPNP'
+_HEADER = struct.Struct('<4sI')
+DEFAULT_REGISTRY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pnp_ids.bin')
+
+def pnp_code(pnp_id):
+    "The 15-bit code of a three-letter PNP ID, as stored in EDID bytes 8-9"
+    a, b, c = (ord(x) - 64 for x in pnp_id.upper())
+    if not all(0 < x < 27 for x in (a, b, c)):
+        raise ValueError('Not a PNP ID: {!r}'.format(pnp_id))
+    return a << 10 | b << 5 | c
+
+def read_pnp_ids(lines):
+    "Yield (code, name) from lines in the format of hwdata's pnp.ids"
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('#') or '\t' not in line:
+            continue
+        pnp_id, name = line.split('\t', 1)
+        try:
+            yield pnp_code(pnp_id.strip()), name.strip()
+        except ValueError:
+            continue
+
+def compile_registry(entries):
+    "Pack (code, name) pairs into the binary registry format"
+    names = dict(entries)
+    codes = array.array('H', sorted(names))
+    blob = b''.join(names[code].encode('utf-8') for code in codes)
+    offsets = array.array('I', [0])
+    for code in codes:
+        offsets.append(offsets[-1] + len(names[code].encode('utf-8')))
+    if sys.byteorder != 'little':
+        codes.byteswap()
+        offsets.byteswap()
+    return b''.join([_HEADER.pack(MAGIC, len(codes)), codes.tobytes(),
+                     offsets.tobytes(), blob])
+
+
+class PNPRegistry(object):
+    "A compiled registry; see compile_registry"
+    def __init__(self, data):
+        magic, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not a compiled PNP registry')
+        pos = _HEADER.size
+        self._codes = array.array('H')
+        self._codes.frombytes(data[pos : pos + 2*count])
+        pos += 2 * count
+        self._offsets = array.array('I')
+        self._offsets.frombytes(data[pos : pos + 4*(count+1)])
+        if sys.byteorder != 'little':
+            self._codes.byteswap()
+            self._offsets.byteswap()
+        self._names = data[pos + 4*(count+1):]
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path):
+        "Load a compiled registry, or compile a pnp.ids text file"
+        with open(path, 'rb') as fobj:
+            data = fobj.read()
+        if not data.startswith(MAGIC):
+            data = compile_registry(read_pnp_ids(data.splitlines()))
+        return cls(data)
+
+    def lookup_code(self, code):
+        "The vendor name of a 15-bit PNP code, or None"
+        try:
+            return self._cache[code]
+        except KeyError:
+            pass
+        codes = self._codes
+        i = bisect.bisect_left(codes, code)
+        name = None
+        if i < len(codes) and codes[i] == code:
+            start, end = self._offsets[i], self._offsets[i+1]
+            name = self._names[start:end].decode('utf-8')
+        self._cache[code] = name
+        return name
+
+    def lookup(self, pnp_id):
+        "The vendor name of a PNP ID such as 'DEL', or None"
+        try:
+            return self.lookup_code(pnp_code(pnp_id))
+        except ValueError:
+            return None
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, pnp_id):
+        return self.lookup(pnp_id) is not None
+
+
+_registry = None
+def registry():
+    "The registry at $EDIDER_PNP_REGISTRY or the one shipped with edider"
+    global _registry
+    if _registry is None:
+        _registry = PNPRegistry.from_file(
+            os.environ.get('EDIDER_PNP_REGISTRY') or DEFAULT_REGISTRY)
+    return _registry
+
+def vendor_name(pnp_id):
+    "The vendor name of a PNP ID such as 'DEL', or None if it is unknown"
+    return registry().lookup(pnp_id)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] != 'compile':
+        print('usage: python -m edider.pnp compile PNP_IDS_TXT OUTPUT_BIN', file=sys.stderr)
+        return 2
+    with open(argv[1], 'rb') as fobj:
+        data = compile_registry(read_pnp_ids(fobj.read().splitlines()))
+    with open(argv[2], 'wb') as fobj:
+        fobj.write(data)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Stream large collections of EDID dumps through the parser.
+
+A source is a .bin file, a file of concatenated EDIDs, a tar archive
+(optionally compressed), a directory of those or an open binary file.
+Sources are read in chunks and split at the EDID headers, so memory use
+does not grow with their size; the EDIDs are decoded by a process pool.
+A file or archive that cannot be read is reported as a ScanResult with an
+error, and the scan goes on with the next one.
+
+scanner = Scanner(workers=8)
+for result in scanner.scan('dumps.tar.gz', 'more/'):
+    if result.error:
+        print(result.source, result.offset, result.error)
+print(scanner.stats)
+"""
+import collections
+import os
+import tarfile
+import time
+import zlib
+from collections import namedtuple
+
+from edider.parser import BLOCK_SIZE, decode_edid, edid_size
+
+HEADER = b'\x00\xff\xff\xff\xff\xff\xff\x00'
+DEFAULT_CHUNK_SIZE = 1 << 20
+# What opening or reading a file or a (compressed) tar archive may raise
+READ_ERRORS = (EnvironmentError, EOFError, tarfile.TarError, zlib.error)
+
+# error is None for a valid EDID. record is None when the EDID could not
+# be decoded; one with a bad checksum is decoded but still reported. A
+# source that cannot be read gives one with edid == b''.
+ScanResult = namedtuple('ScanResult', ('source', 'offset', 'edid', 'record', 'error'))
+
+
+class ScanStats(object):
+    "Counters of a scan; the rates are per second of elapsed time"
+    def __init__(self):
+        self.start = time.time()
+        self.end = None
+        self.sources = 0
+        self.bytes_read = 0
+        self.edids = 0
+        self.errors = 0
+
+    @property
+    def elapsed(self):
+        return (self.end or time.time()) - self.start
+
+    @property
+    def edids_per_second(self):
+        return self.edids / max(self.elapsed, 1e-9)
+
+    @property
+    def megabytes_per_second(self):
+        return self.bytes_read / 1e6 / max(self.elapsed, 1e-9)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        return '{}(sources={}, edids={}, errors={}, bytes_read={}, {:.0f} edids/s)'.format(
+            cname, self.sources, self.edids, self.errors, self.bytes_read,
+            self.edids_per_second)
+
+
+def _short_error(length, size):
+    "The error of an EDID of length bytes which announced size bytes"
+    if length >= BLOCK_SIZE and not length % BLOCK_SIZE:
+        return 'announces {} extension blocks, has {}'.format(
+            size // BLOCK_SIZE - 1, length // BLOCK_SIZE - 1)
+    return 'truncated: {} of {} bytes'.format(length, max(size, BLOCK_SIZE))
+
+def iter_edids(fobj, chunk_size=DEFAULT_CHUNK_SIZE, stats=None):
+    """Split a binary stream of EDIDs at their headers.
+
+    Yield (offset, edid, error) for every EDID and for every run of bytes
+    that does not belong to one (with edid == b'' and an error message).
+    At most about chunk_size + 32 KiB of the stream is held in memory.
+    """
+    buf, pos, base = b'', 0, 0     # base is the stream offset of buf[0]
+    junk_start, eof = None, False
+    while True:
+        start = buf.find(HEADER, pos)
+        if start < 0:
+            keep = 0 if eof else len(HEADER) - 1
+            end = max(pos, len(buf) - keep)
+        else:
+            end = start
+        if end > pos and junk_start is None:
+            junk_start = base + pos
+        pos = end
+        if start >= 0 and junk_start is not None:
+            yield junk_start, b'', '{} bytes without an EDID header'.format(
+                base + start - junk_start)
+            junk_start = None
+        size = BLOCK_SIZE
+        if start >= 0 and len(buf) - start >= BLOCK_SIZE:
+            size = edid_size(buf[start : start+BLOCK_SIZE])
+        if start >= 0:
+            # Another header inside this EDID (at any offset, as the bytes
+            # before it may be malformed) means this one is cut short
+            following = buf.find(HEADER, start + len(HEADER), start + size)
+            if following >= 0:
+                yield base + start, buf[start:following], _short_error(following - start, size)
+                pos = following
+                continue
+            if len(buf) - start >= size:
+                yield base + start, buf[start : start+size], None
+                pos = start + size
+                continue
+        if eof:
+            if start >= 0:
+                yield base + start, buf[start:], _short_error(len(buf) - start, size)
+            elif junk_start is not None:
+                yield junk_start, b'', '{} bytes without an EDID header'.format(
+                    base + len(buf) - junk_start)
+            return
+        data = fobj.read(chunk_size)
+        if stats is not None:
+            stats.bytes_read += len(data)
+        eof = not data
+        base += pos
+        buf, pos = buf[pos:] + data, 0
+
+def _decode(edid, error):
+    "Return (record, error) for one EDID found by iter_edids"
+    if not edid:
+        return None, error
+    try:
+        record = decode_edid(edid)
+    except ValueError as err:
+        return None, error or '{}'.format(err)
+    if error is None:
+        bad = [i for i in range(0, len(edid), BLOCK_SIZE)
+               if sum(bytearray(edid[i : i+BLOCK_SIZE])) % 256]
+        if bad:
+            error = 'bad checksum in block {}'.format(bad[0] // BLOCK_SIZE)
+    return record, error
+
+def _decode_batch(batch):
+    "Decode a list of (edid, error) pairs; only the results travel back"
+    return [_decode(edid, error) for edid, error in batch]
+
+
+class Scanner(object):
+    """Scan EDID sources; see the module docstring.
+
+    chunk_size is the number of bytes read at a time, workers the number
+    of decoding processes (0 or 1 decodes in this process, None uses one
+    per CPU) and batch_size the number of EDIDs sent to a worker at once.
+    stats holds the ScanStats of the current or last scan.
+    """
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, batch_size=512):
+        if workers is None:
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.batch_size = batch_size
+        self.stats = ScanStats()
+
+    @staticmethod
+    def _files(source):
+        "Yield source, or the files under it if it is a directory"
+        if hasattr(source, 'read') or not os.path.isdir(source):
+            yield source
+            return
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for name in sorted(filenames):
+                yield os.path.join(dirpath, name)
+
+    def _streams(self, source):
+        "Yield (name, binary file object) for every file in a file or archive"
+        if hasattr(source, 'read'):
+            yield getattr(source, 'name', '<stream>'), source
+        elif tarfile.is_tarfile(source):
+            with tarfile.open(source, 'r|*') as archive:
+                for member in archive:
+                    if member.isfile():
+                        name = '{}:{}'.format(source, member.name)
+                        yield name, archive.extractfile(member)
+        else:
+            with open(source, 'rb') as fobj:
+                yield source, fobj
+
+    def _items(self, sources):
+        for source in sources:
+            for path in self._files(source):
+                for item in self._file_items(path):
+                    yield item
+
+    def _file_items(self, path):
+        """The items of one file or archive; a read error ends them with an
+        item for the stream (or path) being read, at the offset reached"""
+        source = getattr(path, 'name', '<stream>') if hasattr(path, 'read') else path
+        name, start = source, self.stats.bytes_read
+        try:
+            for name, fobj in self._streams(path):
+                self.stats.sources += 1
+                start = self.stats.bytes_read
+                for offset, edid, error in iter_edids(fobj, self.chunk_size, self.stats):
+                    yield name, offset, edid, error
+                name, start = source, self.stats.bytes_read
+        except READ_ERRORS as err:
+            yield (name, self.stats.bytes_read - start, b'',
+                   'cannot read: {}: {}'.format(err.__class__.__name__, err))
+
+    def _batches(self, sources):
+        batch = []
+        for item in self._items(sources):
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _decoded_batches(self, sources):
+        "Yield (batch, decoded) where decoded holds the (record, error) of each item"
+        if self.workers <= 1:
+            for batch in self._batches(sources):
+                yield batch, _decode_batch([x[2:] for x in batch])
+            return
+        import multiprocessing
+        pool = multiprocessing.Pool(self.workers)
+        try:
+            # Bound the batches in flight so that reading cannot run ahead
+            pending = collections.deque()
+            for batch in self._batches(sources):
+                job = pool.apply_async(_decode_batch, ([x[2:] for x in batch],))
+                pending.append((batch, job))
+                if len(pending) >= 2 * self.workers:
+                    batch, job = pending.popleft()
+                    yield batch, job.get()
+            while pending:
+                batch, job = pending.popleft()
+                yield batch, job.get()
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def scan(self, *sources):
+        "Yield a ScanResult for every EDID (or malformed blob) in sources"
+        self.stats = stats = ScanStats()
+        try:
+            for batch, decoded in self._decoded_batches(sources):
+                for (source, offset, edid, _), (record, error) in zip(batch, decoded):
+                    result = ScanResult(source, offset, edid, record, error)
+                    if result.edid:
+                        stats.edids += 1
+                    if result.error is not None:
+                        stats.errors += 1
+                    yield result
+        finally:
+            stats.end = time.time()
+
+def scan(*sources, **kwargs):
+    "Scanner(**kwargs).scan(*sources)"
+    return Scanner(**kwargs).scan(*sources)
@@ -1,83 +1,568 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from contextlib import contextmanager
+import collections
+import threading
 from collections import namedtuple
+try:
+    import queue
+except ImportError:     # python 2
+    import Queue as queue
 
 from Xlib import X, display, Xatom
 from Xlib.error import XError
 from Xlib.ext import randr
+from Xlib.protocol import request
 
-from edider.parser import BaseMonitor
-from builtins import bytes      # needed for python2 compatibility
+from edider import instrument
+from edider.parser import BaseMonitor, Geometry, Mode, edid_size
 
-Geometry = namedtuple('Geometry', 'x y width height')
+CRTCInfo = namedtuple('CRTCInfo', ('idx', 'info'))
+EDID_BLOCK_LONGS = 32   # RandR measures property lengths in 4-byte units
+RANDR_CHANGE_MASK = (
+    randr.RRScreenChangeNotifyMask
+    | randr.RROutputChangeNotifyMask
+    | randr.RRCrtcChangeNotifyMask
+    | randr.RROutputPropertyNotifyMask
+)
+RANDR_NOTIFY_EVENTS = (
+    randr.ScreenChangeNotify,
+    randr.OutputChangeNotify,
+    randr.CrtcChangeNotify,
+    randr.OutputPropertyNotify,
+)
+RR_INTERLACE = 0x10     # RandR mode flags
+RR_DOUBLESCAN = 0x20
+RandRSnapshot = namedtuple(
+    'RandRSnapshot',
+    ('outputs', 'output_infos', 'crtcs', 'modes', 'primary', 'edids'),
+)
 
-@contextmanager
-def get_window(i_screen=0):
-    "Create & manage a x-window."
-    screen = display.Display().screen(i_screen)
-    window = screen.root.create_window(0, 0, 1, 1, 1, screen.root_depth)
-    yield window
-    window.destroy()
+def mode_refresh_rate(mode):
+    "The vertical refresh rate in Hz of a RandR mode dict, as xrandr computes it"
+    v_total = mode['v_total']
+    if mode['flags'] & RR_DOUBLESCAN:
+        v_total *= 2
+    if mode['flags'] & RR_INTERLACE:
+        v_total /= 2.0
+    if not mode['h_total'] or not v_total:
+        return 0.0
+    return mode['dot_clock'] / float(mode['h_total'] * v_total)
 
-def get_connected_outputs(i_screen=0):
-    "Yield the X11-index for each connected monitor"
-    with get_window(i_screen) as window:
-        res = randr.get_screen_resources(window)
-        outputs = res.outputs
-        for output in outputs:
-            info = randr.get_output_info(window, output, 0)
-            if info.connection == 0:
-                yield output
 
-CRTCInfo = namedtuple('CRTCInfo', ('idx', 'info'))
-def crtc_info(*crtc_idx):
-    with get_window() as win:
-        for idx in crtc_idx:
+class ModeIndex(object):
+    """The modes of a screen resources reply, by mode id.
+
+    Each mode is the RandR mode dict with the name, refresh_rate,
+    interlace and doublescan added. config_timestamp is the RandR
+    configuration the modes belong to.
+    """
+    def __init__(self, modes, names='', config_timestamp=None):
+        self.config_timestamp = config_timestamp
+        self.modes = []
+        pos = 0
+        for mode in modes:
+            mode = dict(getattr(mode, '_data', mode))
+            length = mode['name_length']
+            mode['name'] = names[pos : pos+length]
+            pos += length
+            mode['refresh_rate'] = mode_refresh_rate(mode)
+            mode['interlace'] = bool(mode['flags'] & RR_INTERLACE)
+            mode['doublescan'] = bool(mode['flags'] & RR_DOUBLESCAN)
+            self.modes.append(mode)
+        self._by_id = dict((mode['id'], mode) for mode in self.modes)
+
+    @classmethod
+    def from_resources(cls, res):
+        "The index of a GetScreenResources or GetScreenResourcesCurrent reply"
+        data = res._data
+        names = data.get('mode_names', data.get('names', ''))
+        return cls(res.modes, names, res.config_timestamp)
+
+    def get(self, mode_id, default=None):
+        return self._by_id.get(mode_id, default)
+
+    def __getitem__(self, mode_id):
+        return self._by_id[mode_id]
+
+    def __contains__(self, mode_id):
+        return mode_id in self._by_id
+
+    def __iter__(self):
+        return iter(self.modes)
+
+    def __len__(self):
+        return len(self.modes)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        return '{}({} modes, config_timestamp={})'.format(
+            cname, len(self.modes), self.config_timestamp)
+
+
+def _reply_size(reply):
+    "The size in bytes of a reply as the server sent it, or None"
+    try:
+        return len(reply._reply.to_binary(**reply._data))
+    except Exception:   # not a reply object, or an error instead of data
+        return None
+
+
+class X11Session(object):
+    """A single connection to an X server and the root window of one screen.
+
+    Every RandR query made by X11Output, Monitor, crtc_info and
+    get_connected_outputs goes through a session, so enumerating the
+    monitors costs one connection instead of one per property.
+    Interned atoms are cached for the lifetime of the session.
+    The requests are reported to edider.instrument while it has hooks.
+
+    with X11Session() as session:
+        monitors = get_monitors(session=session)
+
+    Sessions for the other screens of a display can share its connection
+    by passing it as connection; closing them leaves it open.
+
+    state() keeps a snapshot of the RandR configuration that is reused
+    until the server reports a change. The session then selects the RandR
+    notifications and counts them in generation; poll() reads those that
+    have arrived without a round-trip.
+    """
+    def __init__(self, display_name=None, i_screen=0, connection=None):
+        self._owns_display = connection is None
+        if connection is None:
+            start = instrument.clock()
+            connection = display.Display(display_name)
+            if instrument.active:
+                instrument.emit('connect', connection.get_display_name(),
+                                duration=instrument.clock() - start)
+        self.display = connection
+        self.display_name = connection.get_display_name()
+        self.i_screen = i_screen
+        try:
+            self.root = connection.screen(i_screen).root
+        except IndexError:
+            self.close()
+            raise ValueError('{} has no screen {}'.format(self.display_name, i_screen))
+        self._atoms = {}
+        self._mode_index = None
+        self.generation = 0
+        self.timestamps = None
+        self._tracking = False
+        self._listeners = []
+        self._state = None
+        self._state_generation = None
+
+    def atom(self, name):
+        """Return the atom for name, or X.NONE if the server has none yet.
+
+        An existing atom is looked up only once per session; X.NONE is not
+        kept, as the atom appears once a client first uses the name.
+        """
+        try:
+            return self._atoms[name]
+        except KeyError:
+            pass
+        atom = self._request(
+            'InternAtom', None, self.display.intern_atom, name, True)
+        if atom != X.NONE:
+            self._atoms[name] = atom
+        return atom
+
+    def _request(self, name, output, func, *args):
+        "Return func(*args), reporting the request to edider.instrument"
+        if not instrument.active:
+            return func(*args)
+        start = instrument.clock()
+        reply = func(*args)
+        instrument.emit('request', name, output, instrument.clock() - start,
+                        _reply_size(reply))
+        return reply
+
+    def _reply(self, req, name, output, sent):
+        "Wait for a deferred request sent at time sent, see _request"
+        try:
+            req.reply()
+        finally:
+            if instrument.active:
+                instrument.emit('request', name, output, instrument.clock() - sent,
+                                _reply_size(req))
+
+    def screen_resources(self):
+        res = self._request(
+            'GetScreenResources', None, randr.get_screen_resources, self.root)
+        self._update_modes(res)
+        return res
+
+    def _update_modes(self, res):
+        "Rebuild the mode index from res only if the RandR configuration changed"
+        index = self._mode_index
+        if index is None or index.config_timestamp != res.config_timestamp:
+            index = self._mode_index = ModeIndex.from_resources(res)
+        return index
+
+    def mode_index(self, refresh=False):
+        """The ModeIndex of the screen.
+
+        It is fetched once and then kept until a screen resources reply
+        with another config timestamp is seen. refresh=True checks the
+        timestamp with a GetScreenResourcesCurrent request, which unlike
+        GetScreenResources does not make the server probe the outputs.
+        """
+        if self._mode_index is None or refresh:
+            res = self._request('GetScreenResourcesCurrent', None,
+                                randr.get_screen_resources_current, self.root)
+            self._update_modes(res)
+        return self._mode_index
+
+    def output_info(self, output):
+        return self._request(
+            'GetOutputInfo', output, randr.get_output_info, self.root, output, 0)
+
+    def crtc_info(self, crtc):
+        return self._request(
+            'GetCrtcInfo', None, randr.get_crtc_info, self.root, crtc, 0)
+
+    def output_primary(self):
+        return self._request(
+            'GetOutputPrimary', None, randr.get_output_primary, self.root).output
+
+    def output_property(self, output, name, prop_type, offset, length):
+        return self._request(
+            'GetOutputProperty',
+            output,
+            randr.get_output_property,
+            self.root,
+            output,
+            self.atom(name),
+            prop_type,
+            offset,
+            length,
+        )
+
+    def output_edid(self, output):
+        """Read the EDID of output, base block first and then exactly as
+        many extension blocks as the base block announces."""
+        if self.atom(randr.PROPERTY_RANDR_EDID) == X.NONE:
+            return b''      # no output has published an EDID yet
+        edid = self.output_property(
+            output, randr.PROPERTY_RANDR_EDID, Xatom.INTEGER, 0, EDID_BLOCK_LONGS)
+        edid = bytes(bytearray(edid.value))
+        if len(edid) == 128 and edid_size(edid) > 128:
+            rest = self.output_property(
+                output,
+                randr.PROPERTY_RANDR_EDID,
+                Xatom.INTEGER,
+                EDID_BLOCK_LONGS,
+                edid_size(edid) // 4 - EDID_BLOCK_LONGS,
+            )
+            edid += bytes(bytearray(rest.value))
+        return edid
+
+    def _defer_edid(self, output, atom, offset, length):
+        return self._defer(
+            randr.GetOutputProperty,
+            output=output,
+            property=atom,
+            type=Xatom.INTEGER,
+            long_offset=offset,
+            long_length=length,
+            delete=False,
+            pending=False,
+        )
+
+    def _defer(self, request_class, **keys):
+        "Queue a RandR request; its reply is only waited for on first use."
+        protocol_display = self.display.display
+        return request_class(
+            display=protocol_display,
+            defer=True,
+            opcode=protocol_display.get_extension_major(randr.extname),
+            **keys
+        )
+
+    def _defer_atom(self, name):
+        "Queue an InternAtom request that does not create the atom"
+        return request.InternAtom(
+            display=self.display.display,
+            defer=True,
+            name=name,
+            only_if_exists=True,
+        )
+
+    def track_changes(self):
+        "Select the RandR notifications that make cached state stale"
+        if not self._tracking:
+            randr.select_input(self.root, RANDR_CHANGE_MASK)
+            self.display.flush()
+            self._tracking = True
+
+    def add_listener(self, func):
+        "Call func(event) for every X event the session reads"
+        self._listeners.append(func)
+
+    def remove_listener(self, func):
+        self._listeners.remove(func)
+
+    def _note(self, event):
+        if isinstance(event, RANDR_NOTIFY_EVENTS):
+            self.generation += 1
+            if isinstance(event, randr.ScreenChangeNotify):
+                self.timestamps = (event.timestamp, event.config_timestamp)
+        for func in list(self._listeners):
+            func(event)
+
+    def poll(self):
+        """Read the events that have already arrived, without blocking.
+
+        Returns the generation, which grows with every RandR notification.
+        """
+        display = self.display
+        while display.pending_events():
+            self._note(display.next_event())
+        return self.generation
+
+    def wait(self):
+        "Block until the next event arrives and read it"
+        self._note(self.display.next_event())
+
+    def expire(self):
+        "Make the next state() read the configuration again"
+        self.generation += 1
+
+    def state(self, verify=False):
+        """A RandRSnapshot of the current configuration.
+
+        The snapshot is taken again only after a RandR notification has
+        arrived (or expire() was called). verify=True also compares the
+        server's RandR timestamps with one GetScreenResourcesCurrent
+        request, for when events may have been consumed elsewhere.
+        """
+        self.track_changes()
+        generation = self.poll()
+        if verify and self._state is not None:
+            res = self._request('GetScreenResourcesCurrent', None,
+                                randr.get_screen_resources_current, self.root)
+            self._update_modes(res)
+            if (res.timestamp, res.config_timestamp) != self.timestamps:
+                generation = self.generation = self.generation + 1
+        if self._state is None or self._state_generation != generation:
+            self._state = self.snapshot()
+            self._state_generation = generation
+        return self._state
+
+    def snapshot(self):
+        """Fetch the RandR state of every connected output in one batch.
+
+        The queries are pipelined: one round-trip for the screen resources,
+        the primary output and the EDID atom, and one more for the output
+        infos, CRTC infos and EDID base blocks of every output. The EDID
+        extension blocks of the monitors that have any take a third.
+        For edider.instrument the duration of each request is the time
+        from sending its batch until its reply was read.
+        """
+        first_sent = sent = instrument.clock()
+        res = self._defer(randr.GetScreenResources, window=self.root)
+        primary = self._defer(randr.GetOutputPrimary, window=self.root)
+        name = randr.PROPERTY_RANDR_EDID
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self._defer_atom(name)
+            self._reply(atom, 'InternAtom', None, sent)
+            atom = atom.atom
+            if atom != X.NONE:
+                self._atoms[name] = atom
+        self._reply(res, 'GetScreenResources', None, sent)
+        modes = self._update_modes(res)
+        self.timestamps = (res.timestamp, res.config_timestamp)
+
+        tstamp = res.config_timestamp
+        sent = instrument.clock()
+        info_reqs = [
+            (out, self._defer(randr.GetOutputInfo, output=out,
+                              config_timestamp=tstamp))
+            for out in res.outputs
+        ]
+        crtc_reqs = [
+            (crtc, self._defer(randr.GetCrtcInfo, crtc=crtc,
+                               config_timestamp=tstamp))
+            for crtc in res.crtcs
+        ]
+        edid_reqs = []
+        if atom != X.NONE:
+            edid_reqs = [
+                (out, self._defer_edid(out, atom, 0, EDID_BLOCK_LONGS))
+                for out in res.outputs
+            ]
+
+        output_infos = {}
+        for out, req in info_reqs:
+            self._reply(req, 'GetOutputInfo', out, sent)
+            if req.connection == 0:
+                output_infos[out] = req._data
+        crtcs = {}
+        for crtc, req in crtc_reqs:
             try:
-                info = randr.get_crtc_info(win, idx, 0)._data
-            except XError:      # will error if crtc == 0
-                info = {}
-            yield CRTCInfo(idx, info)
+                self._reply(req, 'GetCrtcInfo', None, sent)
+                crtcs[crtc] = CRTCInfo(crtc, req._data)
+            except XError:
+                crtcs[crtc] = CRTCInfo(crtc, {})
+        edids = dict.fromkeys(output_infos, b'')
+        ext_reqs = []
+        for out, req in edid_reqs:
+            self._reply(req, 'GetOutputProperty', out, sent)
+            if out not in output_infos:
+                continue
+            edids[out] = edid = bytes(bytearray(req.value))
+            if len(edid) == 128 and edid_size(edid) > 128:
+                longs = edid_size(edid) // 4 - EDID_BLOCK_LONGS
+                ext_reqs.append((out, self._defer_edid(out, atom, EDID_BLOCK_LONGS, longs)))
+        sent = instrument.clock()
+        for out, req in ext_reqs:
+            self._reply(req, 'GetOutputProperty', out, sent)
+            edids[out] += bytes(bytearray(req.value))
+
+        self._reply(primary, 'GetOutputPrimary', None, first_sent)
+        return RandRSnapshot(
+            outputs=tuple(x for x in res.outputs if x in output_infos),
+            output_infos=output_infos,
+            crtcs=crtcs,
+            modes=modes,
+            primary=primary.output,
+            edids=edids,
+        )
+
+    @property
+    def closed(self):
+        return self.display is None
+
+    def close(self):
+        if self.display is not None:
+            if self._owns_display:
+                self.display.close()
+            self.display = None
+            self.root = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        if self.closed:
+            return '{}(closed)'.format(cname)
+        return '{}({!r}, {})'.format(cname, self.display_name, self.i_screen)
+
+
+_sessions = {}
+def get_session(i_screen=0, display_name=None):
+    """Return the shared session for screen i_screen of display_name,
+    by default of the display in $DISPLAY."""
+    key = (display_name, i_screen)
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        session = X11Session(display_name, i_screen)
+        _sessions[key] = session
+    return session
+
+def close_sessions():
+    "Close the shared sessions opened by get_session()."
+    while _sessions:
+        _, session = _sessions.popitem()
+        session.close()
+
+def get_connected_outputs(i_screen=0, session=None):
+    "Yield the X11-index for each connected monitor"
+    if session is None:
+        session = get_session(i_screen)
+    res = session.screen_resources()
+    for output in res.outputs:
+        info = session.output_info(output)
+        if info.connection == 0:
+            yield output
+
+def crtc_info(*crtc_idx, **kwargs):
+    session = kwargs.get('session')
+    if session is None:
+        session = get_session()
+    for idx in crtc_idx:
+        try:
+            info = session.crtc_info(idx)._data
+        except XError:      # will error if crtc == 0
+            info = {}
+        yield CRTCInfo(idx, info)
 
 class X11Output(object):
-    def __init__(self, idx):
+    def __init__(self, idx, session=None, snapshot=None):
+        """Without a snapshot the properties are answered from the session's
+        state(), which is re-read in one batch when the RandR configuration
+        changes. If a RandRSnapshot is given it is used instead and no
+        further requests are sent to the X server; the info, crtc and edid
+        then stay cached until invalidate() is called."""
         self.idx = idx
+        if session is None:
+            session = get_session()
+        self.session = session
+        self.use_snapshot(snapshot)
 
-    @property
-    def edid(self):
+    def use_snapshot(self, snapshot):
+        "Drop the cached state and answer from snapshot (or the server) instead"
+        self.invalidate()
+        self.snapshot = snapshot
+        if snapshot is not None and self.idx in snapshot.output_infos:
+            self._info = info = snapshot.output_infos[self.idx]
+            self._edid = snapshot.edids[self.idx]
+            self._crtc = snapshot.crtcs.get(
+                info['crtc'], CRTCInfo(info['crtc'], {}))
+
+    def invalidate(self, *names):
+        """Forget the cached values of the given properties.
+
+        By default the info, crtc and edid are all dropped.
+        """
+        for name in names or ('info', 'crtc', 'edid'):
+            self.__dict__.pop('_' + name, None)
+
+    def _state(self):
+        "The session's current RandRSnapshot if it covers this output, else None"
+        if self.snapshot is not None:
+            return None
+        state = self.session.state()
+        if self.idx in state.output_infos:
+            return state
+        return None
+
+    def _cached(self, name, fetch):
+        "The cached value of name, else fetch(), which is kept if pinned"
         try:
-            return self._edid
-        except AttributeError:
+            return self.__dict__['_' + name]
+        except KeyError:
             pass
-        PROPERTY_EDID = display.Display().intern_atom('EDID', only_if_exists=True)
-        with get_window() as win:
-            edid = randr.get_output_property(
-                win,
-                self.idx,
-                PROPERTY_EDID,
-                Xatom.INTEGER,
-                0,
-                400,
-            )
-            edid = bytes(edid.value)
-            self._edid = edid
-        return self._edid
+        value = fetch()
+        if self.snapshot is not None:
+            self.__dict__['_' + name] = value
+        return value
+
+    @property
+    def edid(self):
+        state = self._state()
+        if state is not None:
+            return state.edids[self.idx]
+        return self._cached('edid', lambda: self.session.output_edid(self.idx))
 
     @property
     def idx_primary(self):
-        with get_window(0) as window:
-            return randr.get_output_primary(window).output
+        if self.snapshot is not None:
+            return self.snapshot.primary
+        return self.session.state().primary
 
     @property
     def info(self):
-        try:
-            return self._info
-        except AttributeError:
-            pass
-        with get_window() as win:
-            self._info = randr.get_output_info(win, self.idx, 0)._data
-        return self._info
+        state = self._state()
+        if state is not None:
+            return state.output_infos[self.idx]
+        return self._cached('info', lambda: self.session.output_info(self.idx)._data)
 
     @property
     def output_name(self):
@@ -85,45 +570,59 @@ class X11Output(object):
 
     @property
     def crtc(self):
-        return next(crtc_info(self.info['crtc']))
+        state = self._state()
+        if state is not None:
+            idx = state.output_infos[self.idx]['crtc']
+            return state.crtcs.get(idx, CRTCInfo(idx, {}))
+        return self._cached(
+            'crtc', lambda: next(crtc_info(self.info['crtc'], session=self.session)))
 
     @property
     def crtcs(self):
-        return list(crtc_info(*self.info['crtcs']))
+        state = self.snapshot or self._state()
+        if state is not None:
+            crtcs = state.crtcs
+            return [crtcs.get(x, CRTCInfo(x, {})) for x in self.info['crtcs']]
+        return list(crtc_info(*self.info['crtcs'], session=self.session))
+
+    @property
+    def mode_index(self):
+        "The ModeIndex of the screen, see X11Session.mode_index"
+        if self.snapshot is not None:
+            return self.snapshot.modes
+        return self.session.state().modes
 
-    def _get_modes(self):
-        with get_window() as win:
-            res = randr.get_screen_resources(win)
-            modes = res._data['modes']
-            modes = [x._data for x in modes]
-            return modes
+    def _mode(self, mode_id):
+        "The mode dict of mode_id; an unknown id re-validates the index"
+        mode = self.mode_index.get(mode_id)
+        if mode is None and self.snapshot is None:
+            mode = self.session.mode_index(refresh=True).get(mode_id)
+        if mode is None:
+            raise KeyError('Unknown RandR mode {}'.format(mode_id))
+        return mode
 
     @property
     def modes(self):
-        try:
-            return self._modes
-        except AttributeError:
-            self._modes = self._get_modes()
-            return self._modes
+        "Every mode of the screen"
+        return self.mode_index.modes
+
+    @property
+    def supported_modes(self):
+        "The modes of this output, the preferred ones first"
+        return [self._mode(x) for x in self.info['modes']]
 
     @property
     def preferred_mode(self):
         npref = self.info['num_preferred']
-        nmode = self.info['modes'][npref-1]
-        modes = [x for x in self.modes if x['id'] == nmode]
-        assert len(modes) == 1, 'There can only be one preferred mode.'
-        return modes[0]
+        return self._mode(self.info['modes'][npref-1])
 
     @property
     def current_mode(self):
-        modes = self._get_modes()
         try:
             mode_id = self.crtc.info['mode']
         except KeyError:
             return {}
-        modes = [x for x in modes if x['id'] == mode_id]
-        assert len(modes) == 1, 'There can only be one current mode.'
-        return modes[0]
+        return self._mode(mode_id)
 
     def __repr__(self):
         cname = self.__class__.__name__
@@ -131,24 +630,73 @@ class X11Output(object):
 
 
 class Monitor(BaseMonitor):
-    def __init__(self, index):
-        """Index is the X11 index of the output"""
+    def __init__(self, index, session=None, snapshot=None):
+        """Index is the X11 index of the output.
+
+        Without a snapshot the monitor follows the session's state(): the
+        values derived from the EDID are dropped as soon as the EDID has
+        changed, and the monitor then compares by the new EDID.
+        """
         self._id = index
-        self._xout = X11Output(index)
+        self._xout = X11Output(index, session, snapshot)
 
     def _get_output_edid(self):
         return self._xout.edid
 
+    def _sync(self):
+        "Drop the values derived from the EDID if a live monitor's EDID changed"
+        if self._xout.snapshot is not None:
+            return
+        edid = self._xout.edid
+        cached = self.__dict__.get('_edid')
+        if cached is not edid:
+            if cached is not None and cached != edid:
+                self._clear_edid_cache()
+            self._edid = edid
+
+    def invalidate(self, *names):
+        """Forget the cached output state, see X11Output.invalidate.
+
+        Values derived from the EDID are dropped along with the edid.
+        """
+        self._xout.invalidate(*names)
+        if not names or 'edid' in names:
+            self._clear_edid_cache()
+        if not names or 'info' in names:
+            self.__dict__.pop('_width_in_pixels', None)
+            self.__dict__.pop('_height_in_pixels', None)
+
+    def refresh(self, snapshot=None):
+        """Re-read the output's RandR state and EDID.
+
+        They are taken from snapshot, a RandRSnapshot, or else from a new
+        X11Session.snapshot(). A monitor that follows the session's state
+        without a snapshot makes the session read its state again.
+        Returns the monitor.
+        """
+        session = self._xout.session
+        if snapshot is None and self._xout.snapshot is None:
+            session.expire()
+        elif snapshot is None:
+            snapshot = session.snapshot()
+        self.invalidate()
+        self._xout.use_snapshot(snapshot)
+        return self
+
     def _dflt_resolution(self):
+        if self.preferred_timing is not None:
+            return super(Monitor, self)._dflt_resolution()
         d = self._xout.preferred_mode
         self._width_in_pixels, self._height_in_pixels = d['width'], d['height']
 
     @property
     def output_name(self):
+        self._sync()
         return self._xout.output_name
 
     @property
     def is_primary(self):
+        self._sync()
         xo = self._xout
         return xo.idx == xo.idx_primary
 
@@ -156,8 +704,18 @@ class Monitor(BaseMonitor):
     def x11_output_id(self):
         return self._xout.idx
 
+    @property
+    def x11_display(self):
+        "The name of the X display, e.g. ':0'"
+        return self._xout.session.display_name
+
+    @property
+    def x11_screen(self):
+        return self._xout.session.i_screen
+
     @property
     def status(self):
+        self._sync()
         crtc = self._xout.crtc
         if crtc.idx == 0:
             return 'off'
@@ -165,6 +723,7 @@ class Monitor(BaseMonitor):
 
     @property
     def geometry(self):
+        self._sync()
         d = self._xout.crtc.info
         try:
             x, y, width, height = d['x'], d['y'], d['width'], d['height']
@@ -172,15 +731,282 @@ class Monitor(BaseMonitor):
             x, y, width, height = 0, 0, 0, 0
         return Geometry(x, y, width, height)
 
+    @property
+    def current_mode(self):
+        "The Mode the output is driven at, or None when it is off"
+        self._sync()
+        mode = self._xout.current_mode
+        if not mode:
+            return None
+        return Mode(mode['width'], mode['height'], round(mode['refresh_rate'], 2))
+
     def __str__(self):
         sstr = super(Monitor, self).__str__()
         sstr += '\t->\t{}x{}'.format(self.width_in_pixels, self.height_in_pixels)
         return sstr
 
 
-def get_monitors():
-    "Return a Monitor instance for each connected computer monitor."
-    return [Monitor(x) for x in get_connected_outputs()]
+def get_monitors(session=None, snapshot=False):
+    """Return a Monitor instance for each connected computer monitor.
+
+    All monitors share one X11Session; the default session of screen 0
+    is used unless another one is given.
+
+    By default the monitors follow the session's state() and see later
+    configuration changes. With snapshot=True they are pinned to a
+    snapshot of their own (see X11Session.snapshot): reading their
+    properties never sends anything to the X server.
+    """
+    if session is None:
+        session = get_session()
+    if snapshot:
+        snap = session.snapshot()
+        return [Monitor(x, session, snap) for x in snap.outputs]
+    return [Monitor(x, session) for x in session.state().outputs]
+
+DisplayResult = namedtuple('DisplayResult', ('display_name', 'i_screen', 'monitors', 'error'))
+
+class DisplayTimeout(Exception):
+    "An X display did not answer within the timeout of enumerate_displays"
+
+
+def _enumerate_display(display_name, screens):
+    """Return a DisplayResult for each of screens (all if None) of display_name
+
+    The monitors are pinned to their snapshots, so the connection is
+    closed before returning.
+    """
+    if screens is not None and not screens:
+        return []
+    first = 0 if screens is None else screens[0]
+    try:
+        main = X11Session(display_name, first)
+    except Exception as err:    # Xlib raises many unrelated error types
+        return [DisplayResult(display_name, first, [], err)]
+    results = []
+    try:
+        if screens is None:
+            screens = range(main.display.screen_count())
+        for i_screen in screens:
+            session = main
+            try:
+                if i_screen != first:
+                    session = X11Session(display_name, i_screen, connection=main.display)
+                monitors = get_monitors(session, snapshot=True)
+                results.append(DisplayResult(display_name, i_screen, monitors, None))
+            except Exception as err:
+                results.append(DisplayResult(display_name, i_screen, [], err))
+            finally:
+                if session is not main:
+                    session.close()
+    finally:
+        main.close()
+    return results
+
+def enumerate_displays(display_names, screens=None, max_workers=4, timeout=5.0):
+    """Enumerate the monitors of several X displays concurrently.
+
+    display_names is a list such as [':0', ':1', 'host:0']; screens the
+    screen numbers to read on each of them, all screens by default. At
+    most max_workers displays are read at once, each with one connection
+    and one pipelined snapshot per screen. The connections are closed once
+    the snapshots are taken; the monitors never query the server again.
+
+    Returns a list of DisplayResult(display_name, i_screen, monitors, error)
+    in the order of display_names. The monitors know their x11_display and
+    x11_screen. A display that cannot be read gets a single result with the
+    error, and one that takes longer than timeout seconds a DisplayTimeout;
+    its worker thread is abandoned so that it does not hold up the others.
+    """
+    if screens is not None:
+        screens = list(screens)
+    names = []
+    for name in display_names:
+        if name not in names:
+            names.append(name)
+    todo = list(names)
+    done = queue.Queue()
+    running = {}
+    found = {}
+
+    def work(name):
+        done.put((name, _enumerate_display(name, screens)))
+
+    while todo or running:
+        while todo and len(running) < max_workers:
+            name = todo.pop(0)
+            thread = threading.Thread(target=work, args=(name,))
+            thread.daemon = True
+            thread.start()
+            running[name] = instrument.clock() + timeout
+        wait = max(0.0, min(running.values()) - instrument.clock())
+        try:
+            name, results = done.get(timeout=wait)
+        except queue.Empty:
+            now = instrument.clock()
+            for name, deadline in list(running.items()):
+                if deadline <= now:
+                    del running[name]
+                    err = DisplayTimeout('{} did not answer within {}s'.format(name, timeout))
+                    found[name] = [DisplayResult(name, None, [], err)]
+            continue
+        if name in running:     # else it answered after its timeout
+            del running[name]
+            found[name] = results
+    return [result for name in names for result in found[name]]
+
+MonitorChange = namedtuple('MonitorChange', ('added', 'removed', 'changed'))
+
+class MonitorWatcher(object):
+    """Keep a live set of Monitor objects up to date from RandR notifications.
+
+    The watcher subscribes to screen, output, CRTC and output-property
+    notifications on the root window. Each notification only invalidates
+    the cached info, crtc or edid of the outputs it concerns; nothing is
+    fetched until a property of a changed monitor is read again.
+
+    for change in MonitorWatcher():
+        print(change.added, change.removed, change.changed)
+    """
+    event_mask = RANDR_CHANGE_MASK
+
+    def __init__(self, session=None):
+        if session is None:
+            session = get_session()
+        self.session = session
+        session.track_changes()
+        self._events = collections.deque()
+        session.add_listener(self._events.append)
+        self.snapshot = snap = session.snapshot()
+        self.monitors = dict((x, Monitor(x, session, snap)) for x in snap.outputs)
+
+    def fileno(self):
+        return self.session.display.fileno()
+
+    def _set_snapshot(self, snap):
+        self.snapshot = snap
+        for mon in self.monitors.values():
+            mon._xout.snapshot = snap
+
+    def refresh(self, monitors=None):
+        """Take a new snapshot and re-read monitors (by default all) from it.
+
+        The other monitors keep their cached output state but use the
+        new mode list and primary output.
+        """
+        snap = self.session.snapshot()
+        self._set_snapshot(snap)
+        if monitors is None:
+            monitors = self.monitors.values()
+        for mon in monitors:
+            mon.refresh(snap)
+        return snap
+
+    def _monitors_on_crtc(self, crtc):
+        "Monitors whose cached info places them on crtc; nothing is fetched"
+        for mon in self.monitors.values():
+            info = mon._xout.__dict__.get('_info')
+            if info is not None and info['crtc'] == crtc:
+                yield mon
+
+    def handle_event(self, event, change=None):
+        """Update the monitors from one X event.
+
+        The event is folded into change (a MonitorChange of lists) which is
+        returned, or None if the event did not affect any monitor.
+        """
+        if change is None:
+            change = MonitorChange([], [], [])
+        added, removed, changed = change
+        if isinstance(event, randr.OutputChangeNotify):
+            out = event.output
+            mon = self.monitors.get(out)
+            if event.connection == 0 and mon is None:
+                mon = self.monitors[out] = Monitor(out, self.session, self.snapshot)
+                added.append(mon)
+            elif event.connection != 0 and mon is not None:
+                del self.monitors[out]
+                removed.append(mon)
+            elif mon is not None:
+                mon.invalidate()
+                changed.append(mon)
+        elif isinstance(event, randr.CrtcChangeNotify):
+            for mon in self._monitors_on_crtc(event.crtc):
+                mon.invalidate('crtc')
+                changed.append(mon)
+        elif isinstance(event, randr.OutputPropertyNotify):
+            mon = self.monitors.get(event.output)
+            if mon is not None and event.atom == self.session.atom(randr.PROPERTY_RANDR_EDID):
+                mon.invalidate('edid')
+                changed.append(mon)
+        elif isinstance(event, randr.ScreenChangeNotify):
+            old_primary = self.snapshot.primary
+            primary = self.session.output_primary()
+            modes = self.session.mode_index(refresh=True)
+            self._set_snapshot(self.snapshot._replace(modes=modes, primary=primary))
+            if primary != old_primary:
+                for out in (old_primary, primary):
+                    if out in self.monitors:
+                        changed.append(self.monitors[out])
+        if not any(change):
+            return None
+        return change
+
+    def _merge(self, change):
+        "Drop duplicates and monitors that were both added and removed"
+        added, removed, changed = change
+        both = set(id(x) for x in added) & set(id(x) for x in removed)
+        added = [x for x in added if id(x) not in both]
+        removed = [x for x in removed if id(x) not in both]
+        new = set(id(x) for x in added) | set(id(x) for x in removed) | both
+        unique = []
+        for mon in changed:
+            if id(mon) not in new:
+                new.add(id(mon))
+                unique.append(mon)
+        return MonitorChange(added, removed, unique)
+
+    def pending(self):
+        """Handle the events that have already arrived, without blocking.
+
+        Return a MonitorChange, or None if no monitor was affected.
+        """
+        change = MonitorChange([], [], [])
+        self.session.poll()
+        events = self._events
+        while events:
+            self.handle_event(events.popleft(), change)
+        change = self._merge(change)
+        if not any(change):
+            return None
+        return change
+
+    def __iter__(self):
+        "Block for events and yield one MonitorChange per burst of events."
+        while True:
+            if not self._events:
+                self.session.wait()
+            change = self.pending()
+            if change is not None:
+                yield change
+
+    def close(self):
+        "Stop handling the session's events."
+        try:
+            self.session.remove_listener(self._events.append)
+        except ValueError:      # already closed
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def watch(session=None):
+    """Yield a MonitorChange whenever monitors are plugged, unplugged
+    or reconfigured. See MonitorWatcher."""
+    return iter(MonitorWatcher(session))
 
 if __name__ == '__main__':
     monitors = get_monitors()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the test modules: from conftest import get_example_edid"""
+import os
+
+try:
+    testdir = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    testdir = os.getcwd()
+
+def get_example_edid(name):
+    "The bytes of tests/data/name"
+    path = os.path.join(testdir, 'data', name)
+    with open(path, mode='rb') as edid_bin:
+        return bytes(edid_bin.read())
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""An X11Session whose RandR requests are answered in-process.
+
+FakeRandRSession serves one screen with any number of connected outputs,
+each with its own CRTC and EDID, and records every request it is sent.
+Pipelined requests only cost a round-trip when the first of a batch is
+waited for, as with a real server.
+"""
+try:
+    from Xlib.ext import randr
+    from edider.x11read import X11Session
+except ImportError:     # python-xlib is not installed
+    X11Session = object
+
+EDID_ATOM = 300
+ROOT = 1
+
+def make_mode(mode_id, name, dot_clock, h_total, v_total, flags=0, width=1920, height=1080):
+    return dict(id=mode_id, width=width, height=height, dot_clock=dot_clock,
+                h_sync_start=0, h_sync_end=0, h_total=h_total, h_skew=0,
+                v_sync_start=0, v_sync_end=0, v_total=v_total,
+                name_length=len(name), flags=flags)
+
+MODES = [make_mode(70, '1920x1080', 148500000, 2200, 1125),
+         make_mode(71, '1280x720', 74250000, 1650, 750, width=1280, height=720)]
+MODE_NAMES = '1920x10801280x720'
+
+def make_event(event_class, **fields):
+    "A RandR notify event with the given fields, the others 0"
+    for field in event_class._fields.fields:
+        if field.name:
+            fields.setdefault(field.name, 0)
+    return event_class(**fields)
+
+
+class FakeReply(object):
+    """A reply with the attributes and _data of a python-xlib reply
+
+    Its wire size, as edider.instrument measures it, is 32 bytes plus
+    the property value of a GetOutputProperty reply.
+    """
+    def __init__(self, session, **data):
+        self._session = session
+        self._seq = len(session.requests)
+        self._data = data
+        self._reply = self
+        self.__dict__.update(data)
+
+    def reply(self):
+        self._session._wait(self._seq)
+
+    def to_binary(self, **data):
+        return bytes(bytearray(32 + len(data.get('value', ()))))
+
+
+class FakeDisplay(object):
+    "The few python-xlib Display methods X11Session calls besides requests"
+    class screen_class(object):
+        root = ROOT
+
+    def get_display_name(self):
+        return ':99'
+
+    def screen_count(self):
+        return 1
+
+    def screen(self, i_screen):
+        if i_screen:
+            raise IndexError(i_screen)
+        return self.screen_class()
+
+    def intern_atom(self, name, only_if_exists=False):
+        raise NotImplementedError('answered by FakeRandRSession._request')
+
+    def pending_events(self):
+        return 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeRandRSession(X11Session):
+    """A session of a screen with a connected output for every EDID in edids.
+
+    Output i has id 100 + i and CRTC 200 + i at x = 1920 * i; primary is
+    the first one. disconnected more outputs have no monitor and no CRTC.
+    edid_atom is what InternAtom answers; X.NONE (0) until the atom exists.
+    requests lists the name of every request sent, round_trips counts the
+    waits for a reply that had not arrived yet. The EDID atom is known
+    from the start.
+    """
+    def __init__(self, edids, disconnected=0):
+        super(FakeRandRSession, self).__init__(connection=FakeDisplay())
+        self._atoms[randr.PROPERTY_RANDR_EDID] = EDID_ATOM
+        self._tracking = True
+        self.edids = dict((100 + i, edid) for i, edid in enumerate(edids))
+        self.outputs = sorted(self.edids) + [
+            100 + len(edids) + i for i in range(disconnected)]
+        self.primary = self.outputs[0] if edids else 0
+        self.edid_atom = EDID_ATOM
+        self.requests = []
+        self.round_trips = 0
+        self._arrived = 0
+
+    def reset(self):
+        self.requests = []
+        self.round_trips = 0
+        self._arrived = 0
+
+    def _wait(self, seq):
+        "Wait for the reply to request seq and, with it, all sent before"
+        if seq > self._arrived:
+            self.round_trips += 1
+            self._arrived = len(self.requests)
+
+    def _answer(self, name, keys):
+        self.requests.append(name)
+        if name in ('GetScreenResources', 'GetScreenResourcesCurrent'):
+            names = 'mode_names' if name == 'GetScreenResources' else 'names'
+            crtcs = [200 + i for i in range(len(self.edids))]
+            return dict(timestamp=1, config_timestamp=1, crtcs=crtcs,
+                        outputs=self.outputs, modes=MODES, **{names: MODE_NAMES})
+        if name == 'GetOutputPrimary':
+            return dict(output=self.primary)
+        if name == 'GetOutputInfo':
+            out = keys['output']
+            connected = out in self.edids
+            crtc = out + 100 if connected else 0
+            return dict(
+                name='DP-{}'.format(out - 100), connection=0 if connected else 1,
+                crtc=crtc, crtcs=[crtc] if connected else [],
+                modes=[70, 71] if connected else [], num_preferred=1 if connected else 0,
+                mm_width=527 if connected else 0, mm_height=296 if connected else 0)
+        if name == 'GetCrtcInfo':
+            crtc = keys['crtc']
+            return dict(x=1920 * (crtc - 200), y=0, width=1920, height=1080, mode=70,
+                        outputs=[crtc - 100])
+        if name == 'GetOutputProperty':
+            edid = self.edids.get(keys['output'], b'')
+            start = 4 * keys['long_offset']
+            return dict(value=list(bytearray(edid[start : start + 4*keys['long_length']])))
+        if name == 'InternAtom':
+            return dict(atom=self.edid_atom)
+        raise NotImplementedError(name)
+
+    def _request(self, name, output, func, *args):
+        "Answer a request that is waited for at once, in place of func"
+        keys = {}
+        if name == 'GetOutputInfo':
+            keys = dict(output=args[1])
+        elif name == 'GetCrtcInfo':
+            keys = dict(crtc=args[1])
+        elif name == 'GetOutputProperty':
+            keys = dict(output=args[1], long_offset=args[4], long_length=args[5])
+
+        def answer(*args):
+            reply = FakeReply(self, **self._answer(name, keys))
+            reply.reply()
+            if name == 'InternAtom':
+                return reply.atom
+            return reply
+        return super(FakeRandRSession, self)._request(name, output, answer, *args)
+
+    def _defer_atom(self, name):
+        return FakeReply(self, **self._answer('InternAtom', {}))
+
+    def _defer(self, request_class, **keys):
+        "Queue a request; its reply is waited for on first use"
+        return FakeReply(self, **self._answer(request_class.__name__, keys))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from edider import aio
+from edider.drmread import DRMMonitor
+from edider.parser import EDIDMonitor
+from fake_x11 import FakeRandRSession
+try:
+    from edider.x11read import MonitorChange, MonitorWatcher
+except ImportError:     # python-xlib is not installed
+    MonitorWatcher = None
+from conftest import get_example_edid
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+class TestAsync(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+
+    def test_snapshot(self):
+        mon = EDIDMonitor(self.edid, 'HDMI-1')
+
+        async def snapshot():
+            return await mon.snapshot_async(['output_name', 'name'])
+        row = run(snapshot())
+        self.assertEqual(row, mon.as_dict(['output_name', 'name']))
+
+    def test_refresh(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'card0-HDMI-A-1')
+            os.makedirs(path)
+            with open(os.path.join(path, 'edid'), 'wb') as fobj:
+                fobj.write(self.edid)
+            mon = DRMMonitor('card0-HDMI-A-1', root)
+            self.assertEqual(mon.edid, self.edid)
+            with open(os.path.join(path, 'edid'), 'wb') as fobj:
+                fobj.write(b'')
+
+            async def refresh():
+                return await mon.refresh_async()
+            self.assertIs(run(refresh()), mon)
+            self.assertEqual(mon.edid, b'')
+        finally:
+            shutil.rmtree(root)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            run(aio.get_monitors('wayland'))
+
+    @unittest.skipIf(MonitorWatcher is None, 'needs python-xlib')
+    def test_x11_session(self):
+        session = FakeRandRSession([self.edid])
+        mon, = run(aio.get_monitors(session=session))
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+        with self.assertRaises(ValueError):
+            run(aio.get_monitors('drm', session=session))
+
+    @unittest.skipIf(MonitorWatcher is None, 'needs python-xlib')
+    def test_watcher_close(self):
+        session = FakeRandRSession([self.edid])
+        aio.AsyncMonitorWatcher(MonitorWatcher(session), owns_session=True).close()
+        self.assertTrue(session.closed)
+        shared = FakeRandRSession([self.edid])
+        watcher = run(aio.watch(shared))
+        self.assertEqual(len(watcher.monitors), 1)
+        watcher.close()
+        self.assertFalse(shared.closed)
+
+    @unittest.skipIf(MonitorWatcher is None, 'needs python-xlib')
+    def test_events_in_executor(self):
+        watcher = MonitorWatcher(FakeRandRSession([self.edid]))
+        threads = []
+        def pending():
+            threads.append(threading.current_thread())
+            return MonitorChange([], [], [])
+        watcher.pending = pending
+        change = run(aio.AsyncMonitorWatcher(watcher).__anext__())
+        self.assertEqual(change, ([], [], []))
+        self.assertNotIn(threading.current_thread(), threads)
+
+if __name__ == '__main__':
+    unittest.main()
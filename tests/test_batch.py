@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import random
+import unittest
+from edider.parser import decode_edid
+from edider import batch
+from conftest import get_example_edid
+
+def make_variants(edid, n, seed=0):
+    "Randomise the bytes of every field parse_batch decodes"
+    rng = random.Random(seed)
+    offsets = [8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 126,
+               54, 57, 72, 75, 90, 93, 108, 111]
+    out = []
+    for _ in range(n):
+        blob = bytearray(edid[:128])
+        for off in offsets:
+            blob[off] = rng.randrange(256)
+        blob[8] &= 0x7f
+        out.append(bytes(blob))
+    return out
+
+@unittest.skipIf(batch.np is None, 'numpy is not installed')
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+        self.edids = [self.edid] + make_variants(self.edid, 50)
+
+    def test_matches_record(self):
+        cols = batch.parse_batch(self.edids)
+        for i, edid in enumerate(self.edids):
+            rec = decode_edid(edid)
+            for name, _ in batch.COLUMNS:
+                if name.startswith('descriptor'):
+                    expected = rec.descriptor(int(name[-1]) - 1).dtype
+                else:
+                    expected = getattr(rec, name)
+                self.assertEqual(cols[name][i], expected, (i, name))
+
+    def test_contiguous_buffer(self):
+        buf = b''.join(self.edids)
+        cols = batch.parse_batch(buf)
+        self.assertEqual(list(cols['manufacturer_id']),
+                         list(batch.parse_batch(self.edids)['manufacturer_id']))
+
+    def test_structured(self):
+        arr = batch.to_structured(batch.parse_batch(self.edids))
+        self.assertEqual(arr['manufacturer_id'][0], 'TSB')
+        self.assertEqual(arr['descriptor3'][0], 'name')
+        self.assertIn('Toshiba', arr['vendor_name'][0])
+
+    def test_bad_size(self):
+        with self.assertRaises(ValueError):
+            batch.parse_batch(self.edid[:100])
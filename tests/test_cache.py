@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from edider.cache import FORMAT_VERSION, DecodeCache
+from edider.parser import decode_edid
+from conftest import get_example_edid
+
+def with_year(edid, year):
+    edid = bytearray(edid)
+    edid[17] = year - 1990
+    return bytes(edid)
+
+class TestDecodeCache(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+
+    def test_hits(self):
+        cache = DecodeCache()
+        rec = cache.record(self.edid)
+        self.assertIs(cache.record(bytes(bytearray(self.edid))), rec)
+        info = cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_uuid(self):
+        cache = DecodeCache()
+        expected = uuid.UUID(hex=hashlib.md5(self.edid).hexdigest())
+        self.assertEqual(cache.uuid(self.edid), expected)
+
+    def test_lru(self):
+        cache = DecodeCache(maxsize=2)
+        for year in (2001, 2002, 2001, 2003):
+            cache.record(with_year(self.edid, year))
+        self.assertEqual(cache.cache_info().currsize, 2)
+        cache.record(with_year(self.edid, 2001))    # kept, used recently
+        self.assertEqual(cache.cache_info().hits, 2)
+        cache.record(with_year(self.edid, 2002))    # evicted
+        self.assertEqual(cache.cache_info().misses, 4)
+
+    def test_persistence(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'sub', 'decoded.json')
+            cache = DecodeCache(path=path)
+            cache.record(self.edid)
+            cache.save()
+            other = DecodeCache(path=path)
+            rec = other.record(self.edid)
+            self.assertEqual(other.cache_info().disk_hits, 1)
+            expected = decode_edid(self.edid)
+            self.assertEqual(repr(rec), repr(expected))
+            self.assertEqual(rec.descriptors, expected.descriptors)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_stale_store(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'decoded.json')
+            digest = hashlib.md5(self.edid).hexdigest()
+            for content in ['{"%s": [1, 2]}' % digest,
+                            '{"version": 0, "entries": {"%s": [1, 2]}}' % digest,
+                            '{"version": %d, "entries": {"%s": [1, 2]}}' % (FORMAT_VERSION, digest),
+                            'not json']:
+                with open(path, 'w') as fobj:
+                    fobj.write(content)
+                cache = DecodeCache(path=path)
+                self.assertEqual(repr(cache.record(self.edid)), repr(decode_edid(self.edid)))
+                self.assertEqual(cache.cache_info().disk_hits, 0)
+                cache.save()
+                other = DecodeCache(path=path)
+                other.record(self.edid)
+                self.assertEqual(other.cache_info().disk_hits, 1)
+        finally:
+            shutil.rmtree(tmpdir)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import sys
+import unittest
+from edider.cli import main
+from conftest import testdir
+
+EDID2 = os.path.join(testdir, 'data', 'edid2.bin')
+
+def run(*argv):
+    out = io.StringIO()
+    status = main(list(argv), out)
+    return status, out.getvalue()
+
+class TestDecode(unittest.TestCase):
+    def test_text(self):
+        status, out = run('decode', EDID2)
+        self.assertEqual(status, 0)
+        self.assertIn('TOSHIBA-TV', out.splitlines()[0])
+        self.assertIn('\tmanufacturer_id\t-> TSB', out.splitlines())
+
+    def test_json_fields(self):
+        status, out = run('decode', '--json', '--fields', 'name,manufacture_year', EDID2, EDID2)
+        self.assertEqual(status, 0)
+        rows = [json.loads(x) for x in out.splitlines()]
+        self.assertEqual(rows, [{'name': 'TOSHIBA-TV', 'manufacture_year': 2009}] * 2)
+
+    def test_unknown_field(self):
+        err = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+        stderr, sys.stderr = sys.stderr, err
+        try:
+            with self.assertRaises(SystemExit) as cm:
+                run('decode', '--fields', 'name,bogus', EDID2)
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('unknown --fields bogus', err.getvalue())
+
+    def test_missing_file(self):
+        status, out = run('decode', os.path.join(testdir, 'data', 'missing.bin'))
+        self.assertEqual((status, out), (1, ''))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import collections
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from edider import corpus, scan
+from edider.parser import EDIDMonitor
+
+class TestCorpus(unittest.TestCase):
+    def test_reproducible(self):
+        first = list(corpus.CorpusGenerator(seed=7, malformed=0.2).generate(200))
+        again = list(corpus.CorpusGenerator(seed=7, malformed=0.2).generate(200))
+        other = list(corpus.CorpusGenerator(seed=8, malformed=0.2).generate(200))
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+
+    def test_valid(self):
+        gen = corpus.CorpusGenerator(seed=1, extensions=0.5)
+        edids = [edid for edid, defect in gen.generate(300)]
+        self.assertEqual(len(set(edids)), len(edids))
+        self.assertTrue(any(len(x) == 256 for x in edids))
+        for edid in edids:
+            self.assertEqual(scan._decode(edid, None)[1], None)
+            mon = EDIDMonitor(edid)
+            self.assertTrue(mon.name)
+            self.assertIn((mon.width_in_pixels, mon.height_in_pixels),
+                          [x[:2] for x in corpus.COMMON_MODES])
+            self.assertTrue(mon.supported_modes)
+
+    def test_malformed(self):
+        gen = corpus.CorpusGenerator(seed=2, malformed=0.5)
+        items = list(gen.generate(600))
+        defects = collections.Counter(defect for _, defect in items)
+        self.assertEqual(set(defects), set(corpus.MALFORMATIONS) | set([None]))
+        for edid, defect in items:
+            if defect == 'garbage_descriptor':
+                EDIDMonitor(edid).as_dict()
+
+    def test_write_scan(self):
+        gen = corpus.CorpusGenerator(seed=3)
+        buf = io.BytesIO()
+        defects = gen.write(buf, 500, buffer_size=4096)
+        self.assertEqual(defects, {None: 500})
+        buf.seek(0)
+        results = list(scan.Scanner(workers=0).scan(buf))
+        self.assertEqual([x.edid for x in results], [x for x, _ in gen.generate(500)])
+        self.assertFalse([x for x in results if x.error])
+
+    def test_gzip_file(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'corpus.bin.gz')
+            self.assertEqual(corpus.main([path, '--count', '50', '--seed', '4']), 0)
+            with gzip.open(path) as fobj:
+                results = list(scan.scan(fobj, workers=0))
+        finally:
+            shutil.rmtree(tmpdir)
+        expected = [x for x, _ in corpus.CorpusGenerator(seed=4).generate(50)]
+        self.assertEqual([x.edid for x in results], expected)
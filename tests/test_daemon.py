@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from edider import daemon
+from edider.parser import EDIDMonitor
+from fake_x11 import FakeRandRSession
+try:
+    from edider import x11read
+except ImportError:     # python-xlib is not installed
+    x11read = None
+from conftest import get_example_edid
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'edider.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_served_monitor(self):
+        mon = EDIDMonitor(get_example_edid('edid2.bin'), 'HDMI-1')
+        served = daemon.ServedMonitor(daemon._row(mon, 'drm'))
+        self.assertEqual(served, mon)
+        self.assertEqual(served.as_dict(['output_name', 'name', 'width_in_pixels']),
+                         mon.as_dict(['output_name', 'name', 'width_in_pixels']))
+        self.assertEqual(served.backend, 'drm')
+        self.assertIsNone(served.geometry)
+        self.assertEqual(served.refresh().width_in_pixels, 1920)
+
+    def test_no_server(self):
+        with self.assertRaises(socket.error):
+            daemon.query(self.path)
+
+    def test_query(self):
+        server = daemon.MonitorServer(self.path, backend='drm')
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        try:
+            monitors = daemon.query(self.path)
+            self.assertEqual(len(monitors), len(server._monitors()))
+            with self.assertRaises(RuntimeError):
+                daemon.MonitorServer(self.path, backend='drm')
+        finally:
+            server.stop()
+            thread.join()
+            server.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    @unittest.skipIf(x11read is None, 'needs python-xlib')
+    def test_x11_session_lifetime(self):
+        opened = []
+        def open_session(*args):
+            if not os.path.exists(self.path):
+                raise RuntimeError('bound after the session was opened')
+            opened.append(FakeRandRSession([get_example_edid('edid2.bin')]))
+            return opened[-1]
+
+        x11_session, x11read.X11Session = x11read.X11Session, open_session
+        try:
+            server = daemon.MonitorServer(self.path, backend='x11')
+            with self.assertRaises(RuntimeError):
+                daemon.MonitorServer(self.path, backend='x11')
+            self.assertEqual(len(opened), 1)
+            self.assertEqual(server._monitors()[0].name, 'TOSHIBA-TV')
+            server.close()
+            self.assertTrue(opened[0].closed)
+        finally:
+            x11read.X11Session = x11_session
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+import edider
+from edider.drmread import (DRMMonitor, get_connected_connectors, get_monitors)
+from conftest import get_example_edid
+
+def make_connector(root, name, files):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for fname, content in files.items():
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        with open(os.path.join(path, fname), mode) as fobj:
+            fobj.write(content)
+
+class TestDRM(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        make_connector(self.root, 'card0', {'dev': '226:0\n'})
+        make_connector(self.root, 'card0-HDMI-A-1', {
+            'status': 'connected\n',
+            'enabled': 'enabled\n',
+            'edid': get_example_edid('edid2.bin'),
+            'modes': '1920x1080\n1280x720\n1920x1080i\n',
+        })
+        make_connector(self.root, 'card0-DP-1', {
+            'status': 'disconnected\n',
+            'enabled': 'disabled\n',
+            'edid': b'',
+            'modes': '',
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_connected(self):
+        conns = list(get_connected_connectors(self.root))
+        self.assertEqual(conns, ['card0-HDMI-A-1'])
+
+    def test_missing_root(self):
+        missing = os.path.join(self.root, 'missing')
+        self.assertEqual(get_monitors(missing), [])
+
+    def test_monitor(self):
+        mon, = get_monitors(self.root)
+        self.assertEqual(mon.output_name, 'HDMI-A-1')
+        self.assertEqual(mon.status, 'on')
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+        self.assertEqual(mon.manufacturer_id, 'TSB')
+        self.assertEqual(mon.width_in_pixels, 1920)
+        self.assertEqual(mon.height_in_pixels, 1080)
+
+    def test_disabled(self):
+        mon = DRMMonitor('card0-DP-1', self.root)
+        self.assertEqual(mon.status, 'off')
+        self.assertEqual(mon.width_in_pixels, 0)
+
+    def test_snapshot(self):
+        mon, = get_monitors(self.root, snapshot=True)
+        shutil.rmtree(os.path.join(self.root, 'card0-HDMI-A-1'))
+        self.assertEqual(mon.status, 'on')
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+        self.assertEqual(mon.width_in_pixels, 1920)
+        self.assertRaises((IOError, OSError), mon.refresh)
+
+
+class TestBackend(unittest.TestCase):
+    def setUp(self):
+        self.display = os.environ.pop('DISPLAY', None)
+
+    def tearDown(self):
+        os.environ.pop('DISPLAY', None)
+        if self.display is not None:
+            os.environ['DISPLAY'] = self.display
+
+    def test_no_display(self):
+        self.assertEqual(edider.select_backend(), 'drm')
+
+    def test_unreachable_display(self):
+        os.environ['DISPLAY'] = ':4242'
+        self.assertEqual(edider.select_backend(), 'drm')
+
+    def test_explicit(self):
+        self.assertEqual(edider.select_backend('x11'), 'x11')
+        self.assertRaises(ValueError, edider.select_backend, 'wayland')
+
+    def test_session_needs_x11(self):
+        self.assertRaises(ValueError, edider.get_monitors, 'drm', session=object())
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import unittest
+from edider import encode
+from edider.extensions import CTAExtension
+from edider.parser import (EDIDMonitor, EDIDParser, Mode, RangeLimits, decode_edid,
+                           parse_detailed_timing)
+from conftest import get_example_edid
+
+def checksums_ok(edid):
+    return all(sum(bytearray(edid[i : i+128])) % 256 == 0 for i in range(0, len(edid), 128))
+
+class TestEncode(unittest.TestCase):
+    def test_fields(self):
+        fields = dict(
+            manufacturer_id='DEL', product_code=0xa0b1, serial_number=12345,
+            manufacture_week=12, manufacture_year=2016, edid_version=1,
+            edid_revision=4, horizontal_size=53, vertical_size=30,
+        )
+        edid = encode.encode_edid(**fields)
+        self.assertEqual(len(edid), 128)
+        self.assertTrue(checksums_ok(edid))
+        rec = decode_edid(edid)
+        for name, value in fields.items():
+            self.assertEqual(getattr(rec, name), value, name)
+        self.assertEqual(rec.extension_count, 0)
+
+    def test_descriptors(self):
+        timing = encode.make_timing(2560, 1440, 144, 597, 336)
+        limits = RangeLimits(48, 300, 30, 400, 600000)
+        edid = encode.encode_edid(
+            descriptors=[timing, encode.text_descriptor('name', 'U2415'),
+                         encode.range_limits_descriptor(limits),
+                         encode.std_timing_descriptor([Mode(1600, 1200, 60)])],
+            established_timings=[Mode(640, 480, 60), Mode(1152, 870, 75)],
+            standard_timings=[Mode(1920, 1200, 60), Mode(1920, 1080, 75)],
+        )
+        mon = EDIDMonitor(edid)
+        self.assertEqual(mon.preferred_timing, timing)
+        self.assertAlmostEqual(mon.refresh_rate, 144, places=2)
+        self.assertEqual(mon.name, 'U2415')
+        self.assertEqual(mon.range_limits, limits)
+        edp = EDIDParser(edid)
+        self.assertEqual(edp.established_timings, (Mode(640, 480, 60), Mode(1152, 870, 75)))
+        self.assertEqual(edp.standard_timings, (Mode(1920, 1200, 60), Mode(1920, 1080, 75)))
+        self.assertIn(Mode(1600, 1200, 60), edp.supported_modes)
+
+    def test_roundtrip_example(self):
+        edid = get_example_edid('edid2.bin')
+        rec = decode_edid(edid)
+        edp = EDIDParser(edid)
+        fields = dict((x, getattr(rec, x)) for x in rec._fields if x != 'extension_count')
+        out = encode.encode_edid(
+            descriptors=rec.descriptors,
+            established_timings=edp.established_timings,
+            standard_timings=edp.standard_timings,
+            video_input=0x80, gamma=2.2, features=0x0a,
+            chromaticity=edid[25:35], **fields)
+        self.assertEqual(out[54:126], edid[54:126])
+        self.assertEqual(out[35:54], edid[35:54])
+        self.assertEqual(decode_edid(out).descriptors, rec.descriptors)
+
+    def test_detailed_timing(self):
+        timing = encode.make_timing(3840, 2160, 60, 1210, 680)
+        self.assertEqual(parse_detailed_timing(encode.encode_detailed_timing(timing)), timing)
+
+    def test_extensions(self):
+        ext = encode.cta_extension(
+            [encode.video_data_block([16, 4, 3], native=[16])],
+            [encode.make_timing(1280, 720, 60)])
+        edid = encode.encode_edid(extensions=[ext, b'\xf0\x01'])
+        self.assertEqual(len(edid), 3 * 128)
+        self.assertTrue(checksums_ok(edid))
+        edp = EDIDParser(edid)
+        cta = edp.extensions[0]
+        self.assertIsInstance(cta, CTAExtension)
+        self.assertEqual([(x.vic, x.native) for x in cta.video_descriptors],
+                         [(16, True), (4, False), (3, False)])
+        self.assertEqual(cta.detailed_timings[0].width, 1280)
+        self.assertEqual(edp.extensions[1].tag, 0xf0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            encode.encode_standard_timing(Mode(1366, 768, 60))
+        with self.assertRaises(ValueError):
+            encode.encode_established_timings([Mode(1920, 1080, 60)])
+        with self.assertRaises(ValueError):
+            encode.text_descriptor('name', 'A very long monitor name')
+        with self.assertRaises(ValueError):
+            encode.encode_edid(manufacturer_id='D3L')
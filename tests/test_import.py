@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+import unittest
+
+# Generous bound on the cumulative import time of edider, in microseconds;
+# the package itself imports nothing but its own __init__.
+MAX_IMPORT_US = 50000
+
+def importtime(statement):
+    "Run statement under -X importtime; return {module: cumulative us}"
+    proc = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=dict(os.environ),
+    )
+    _, err = proc.communicate()
+    assert proc.returncode == 0, err
+    times = {}
+    for line in err.decode().splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = [x.strip() for x in line[len('import time:'):].split('|')]
+        times[name] = int(cumulative)
+    return times
+
+@unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs python 3.7')
+class TestImportTime(unittest.TestCase):
+    def test_import_edider(self):
+        times = importtime('import edider')
+        self.assertIn('edider', times)
+        self.assertFalse([x for x in times if x.startswith('Xlib')])
+        self.assertLess(times['edider'], MAX_IMPORT_US)
+
+    def test_parser_without_xlib(self):
+        times = importtime('import edider.parser')
+        self.assertIn('edider.parser', times)
+        self.assertFalse([x for x in times if x.startswith('Xlib')])
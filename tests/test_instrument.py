@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from edider import instrument
+from edider.cache import DecodeCache
+from edider.drmread import get_monitors
+from edider.encode import encode_edid
+from fake_x11 import FakeDisplay, FakeRandRSession
+try:
+    from edider import x11read
+except ImportError:     # python-xlib is not installed
+    x11read = None
+from conftest import get_example_edid
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+
+    def test_inactive(self):
+        self.assertFalse(instrument.active)
+        with instrument.counting():
+            self.assertTrue(instrument.active)
+        self.assertFalse(instrument.active)
+
+    def test_parse_events(self):
+        events = []
+        instrument.add_hook(events.append)
+        try:
+            cache = DecodeCache()
+            cache.record(self.edid)
+            cache.record(self.edid)
+        finally:
+            instrument.remove_hook(events.append)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, 'parse')
+        self.assertEqual(events[0].nbytes, len(self.edid))
+
+    def test_drm_requests(self):
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'card0-HDMI-A-1')
+            os.makedirs(path)
+            for name, content in (('status', b'connected\n'), ('edid', self.edid)):
+                with open(os.path.join(path, name), 'wb') as fobj:
+                    fobj.write(content)
+            with instrument.counting() as counter:
+                mon = get_monitors(root)[0]
+                mon.edid
+            self.assertEqual(counter.count('request', 'status'), 1)
+            stat = counter.summary()[('request', 'edid')]
+            self.assertEqual((stat.count, stat.nbytes), (1, len(self.edid)))
+            self.assertEqual(counter.count('connect'), 0)
+        finally:
+            shutil.rmtree(root)
+
+    def record(self, func, *args):
+        "The events of func(*args)"
+        events = []
+        instrument.add_hook(events.append)
+        try:
+            func(*args)
+        finally:
+            instrument.remove_hook(events.append)
+        self.assertTrue(all(x.kind == 'request' and x.duration >= 0 for x in events))
+        return events
+
+    @unittest.skipIf(x11read is None, 'needs python-xlib')
+    def test_x11_snapshot(self):
+        edid = encode_edid()
+        session = FakeRandRSession([edid, edid], disconnected=1)
+        events = self.record(session.snapshot)
+        self.assertEqual(len(events), len(session.requests))
+        self.assertEqual(sorted((x.name, x.output) for x in events), [
+            ('GetCrtcInfo', None), ('GetCrtcInfo', None),
+            ('GetOutputInfo', 100), ('GetOutputInfo', 101), ('GetOutputInfo', 102),
+            ('GetOutputPrimary', None),
+            ('GetOutputProperty', 100), ('GetOutputProperty', 101),
+            ('GetOutputProperty', 102),
+            ('GetScreenResources', None),
+        ])
+        sizes = dict((x.output, x.nbytes) for x in events if x.name == 'GetOutputProperty')
+        self.assertEqual(sizes, {100: 32 + len(edid), 101: 32 + len(edid), 102: 32})
+
+    @unittest.skipIf(x11read is None, 'needs python-xlib')
+    def test_x11_requests(self):
+        session = FakeRandRSession([self.edid])
+        events = self.record(session.output_info, 100)
+        self.assertEqual([(x.name, x.output, x.nbytes) for x in events],
+                         [('GetOutputInfo', 100, 32)])
+        events = self.record(session.output_edid, 100)
+        self.assertEqual([x.name for x in events], ['GetOutputProperty'] * len(events))
+        self.assertEqual(set(x.output for x in events), set([100]))
+        self.assertEqual(sum(x.nbytes for x in events), 32 * len(events) + len(self.edid))
+
+    @unittest.skipIf(x11read is None, 'needs python-xlib')
+    def test_x11_connect(self):
+        class FakeXlibDisplay(object):
+            Display = staticmethod(lambda display_name: FakeDisplay())
+        xlib_display, x11read.display = x11read.display, FakeXlibDisplay
+        try:
+            with instrument.counting() as counter:
+                x11read.X11Session(':99').close()
+        finally:
+            x11read.display = xlib_display
+        stat = counter.summary()[('connect', ':99')]
+        self.assertEqual(stat.count, 1)
+        self.assertGreaterEqual(stat.total_time, 0)
+        self.assertEqual(counter.count('request'), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import binascii
+import pickle
+import unittest
+from edider.daemon import ServedMonitor
+from edider.layout import LayoutSnapshot, diff
+from conftest import get_example_edid
+
+def make_monitor(edid, output_name, x=0, refresh=60.0, primary=False, status='on'):
+    return ServedMonitor({
+        'edid': binascii.hexlify(edid).decode('ascii'),
+        'output_name': output_name,
+        'status': status,
+        'is_primary': primary,
+        'geometry': {'x': x, 'y': 0, 'width': 1920, 'height': 1080},
+        'current_mode': {'width': 1920, 'height': 1080, 'refresh_rate': refresh},
+    })
+
+class TestLayout(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+        other = bytearray(self.edid)
+        other[12] ^= 1      # another serial number
+        self.other = bytes(other)
+
+    def snapshot(self, *monitors):
+        return LayoutSnapshot.from_monitors(monitors)
+
+    def test_equal(self):
+        old = self.snapshot(make_monitor(self.edid, 'HDMI-1', primary=True))
+        new = self.snapshot(make_monitor(self.edid, 'HDMI-1', primary=True))
+        self.assertEqual(old, new)
+        self.assertEqual(hash(old), hash(new))
+        self.assertFalse(any(diff(old, new)))
+        self.assertEqual(pickle.loads(pickle.dumps(old)), old)
+
+    def test_diff(self):
+        old = self.snapshot(
+            make_monitor(self.edid, 'HDMI-1', primary=True),
+            make_monitor(self.other, 'DP-1', x=1920),
+        )
+        new = self.snapshot(
+            make_monitor(self.edid, 'HDMI-1', x=1920, refresh=50.0),
+            make_monitor(self.other, 'DP-2', primary=True),
+        )
+        changes = diff(old, new)
+        self.assertNotEqual(old, new)
+        self.assertEqual([x.output_name for x in changes.added], ['DP-2'])
+        self.assertEqual([x.output_name for x in changes.removed], ['DP-1'])
+        self.assertEqual([b.geometry.x for a, b in changes.moved], [1920])
+        self.assertEqual([b.mode.refresh_rate for a, b in changes.mode_changed], [50.0])
+        self.assertEqual([b.is_primary for a, b in changes.primary_changed], [False])
+        self.assertEqual(changes.status_changed, [])
+        self.assertEqual(changes.edid_changed, [])
+
+    def test_edid_changed(self):
+        old = self.snapshot(make_monitor(self.edid, 'HDMI-1'), make_monitor(self.edid, 'DP-1'))
+        new = self.snapshot(make_monitor(self.other, 'HDMI-1'), make_monitor(self.edid, 'DP-2'))
+        changes = diff(old, new)
+        self.assertEqual([b.output_name for a, b in changes.edid_changed], ['HDMI-1'])
+        self.assertNotEqual(changes.edid_changed[0][0].uuid, changes.edid_changed[0][1].uuid)
+        self.assertEqual([x.output_name for x in changes.added], ['DP-2'])
+        self.assertEqual([x.output_name for x in changes.removed], ['DP-1'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,11 @@
 # -*- coding: utf-8 -*-
-import os
 import unittest
-from edider.parser import (EDIDSegmenter, EDIDParser)
-from builtins import bytes
-try:
-    testdir = os.path.dirname(os.path.abspath(__file__))
-except NameError:
-    testdir = os.getcwd()
-
-def get_example_edid(name):
-    path = os.path.join(testdir, 'data', name)
-    with open(path, mode='rb') as edid_bin:
-        return bytes(edid_bin.read())
+import json
+from edider.parser import (EDIDSegmenter, EDIDParser, EDIDMonitor, Mode, decode_edid,
+                           decode_modes, edid_size, parse_descriptor, parse_range_limits,
+                           parse_standard_timings, to_columns, to_json_lines)
+from edider.extensions import CTAExtension
+from conftest import get_example_edid
 
 class TestSegmenter(unittest.TestCase):
     def test_header(self):
@@ -55,6 +49,200 @@ class TestParser(unittest.TestCase):
         self.assertEqual(d3.dtype, 'name')
         self.assertEqual(d3.value, 'TOSHIBA-TV')
 
+    def test_detailed_timing(self):
+        d1 = self.edp.descriptor1
+        self.assertEqual(d1.dtype, 'detailed_timing')
+        timing = d1.value
+        self.assertEqual((timing.width, timing.height), (1920, 1080))
+        self.assertEqual(timing.pixel_clock, 148500)
+        self.assertEqual((timing.h_blanking, timing.v_blanking), (280, 45))
+        self.assertEqual((timing.h_sync_offset, timing.h_sync_width), (88, 44))
+        self.assertEqual((timing.v_sync_offset, timing.v_sync_width), (4, 5))
+        self.assertEqual((timing.h_image_size, timing.v_image_size), (886, 498))
+        self.assertFalse(timing.interlaced)
+        self.assertAlmostEqual(timing.refresh_rate, 60.0)
+
+    def test_established_standard_timings(self):
+        self.assertEqual(self.edp.established_timings,
+                         (Mode(640, 480, 60), Mode(800, 600, 60), Mode(1024, 768, 60)))
+        self.assertEqual(self.edp.standard_timings,
+                         (Mode(1280, 1024, 60), Mode(1360, 765, 60)))
+
+    def test_range_limits(self):
+        self.assertEqual(self.edp.descriptor4.dtype, 'mon_range_lim')
+        self.assertEqual(self.edp.range_limits, self.edp.descriptor4.value)
+        self.assertEqual(tuple(self.edp.range_limits), (23, 61, 15, 68, 150000))
+        offsets = bytearray(18)
+        offsets[3], offsets[4] = 0xfd, 0x0f
+        offsets[5:10] = bytearray([1, 2, 3, 4, 60])
+        self.assertEqual(tuple(parse_range_limits(bytes(offsets))), (256, 257, 258, 259, 600000))
+
+    def test_supported_modes(self):
+        modes = self.edp.supported_modes
+        self.assertEqual(list(modes), sorted(set(modes)))
+        self.assertEqual(len(modes), 7)
+        self.assertIn(Mode(1920, 1080, 60), modes)
+        self.assertIn(Mode(1360, 768, 60.02), modes)
+        self.assertEqual(decode_modes(self.edp._edid), modes)
+
+    def test_standard_timings(self):
+        # aspect ratios 16:10, 4:3, 5:4 and 16:9, then unused slots
+        data = b'\xd1\x00\x81\x40\x81\x80\xd1\xcf\x01\x01\x00\x00'
+        self.assertEqual(parse_standard_timings(data), (
+            Mode(1920, 1200, 60), Mode(1280, 960, 60),
+            Mode(1280, 1024, 60), Mode(1920, 1080, 75)))
+        desc = b'\x00\x00\x00\xfa\x00' + data + b'\x01\x01\x0a'
+        self.assertEqual(parse_descriptor(desc).value[0], Mode(1920, 1200, 60))
+
+
+class TestBaseMonitor(unittest.TestCase):
+    def setUp(self):
+        self.mon = EDIDMonitor(get_example_edid('edid2.bin'))
+
+    def test_text_fields(self):
+        self.assertEqual(self.mon.name, 'TOSHIBA-TV')
+        self.assertEqual(self.mon.serial_no, '')
+        self.assertEqual(self.mon.text, '')
+        self.assertEqual(self.mon.manufacturer_id, 'TSB')
+        self.assertEqual(self.mon.width_in_cm, 89)
+
+    def test_identity(self):
+        other = EDIDMonitor(bytes(bytearray(self.mon.edid)))
+        self.assertEqual(self.mon, other)
+        self.assertEqual(hash(self.mon), hash(other))
+        self.assertEqual(len(set([self.mon, other])), 1)
+        changed = bytearray(self.mon.edid)
+        changed[17] += 1
+        self.assertNotEqual(self.mon, EDIDMonitor(bytes(changed)))
+
+    def test_as_dict(self):
+        d = self.mon.as_dict()
+        self.assertEqual(set(d), set(EDIDMonitor.field_names()))
+        self.assertEqual(self.mon.as_dict(['name', 'manufacturer_id']),
+                         {'name': 'TOSHIBA-TV', 'manufacturer_id': 'TSB'})
+
+    def test_bulk(self):
+        mons = [self.mon, EDIDMonitor(self.mon.edid)]
+        cols = to_columns(mons, ['name', 'width_in_pixels'])
+        self.assertEqual(cols, {'name': ['TOSHIBA-TV'] * 2, 'width_in_pixels': [1920] * 2})
+        lines = list(to_json_lines(mons, ['uuid', 'preferred_timing']))
+        row = json.loads(lines[0])
+        self.assertEqual(row['uuid'], str(self.mon.uuid))
+        self.assertEqual(row['preferred_timing']['h_active'], 1920)
+
+    def test_resolution(self):
+        self.assertEqual(self.mon.width_in_pixels, 1920)
+        self.assertEqual(self.mon.height_in_pixels, 1080)
+        self.assertAlmostEqual(self.mon.refresh_rate, 60.0)
+
+    def test_refresh(self):
+        self.assertIs(self.mon.refresh(), self.mon)
+        self.assertEqual(self.mon.refresh().name, 'TOSHIBA-TV')
+
+    def test_supported_modes(self):
+        self.assertEqual(self.mon.supported_modes, EDIDParser(self.mon.edid).supported_modes)
+        self.assertEqual(self.mon.range_limits.max_v_rate, 61)
+        self.assertEqual(EDIDMonitor(b'').supported_modes, ())
+        self.assertIsNone(EDIDMonitor(b'').range_limits)
+
+    def test_without_edid(self):
+        # e.g. a VNC, Xvfb or virtual output
+        mon = EDIDMonitor(b'', 'VNC-0')
+        self.assertEqual(mon.manufacturer_id, '')
+        self.assertEqual((mon.name, mon.serial_no, mon.text), ('', '', ''))
+        self.assertIsNone(mon.vendor_name)
+        self.assertIsNone(mon.manufacture_year)
+        self.assertIsNone(mon.width_in_cm)
+        self.assertIsNone(mon.preferred_timing)
+        d = mon.as_dict()
+        self.assertEqual(d['output_name'], 'VNC-0')
+        self.assertEqual(d['width_in_pixels'], 0)
+        self.assertEqual(str(mon), 'EDIDMonitor(VNC-0)')
+
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+        self.rec = decode_edid(self.edid)
+
+    def test_fields(self):
+        self.assertEqual(self.rec.manufacturer_id, 'TSB')
+        self.assertEqual(self.rec.manufacture_year, 2009)
+        self.assertEqual(self.rec.manufacture_week, 255)
+        self.assertEqual((self.rec.edid_version, self.rec.edid_revision), (1, 3))
+        self.assertEqual((self.rec.horizontal_size, self.rec.vertical_size), (89, 50))
+        self.assertEqual(self.rec.descriptors[2], ('name', 'TOSHIBA-TV'))
+
+    def test_product_serial(self):
+        eds = EDIDSegmenter(self.edid)
+        code = bytearray(eds.product_code)
+        serial = bytearray(eds.serial_number)
+        self.assertEqual(self.rec.product_code, code[0] | code[1] << 8)
+        self.assertEqual(self.rec.serial_number,
+                         sum(x << (8 * i) for i, x in enumerate(serial)))
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.rec.manufacture_year = 2000
+
+    def test_short_block(self):
+        with self.assertRaises(ValueError):
+            decode_edid(self.edid[:100])
+
+def make_cta_edid(edid):
+    "edid2.bin with one hand-built CTA-861 extension block"
+    blocks = bytearray([
+        0x43, 0x90, 0x04, 0x05,                 # video: VIC 16 (native), 4, 5
+        0x23, 0x09, 0x07, 0x07,                 # audio: LPCM, 2 channels
+        0x65, 0x03, 0x0c, 0x00, 0x10, 0x00,     # vendor: HDMI OUI
+        0xe2, 0x05, 0x03,                       # extended: colorimetry
+    ])
+    ext = bytearray([0x02, 0x03, 4 + len(blocks), 0xf1]) + blocks
+    ext += bytearray(edid[54:72])               # the base block's 1920x1080 DTD
+    ext += bytearray(127 - len(ext))
+    ext.append(-sum(ext) % 256)
+    base = bytearray(edid[:128])
+    base[126] = 1
+    base[127] = -sum(base[:127]) % 256
+    return bytes(base + ext)
+
+
+class TestExtensions(unittest.TestCase):
+    def setUp(self):
+        self.edid = make_cta_edid(get_example_edid('edid2.bin'))
+        self.edp = EDIDParser(self.edid)
+
+    def test_size(self):
+        self.assertEqual(edid_size(self.edid), 256)
+        self.assertEqual(self.edp.extension_count, 1)
+        self.assertEqual(len(self.edp.extensions), 1)
+
+    def test_truncated(self):
+        # the base block announces an extension which is not there
+        self.assertEqual(len(EDIDParser(self.edid[:128]).extensions), 0)
+
+    def test_cta(self):
+        cta = self.edp.extensions[0]
+        self.assertIsInstance(cta, CTAExtension)
+        self.assertTrue(cta.checksum_ok)
+        self.assertTrue(cta.underscan and cta.basic_audio)
+        self.assertEqual(cta.native_dtds, 1)
+        self.assertEqual([x.dtype for x in cta.data_blocks],
+                         ['video', 'audio', 'vendor_specific', 'colorimetry'])
+
+    def test_cta_descriptors(self):
+        cta = self.edp.extensions[0]
+        self.assertEqual([(x.vic, x.native) for x in cta.video_descriptors],
+                         [(16, True), (4, False), (5, False)])
+        sad, = cta.audio_descriptors
+        self.assertEqual((sad.format, sad.channels), ('LPCM', 2))
+        self.assertEqual(sad.sample_rates, (32000, 44100, 48000))
+        self.assertEqual(sad.bit_depths, (16, 20, 24))
+        vsdb, = cta.vendor_blocks
+        self.assertEqual(vsdb.oui, 0x000c03)
+        timing, = cta.detailed_timings
+        self.assertEqual((timing.width, timing.height), (1920, 1080))
+
 # edp = EDIDParser(get_example_edid('edid2.bin'))
 # eds = EDIDSegmenter(get_example_edid('edid2.bin'))
 
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from edider import pnp
+from edider.parser import EDIDParser, decode_edid
+from conftest import get_example_edid
+
+PNP_IDS = b"""# comment
+DEL\tDell Inc.
+TSB\tToshiba America Info Systems Inc
+ABC\tAB\xc3\xa7 Corp
+xx\tnot an id
+"""
+
+class TestPNP(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        pnp._registry = None
+
+    def test_code(self):
+        self.assertEqual(pnp.pnp_code('TSB'), 0x5262)
+        self.assertEqual(pnp.pnp_code('tsb'), 0x5262)
+        with self.assertRaises(ValueError):
+            pnp.pnp_code('T@B')
+
+    def test_compiled_roundtrip(self):
+        entries = list(pnp.read_pnp_ids(PNP_IDS.splitlines()))
+        self.assertEqual(len(entries), 3)
+        reg = pnp.PNPRegistry(pnp.compile_registry(entries))
+        self.assertEqual(len(reg), 3)
+        self.assertEqual(reg.lookup('DEL'), 'Dell Inc.')
+        self.assertEqual(reg.lookup('ABC'), u'AB\xe7 Corp')
+        self.assertIsNone(reg.lookup('ZZZ'))
+        self.assertIsNone(reg.lookup('12'))
+        self.assertIn('TSB', reg)
+
+    def test_not_a_registry(self):
+        with self.assertRaises(ValueError):
+            pnp.PNPRegistry(b'XXXX\x00\x00\x00\x00')
+
+    def test_bundled(self):
+        self.assertIn('Toshiba', pnp.vendor_name('TSB'))
+        self.assertIsNone(pnp.vendor_name('XXX'))
+
+    def test_bundled_is_complete(self):
+        self.assertGreater(len(pnp.registry()), 2400)
+        for pnp_id, vendor in [('GSM', 'Goldstar'), ('AUO', 'AU Optronics'), ('AOC', 'AOC'),
+                               ('HKC', 'HKC'), ('SAM', 'Samsung'), ('LEN', 'Lenovo'),
+                               ('BOE', 'BOE'), ('CMN', 'Chimei Innolux')]:
+            self.assertIn(vendor, pnp.vendor_name(pnp_id))
+        self.assertEqual(pnp.vendor_name('EBS'), u'EBS Euchner B\xfcro- und Schulsysteme GmbH')
+
+    def test_environment(self):
+        path = os.path.join(self.tmpdir, 'pnp.ids')
+        with open(path, 'wb') as fobj:
+            fobj.write(PNP_IDS)
+        os.environ['EDIDER_PNP_REGISTRY'] = path
+        try:
+            pnp._registry = None
+            self.assertEqual(len(pnp.registry()), 3)
+        finally:
+            del os.environ['EDIDER_PNP_REGISTRY']
+
+    def test_main(self):
+        src = os.path.join(self.tmpdir, 'pnp.ids')
+        dst = os.path.join(self.tmpdir, 'pnp.bin')
+        with open(src, 'wb') as fobj:
+            fobj.write(PNP_IDS)
+        self.assertEqual(pnp.main(['compile', src, dst]), 0)
+        self.assertEqual(pnp.PNPRegistry.from_file(dst).lookup('DEL'), 'Dell Inc.')
+
+    def test_parser(self):
+        edid = get_example_edid('edid2.bin')
+        self.assertEqual(EDIDParser(edid).vendor_name, pnp.vendor_name('TSB'))
+        self.assertEqual(decode_edid(edid).vendor_name, pnp.vendor_name('TSB'))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from edider.parser import decode_edid
+from edider.scan import Scanner, iter_edids, scan
+from conftest import get_example_edid
+
+def without_extensions(edid):
+    "edid2.bin announces an extension block it does not contain"
+    edid = bytearray(edid[:128])
+    edid[126] = 0
+    edid[127] = -sum(edid[:127]) % 256
+    return bytes(edid)
+
+class TestScan(unittest.TestCase):
+    def setUp(self):
+        self.edid = without_extensions(get_example_edid('edid2.bin'))
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_split_stream(self):
+        data = b'junk' + self.edid * 3 + self.edid[:100]
+        for chunk_size in (7, 128, 1 << 20):
+            found = list(iter_edids(io.BytesIO(data), chunk_size))
+            self.assertEqual([x[0] for x in found], [0, 4, 132, 260, 388])
+            self.assertEqual(found[0][1:], (b'', '4 bytes without an EDID header'))
+            self.assertEqual(found[1:4], [(x, self.edid, None) for x in (4, 132, 260)])
+            self.assertEqual(found[4][2], 'truncated: 100 of 128 bytes')
+
+    def test_missing_extension(self):
+        edid = bytearray(self.edid)
+        edid[126] = 1
+        found = list(iter_edids(io.BytesIO(bytes(edid) + self.edid)))
+        self.assertEqual(found[0][2], 'announces 1 extension blocks, has 0')
+        self.assertEqual(found[1], (128, self.edid, None))
+
+    def test_misaligned_after_malformed(self):
+        # a truncated EDID that announces 3 extensions must not swallow the
+        # EDID after it, which does not start at a block boundary
+        edid = bytearray(self.edid)
+        edid[126] = 3
+        data = bytes(edid) + b'\x02\x03' + bytes(bytearray(70)) + self.edid
+        for chunk_size in (7, 1 << 20):
+            found = list(iter_edids(io.BytesIO(data), chunk_size))
+            self.assertEqual([(x[0], x[2]) for x in found],
+                             [(0, 'truncated: 200 of 512 bytes'), (200, None)])
+
+    def test_sources(self):
+        path = os.path.join(self.tmpdir, 'dump.bin')
+        with open(path, 'wb') as fobj:
+            fobj.write(self.edid * 2)
+        archive = os.path.join(self.tmpdir, 'dumps.tar.gz')
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(path, 'a.bin')
+            tar.add(path, 'b.bin')
+        scanner = Scanner(workers=1)
+        results = list(scanner.scan(path, archive))
+        self.assertEqual([x.source for x in results],
+                         [path] * 2 + [archive + ':a.bin'] * 2 + [archive + ':b.bin'] * 2)
+        record = decode_edid(self.edid)
+        self.assertTrue(all(x.record.__reduce__() == record.__reduce__() for x in results))
+        self.assertEqual((scanner.stats.sources, scanner.stats.edids), (3, 6))
+
+    def test_unreadable_sources(self):
+        path = os.path.join(self.tmpdir, 'dump.bin')
+        with open(path, 'wb') as fobj:
+            fobj.write(self.edid * 2)
+        member = os.path.join(self.tmpdir, 'member.bin')
+        with open(member, 'wb') as fobj:
+            fobj.write(os.urandom(1 << 16))
+        archive = os.path.join(self.tmpdir, 'dumps.tar.gz')
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(path, 'a.bin')
+            tar.add(member, 'b.bin')
+        with open(archive, 'rb') as fobj:
+            data = fobj.read()
+        with open(archive, 'wb') as fobj:
+            fobj.write(data[:len(data) // 2])
+        missing = os.path.join(self.tmpdir, 'missing.bin')
+        scanner = Scanner(workers=1)
+        results = list(scanner.scan(path, archive, missing, path))
+        self.assertEqual([x.source for x in results if x.error is None],
+                         [path] * 2 + [archive + ':a.bin'] * 2 + [path] * 2)
+        failed = [x for x in results if x.error and x.error.startswith('cannot read')]
+        self.assertEqual([(x.source, x.edid, x.record) for x in failed],
+                         [(archive + ':b.bin', b'', None), (missing, b'', None)])
+        self.assertEqual(failed[1].offset, 0)
+        self.assertEqual(scanner.stats.edids, 6)
+
+    def test_pool(self):
+        bad = bytearray(self.edid)
+        bad[20] ^= 1
+        bad = bytes(bad)
+        data = io.BytesIO((self.edid + bytes(bad)) * 5)
+        results = list(scan(data, workers=2, batch_size=3))
+        self.assertEqual(len(results), 10)
+        self.assertEqual([x.error for x in results[:2]], [None, 'bad checksum in block 0'])
+        self.assertEqual(results[1].record.manufacturer_id, 'TSB')
+
+if __name__ == '__main__':
+    unittest.main()
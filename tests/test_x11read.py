@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+import socket
+import time
+import unittest
+from edider.encode import cta_extension, encode_edid
+from edider.parser import EDIDMonitor
+from fake_x11 import EDID_ATOM, FakeRandRSession, make_event, make_mode
+try:
+    from Xlib.ext import randr
+    from edider import x11read
+    from edider.x11read import (CRTCInfo, DisplayTimeout, ModeIndex, Monitor, MonitorChange,
+                                MonitorWatcher, RandRSnapshot, crtc_info,
+                                enumerate_displays)
+except ImportError:     # python-xlib is not installed
+    enumerate_displays = None
+
+from conftest import get_example_edid
+
+class FakeSession(object):
+    "Stands in for X11Session: state() returns whatever self.current is"
+    display_name = ':99'
+    i_screen = 0
+
+    def __init__(self, snapshot):
+        self.current = snapshot
+        self.expired = 0
+
+    def state(self, verify=False):
+        return self.current
+
+    def expire(self):
+        self.expired += 1
+
+def make_snapshot(edid, x=0, crtc=63, mode=70):
+    modes = ModeIndex([make_mode(mode, '1920x1080', 148500000, 2200, 1125)], '1920x1080', 1)
+    info = dict(name='HDMI-1', crtc=crtc, crtcs=[crtc], modes=[mode], num_preferred=1)
+    crtc_info = dict(x=x, y=0, width=1920, height=1080, mode=mode)
+    return RandRSnapshot(
+        outputs=(66,),
+        output_infos={66: info},
+        crtcs={crtc: CRTCInfo(crtc, crtc_info)},
+        modes=modes,
+        primary=66,
+        edids={66: edid},
+    )
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestLiveMonitor(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+        self.session = FakeSession(make_snapshot(self.edid))
+
+    def test_follows_state(self):
+        mon = Monitor(66, self.session)
+        self.assertEqual(mon.geometry.x, 0)
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+        self.assertEqual(mon._xout.current_mode['refresh_rate'], 60.0)
+        self.session.current = make_snapshot(self.edid, x=1920)
+        self.assertEqual(mon.geometry.x, 1920)
+        self.assertTrue(mon.is_primary)
+
+    def test_edid_change(self):
+        mon = Monitor(66, self.session)
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+        edid = bytearray(self.edid)
+        edid[8:10] = b'\x10\xac'      # DEL
+        self.session.current = make_snapshot(bytes(edid))
+        self.assertEqual(mon.status, 'on')
+        self.assertEqual(mon.manufacturer_id, 'DEL')
+
+    def test_edid_change_equality(self):
+        mon = Monitor(66, self.session)
+        self.assertEqual(mon, EDIDMonitor(self.edid))
+        edid = bytearray(self.edid)
+        edid[8:10] = b'\x10\xac'      # DEL
+        self.session.current = make_snapshot(bytes(edid))
+        self.assertEqual(mon.manufacturer_id, 'DEL')
+        self.assertEqual(mon, EDIDMonitor(bytes(edid)))
+        self.assertNotEqual(mon, EDIDMonitor(self.edid))
+        self.assertEqual(hash(mon), hash(EDIDMonitor(bytes(edid))))
+
+    def test_pinned(self):
+        mon = Monitor(66, self.session, self.session.current)
+        self.session.current = make_snapshot(self.edid, x=1920)
+        self.assertEqual(mon.geometry.x, 0)
+        mon.refresh(self.session.current)
+        self.assertEqual(mon.geometry.x, 1920)
+        self.assertEqual(self.session.expired, 0)
+        Monitor(66, self.session).refresh()
+        self.assertEqual(self.session.expired, 1)
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestSharedSession(unittest.TestCase):
+    def test_reused(self):
+        opened = []
+        def open_session(display_name=None, i_screen=0):
+            opened.append(FakeRandRSession([get_example_edid('edid2.bin')]))
+            return opened[-1]
+
+        x11read.close_sessions()
+        x11_session, x11read.X11Session = x11read.X11Session, open_session
+        try:
+            first = x11read.get_monitors()
+            second = x11read.get_monitors()
+            self.assertEqual(len(opened), 1)
+            self.assertIs(first[0]._xout.session, second[0]._xout.session)
+            self.assertEqual(second[0].name, 'TOSHIBA-TV')
+            x11read.close_sessions()
+            self.assertTrue(opened[0].closed)
+            x11read.get_monitors()
+            self.assertEqual(len(opened), 2)
+        finally:
+            x11read.close_sessions()
+            x11read.X11Session = x11_session
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        extended = encode_edid(manufacturer_id='DEL', extensions=[cta_extension()])
+        self.session = FakeRandRSession(
+            [get_example_edid('edid2.bin'), extended], disconnected=1)
+
+    def test_batches(self):
+        snap = self.session.snapshot()
+        # the resources and the primary output; the 3 output infos, 2 CRTCs
+        # and 3 EDID base blocks; the extension blocks announced by both EDIDs
+        self.assertEqual(len(self.session.requests), 2 + 8 + 2)
+        self.assertEqual(self.session.round_trips, 3)
+        self.assertEqual(snap.outputs, (100, 101))
+        self.assertEqual(len(snap.edids[101]), 256)
+
+    def test_matches_requests(self):
+        snap = self.session.snapshot()
+        session = self.session
+        session.reset()
+        res = session.screen_resources()
+        infos = dict((out, session.output_info(out)._data) for out in res.outputs)
+        connected = tuple(out for out in res.outputs if infos[out]['connection'] == 0)
+        self.assertEqual(snap.outputs, connected)
+        self.assertEqual(snap.output_infos, dict((x, infos[x]) for x in connected))
+        self.assertEqual(snap.edids, dict((x, session.output_edid(x)) for x in connected))
+        self.assertEqual(snap.crtcs, dict((x.idx, x) for x in crtc_info(*res.crtcs, session=session)))
+        self.assertEqual(snap.primary, session.output_primary())
+        self.assertEqual(snap.modes.modes, session.mode_index().modes)
+        self.assertGreater(session.round_trips, 3)
+
+    def test_edid_atom_later(self):
+        # no output had an EDID when the session was opened
+        edid = get_example_edid('edid2.bin')
+        session = FakeRandRSession([edid])
+        session._atoms.clear()
+        session.edid_atom = 0
+        self.assertEqual(session.snapshot().edids, {100: b''})
+        self.assertEqual(session.output_edid(100), b'')
+        session.edid_atom = EDID_ATOM
+        self.assertEqual(session.snapshot().edids, {100: edid})
+        self.assertEqual(session.output_edid(100), edid)
+        self.assertEqual(session.atom(randr.PROPERTY_RANDR_EDID), EDID_ATOM)
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.edid = get_example_edid('edid2.bin')
+        self.session = FakeRandRSession([self.edid, self.edid], disconnected=1)
+        self.watcher = MonitorWatcher(self.session)
+
+    def feed(self, *events):
+        "Deliver events as the session would and return the merged change"
+        for event in events:
+            self.session._note(event)
+        return self.watcher.pending()
+
+    def connection(self, output, connection):
+        return make_event(randr.OutputChangeNotify, output=output, connection=connection)
+
+    def test_plug_unplug(self):
+        change = self.feed(self.connection(102, 0))
+        self.assertEqual([x.x11_output_id for x in change.added], [102])
+        self.assertEqual((change.removed, change.changed), ([], []))
+        change = self.feed(self.connection(100, 1))
+        self.assertEqual([x.x11_output_id for x in change.removed], [100])
+        self.assertEqual(sorted(self.watcher.monitors), [101, 102])
+
+    def test_added_and_removed(self):
+        # a monitor plugged and unplugged within one batch is not reported
+        self.assertIsNone(self.feed(self.connection(102, 0), self.connection(102, 1)))
+        self.assertNotIn(102, self.watcher.monitors)
+
+    def test_merge(self):
+        mon, other = self.watcher.monitors[100], self.watcher.monitors[101]
+        new = Monitor(102, self.session)
+        change = self.watcher._merge(MonitorChange(
+            [new], [new, other], [mon, new, mon, other]))
+        self.assertEqual(change, MonitorChange([], [other], [mon]))
+
+    def test_crtc_change(self):
+        change = self.feed(make_event(randr.CrtcChangeNotify, crtc=201, x=0))
+        self.assertEqual([x.x11_output_id for x in change.changed], [101])
+        self.assertIsNone(self.feed(make_event(randr.CrtcChangeNotify, crtc=299)))
+
+    def test_edid_change(self):
+        mon = self.watcher.monitors[101]
+        self.assertEqual(mon.manufacturer_id, 'TSB')
+        edid = bytearray(self.edid)
+        edid[8:10] = b'\x10\xac'      # DEL
+        self.session.edids[101] = bytes(edid)
+        atom = self.session.atom(randr.PROPERTY_RANDR_EDID)
+        self.assertIsNone(self.feed(
+            make_event(randr.OutputPropertyNotify, output=101, atom=atom + 1)))
+        change = self.feed(
+            make_event(randr.OutputPropertyNotify, output=101, atom=atom),
+            make_event(randr.OutputPropertyNotify, output=101, atom=atom))
+        self.assertEqual(change.changed, [mon])
+        self.assertEqual(mon.manufacturer_id, 'DEL')
+
+    def test_edid_atom_later(self):
+        session = FakeRandRSession([b''])
+        session._atoms.clear()
+        session.edid_atom = 0
+        watcher = MonitorWatcher(session)
+        mon = watcher.monitors[100]
+        self.assertEqual(mon.edid, b'')
+        session.edid_atom = EDID_ATOM
+        session.edids[100] = self.edid
+        session._note(make_event(randr.OutputPropertyNotify, output=100, atom=EDID_ATOM))
+        change = watcher.pending()
+        self.assertEqual(change.changed, [mon])
+        watcher.refresh(change.changed)
+        self.assertEqual(mon.name, 'TOSHIBA-TV')
+
+    def test_primary_change(self):
+        self.session.primary = 101
+        change = self.feed(make_event(randr.ScreenChangeNotify))
+        self.assertEqual(sorted(x.x11_output_id for x in change.changed), [100, 101])
+        self.assertTrue(self.watcher.monitors[101].is_primary)
+        self.assertFalse(self.watcher.monitors[100].is_primary)
+        self.assertIsNone(self.feed(make_event(randr.ScreenChangeNotify)))
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestModeIndex(unittest.TestCase):
+    def test_index(self):
+        names = ['1920x1080', '1920x1080i', '']
+        modes = [
+            make_mode(70, names[0], 148500000, 2200, 1125),
+            make_mode(71, names[1], 74250000, 2200, 1125, flags=0x10),
+            make_mode(72, names[2], 0, 0, 0),
+        ]
+        index = ModeIndex(modes, ''.join(names), config_timestamp=5)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index[70]['name'], '1920x1080')
+        self.assertAlmostEqual(index[70]['refresh_rate'], 60.0)
+        self.assertTrue(index[71]['interlace'])
+        self.assertAlmostEqual(index[71]['refresh_rate'], 60.0)
+        self.assertEqual(index[72]['refresh_rate'], 0.0)
+        self.assertIsNone(index.get(99))
+        self.assertEqual([x['id'] for x in index], [70, 71, 72])
+
+    def test_from_resources(self):
+        class Reply(object):
+            "Shaped like a GetScreenResources reply, which has mode_names"
+            def __init__(self, **data):
+                self._data = data
+                self.__dict__.update(data)
+
+        modes = [make_mode(70, '1920x1080', 148500000, 2200, 1125),
+                 make_mode(71, '1280x720', 74250000, 1650, 750)]
+        for field in ('mode_names', 'names'):
+            res = Reply(modes=modes, config_timestamp=5, **{field: '1920x10801280x720'})
+            index = ModeIndex.from_resources(res)
+            self.assertEqual([x['name'] for x in index], ['1920x1080', '1280x720'])
+            self.assertEqual(index.config_timestamp, 5)
+
+@unittest.skipIf(enumerate_displays is None, 'needs python-xlib')
+class TestEnumerateDisplays(unittest.TestCase):
+    def setUp(self):
+        # An "X server" that accepts connections but never answers
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(5)
+        self.hung = '127.0.0.1:{}'.format(self.server.getsockname()[1] - 6000)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_closes_sessions(self):
+        opened = []
+        def open_session(display_name=None, i_screen=0, connection=None):
+            session = FakeRandRSession([get_example_edid('edid2.bin')])
+            session.display.screen_count = lambda: 2
+            session.i_screen = i_screen
+            opened.append(session)
+            return session
+
+        x11_session, x11read.X11Session = x11read.X11Session, open_session
+        try:
+            results = x11read._enumerate_display(':99', None)
+            self.assertEqual(x11read._enumerate_display(':99', []), [])
+        finally:
+            x11read.X11Session = x11_session
+        self.assertEqual([(x.i_screen, len(x.monitors), x.error) for x in results],
+                         [(0, 1, None), (1, 1, None)])
+        self.assertEqual([x.closed for x in opened], [True, True])
+        self.assertEqual(results[1].monitors[0].name, 'TOSHIBA-TV')
+
+    def test_errors_and_timeouts(self):
+        start = time.time()
+        results = enumerate_displays(
+            [':4242', self.hung, ':4243', ':4242'], max_workers=2, timeout=0.5)
+        self.assertLess(time.time() - start, 3)
+        self.assertEqual([x.display_name for x in results], [':4242', self.hung, ':4243'])
+        self.assertIsInstance(results[1].error, DisplayTimeout)
+        for result in results:
+            self.assertEqual(result.monitors, [])
+            self.assertIsNotNone(result.error)
+
+if __name__ == '__main__':
+    unittest.main()